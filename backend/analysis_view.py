@@ -0,0 +1,70 @@
+# backend/analysis_view.py
+"""Trimmed views of analysis results for API responses.
+
+A full analysis carries every analyzed review with its text. A dashboard
+usually only needs the summary. The view options are:
+
+    include_reviews=0                         drop analyzed_reviews
+    reviews_offset=100&reviews_limit=50       one page of analyzed_reviews
+    fields=summary,analyzed_reviews.sentiment_analysis.sentiment
+                                              keep only these (dotted) fields
+
+A dotted field that passes through a list applies to each of its items.
+Unknown fields are ignored.
+"""
+
+
+def parse_fields(fields):
+    """Nested {name: subtree} from "a,b.c" or ["a", "b.c"]; an empty subtree keeps the whole value"""
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    tree = {}
+    for field in fields or []:
+        parts = [part.strip() for part in str(field).split(".") if part.strip()]
+        if not parts:
+            continue
+        node = tree
+        for i, part in enumerate(parts):
+            # "summary" after "summary.total_reviews" (or the other way round) keeps all of summary
+            if part in node and not node[part]:
+                break
+            node = node.setdefault(part, {})
+            if i == len(parts) - 1:
+                node.clear()
+    return tree
+
+
+def project(value, tree):
+    """Copy of value with only the fields in tree"""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {name: project(value[name], subtree) for name, subtree in tree.items() if name in value}
+    return value
+
+
+def shape_analysis(analysis, fields=None, include_reviews=True, reviews_offset=0, reviews_limit=None):
+    """View of one analysis result (analyzed_reviews, summary, insights, ...) with the given options"""
+    if not isinstance(analysis, dict):
+        return analysis
+    shaped = dict(analysis)
+    page = None
+    reviews = shaped.get("analyzed_reviews")
+    if not include_reviews:
+        shaped.pop("analyzed_reviews", None)
+    elif isinstance(reviews, list) and (reviews_offset or reviews_limit is not None):
+        end = len(reviews) if reviews_limit is None else reviews_offset + reviews_limit
+        shaped["analyzed_reviews"] = reviews[reviews_offset:end]
+        page = {
+            "offset": reviews_offset,
+            "limit": reviews_limit,
+            "total": len(reviews),
+            "next_offset": end if end < len(reviews) else None
+        }
+    if fields:
+        shaped = project(shaped, parse_fields(fields))
+    if page is not None:
+        shaped["reviews_page"] = page
+    return shaped
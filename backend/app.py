@@ -1,5 +1,5 @@
 # backend/app.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, send_from_directory
 from flask_cors import CORS
 import requests
 from bs4 import BeautifulSoup
@@ -11,15 +11,32 @@ import time
 import random
 import os
 import re
+import shutil
+import sqlite3
 from datetime import datetime, timedelta
-from scrape_products import scrape_product_reviews_selenium
-# Import the custom sentiment analyzer
-from analyzer.sentiment_analyzer import SentimentAnalyzer
+from scrape_products import scrape_product_reviews_selenium, scrape_snapdeal_products, generate_category_mock_data, polite_sleep
+from selector_cache import selector_cache
+from stable_ids import review_id_for, store_product_id
+from review_analysis import analyze_sentiment, calculate_sentiment_summary, analyze_reviews_comprehensive
+from pipelines import PIPELINES, PipelineError, JOB_REQUIREMENTS, SCRAPE_MAX_PRODUCTS
+from jobs import JobManager, QueueFull, PRIORITY_NORMAL
+from job_queue import make_queue
+from webhooks import WebhookSender, validate_callback_url
+from result_cache import analysis_cache
+from review_store import review_store, fts_query, LEADERBOARD_METRICS, TREND_GRANULARITIES
+from persistence import record_log
+from compaction import CompactionScheduler
+from review_export import export_reviews, remove_old_exports, require_pyarrow, ExportUnavailable
+from product_catalog import product_catalog
+from http_cache import prepared_json, conditional_response, compress_response
+from analysis_view import shape_analysis
+from tracking import TrackingStore, RecrawlScheduler, recrawl, normalize_target
 
 # ADD THESE IMPORTS FOR AUTHENTICATION
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 import secrets
+import hmac
 import jwt
 from dotenv import load_dotenv
 from supabase import create_client, Client
@@ -38,6 +55,35 @@ class Config:
     SUPABASE_URL = os.environ.get('SUPABASE_URL')
     SUPABASE_ANON_KEY = os.environ.get('SUPABASE_ANON_KEY')
     SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')
+    JOBS_DB_PATH = os.environ.get('JOBS_DB_PATH') or 'data/jobs.db'
+    JOBS_MAX_WORKERS = int(os.environ.get('JOBS_MAX_WORKERS') or 2)
+    JOBS_WAIT_TIMEOUT = float(os.environ.get('JOBS_WAIT_TIMEOUT') or 600)
+    JOBS_DEFAULT_TIMEOUT = float(os.environ.get('JOBS_DEFAULT_TIMEOUT') or 1800)
+    JOBS_MAX_RUNNING = int(os.environ.get('JOBS_MAX_RUNNING') or 0)
+    JOBS_MAX_RUNNING_PER_USER = int(os.environ.get('JOBS_MAX_RUNNING_PER_USER') or 1)
+    JOBS_MAX_QUEUED = int(os.environ.get('JOBS_MAX_QUEUED') or 200)
+    JOBS_MAX_QUEUED_PER_USER = int(os.environ.get('JOBS_MAX_QUEUED_PER_USER') or 10)
+    JOBS_CAPABILITIES = os.environ.get('JOBS_CAPABILITIES') or 'browser,model'
+    JOBS_QUEUE_URL = os.environ.get('JOBS_QUEUE_URL')  # e.g. redis://localhost:6379/0
+    JOBS_LEASE_SECONDS = float(os.environ.get('JOBS_LEASE_SECONDS') or 60)
+    JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS') or 3)
+    WORKER_TOKEN = os.environ.get('WORKER_TOKEN')
+    WEBHOOK_MAX_PENDING = int(os.environ.get('WEBHOOK_MAX_PENDING') or 1000)
+    WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_MAX_ATTEMPTS') or 6)
+    WEBHOOK_TIMEOUT = float(os.environ.get('WEBHOOK_TIMEOUT') or 10)
+    WEBHOOK_ALLOWED_HOSTS = os.environ.get('WEBHOOK_ALLOWED_HOSTS') or ''  # comma-separated; empty = any public host
+    TRACKING_DB_PATH = os.environ.get('TRACKING_DB_PATH') or 'data/tracking.db'
+    RECRAWL_TICK_SECONDS = float(os.environ.get('RECRAWL_TICK_SECONDS') or 60)
+    RECRAWL_BATCH_SIZE = int(os.environ.get('RECRAWL_BATCH_SIZE') or 5)
+    RECRAWL_JITTER = float(os.environ.get('RECRAWL_JITTER') or 0.1)
+    RECRAWL_OFF_PEAK = os.environ.get('RECRAWL_OFF_PEAK')  # e.g. "01:00-06:00"
+    RECRAWL_MIN_INTERVAL_HOURS = float(os.environ.get('RECRAWL_MIN_INTERVAL_HOURS') or 1)
+    COMPACTION_INTERVAL_HOURS = float(os.environ.get('COMPACTION_INTERVAL_HOURS') or 24)  # 0 = off
+    COMPACTION_RETENTION = os.environ.get('COMPACTION_RETENTION') or 'archive'  # keep, archive or delete
+    COMPACTION_MIN_AGE_DAYS = float(os.environ.get('COMPACTION_MIN_AGE_DAYS') or 7)
+    EXPORT_DIR = os.environ.get('EXPORT_DIR') or 'data/exports'
+    EXPORT_RETENTION_DAYS = float(os.environ.get('EXPORT_RETENTION_DAYS') or 7)
+    COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES') or 1024)  # 0 = off
 
 # APPLY CONFIGURATION
 app.config.from_object(Config)
@@ -69,33 +115,56 @@ except Exception as e:
 if not os.path.exists('data'):
     os.makedirs('data')
 
-# Initialize the sentiment analyzer with trained DistilBERT model
-try:
-    # Try different paths for the sentiment model
-    possible_model_paths = [
-        "./sentiment_model",
-        "../sentiment_model", 
-        "./backend/sentiment_model"
-    ]
-    
-    sentiment_analyzer = None
-    for model_path in possible_model_paths:
-        try:
-            if os.path.exists(model_path):
-                sentiment_analyzer = SentimentAnalyzer(model_path)
-                print(f"✅ Sentiment analyzer initialized from: {model_path}")
-                break
-        except Exception as e:
-            print(f"❌ Failed to load from {model_path}: {e}")
-            continue
-    
-    if sentiment_analyzer is None:
-        print("⚠️  Could not load trained model, using fallback analysis")
-        
-except Exception as e:
-    print(f"❌ Error initializing sentiment analyzer: {e}")
-    print("⚠️  Falling back to TextBlob-based analysis")
-    sentiment_analyzer = None
+# BACKGROUND JOBS FOR LONG-RUNNING SCRAPE/ANALYSIS ENDPOINTS
+WEBHOOK_ALLOWED_HOSTS = {h.strip().lower() for h in app.config['WEBHOOK_ALLOWED_HOSTS'].split(',') if h.strip()}
+job_manager = JobManager(
+    app.config['JOBS_DB_PATH'], app.config['JOBS_MAX_WORKERS'],
+    default_timeout=app.config['JOBS_DEFAULT_TIMEOUT'],
+    max_running=app.config['JOBS_MAX_RUNNING'],
+    max_running_per_user=app.config['JOBS_MAX_RUNNING_PER_USER'],
+    max_queued=app.config['JOBS_MAX_QUEUED'],
+    max_queued_per_user=app.config['JOBS_MAX_QUEUED_PER_USER'],
+    capabilities=[c.strip() for c in app.config['JOBS_CAPABILITIES'].split(',') if c.strip()],
+    queue=make_queue(app.config['JOBS_QUEUE_URL']),
+    lease_seconds=app.config['JOBS_LEASE_SECONDS'],
+    max_attempts=app.config['JOBS_MAX_ATTEMPTS'],
+    webhooks=WebhookSender(
+        app.config['SECRET_KEY'], max_pending=app.config['WEBHOOK_MAX_PENDING'],
+        max_attempts=app.config['WEBHOOK_MAX_ATTEMPTS'], timeout=app.config['WEBHOOK_TIMEOUT'],
+        allowed_hosts=WEBHOOK_ALLOWED_HOSTS
+    )
+)
+for kind, (_, pipeline, _) in PIPELINES.items():
+    job_manager.register(kind, pipeline, requires=JOB_REQUIREMENTS[kind])
+
+# SCHEDULED RE-CRAWL OF TRACKED PRODUCTS AND CATEGORIES
+tracking_store = TrackingStore(
+    app.config['TRACKING_DB_PATH'], jitter=app.config['RECRAWL_JITTER'], off_peak=app.config['RECRAWL_OFF_PEAK']
+)
+job_manager.register("recrawl", lambda params, job: recrawl(tracking_store, params, job),
+                     requires=JOB_REQUIREMENTS["recrawl"])
+recrawl_scheduler = RecrawlScheduler(
+    tracking_store, job_manager,
+    tick_seconds=app.config['RECRAWL_TICK_SECONDS'], batch_size=app.config['RECRAWL_BATCH_SIZE']
+)
+
+# COMPACTION OF OLD REVIEW FILES INTO THE PER-PRODUCT REVIEW HISTORY
+compaction_scheduler = CompactionScheduler(
+    review_store, interval_hours=app.config['COMPACTION_INTERVAL_HOURS'],
+    retention=app.config['COMPACTION_RETENTION'], min_age_days=app.config['COMPACTION_MIN_AGE_DAYS']
+)
+
+@app.before_request
+def start_job_workers():
+    """Start job workers and the background schedulers lazily so only the serving process runs them"""
+    job_manager.start()
+    recrawl_scheduler.start()
+    compaction_scheduler.start()
+
+@app.after_request
+def compress_json(response):
+    """gzip/brotli large JSON responses for clients that accept it"""
+    return compress_response(response, app.config['COMPRESS_MIN_BYTES'])
 
 # ADD AUTHENTICATION HELPER FUNCTIONS
 def init_db():
@@ -390,312 +459,145 @@ def verify_token():
     except Exception as e:
         return jsonify({'valid': False, 'error': str(e)}), 500
 
-# EXISTING SCRAPING FUNCTIONS
-def scrape_snapdeal_products(category, max_products=20):
-    """
-    Scrape products from Snapdeal for a given category
-    """
-    base_url = f"https://www.snapdeal.com/products/{category}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+def request_user_key():
+    """Identify the caller by JWT user id, falling back to the client address"""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        user_id = verify_jwt_token(auth_header[len('Bearer '):])
+        if user_id:
+            return f"user:{user_id}"
+    return f"ip:{request.remote_addr}"
+
+def request_flag(data, name):
+    """Boolean option from the query string (?name=1) or the JSON body ("name": true)"""
+    if request.args.get(name, '').lower() in ('1', 'true', 'yes'):
+        return True
+    return bool(isinstance(data, dict) and data.get(name))
+
+def analysis_view_options(data):
+    """fields, include_reviews and reviews_offset/reviews_limit from the query string or JSON body"""
+    def option(name):
+        value = request.args.get(name)
+        if value is None and isinstance(data, dict):
+            value = data.get(name)
+        return value
+
+    include_reviews = option('include_reviews')
+    if isinstance(include_reviews, str):
+        include_reviews = include_reviews.lower() not in ('0', 'false', 'no')
+    offset = int(option('reviews_offset') or 0)
+    limit = option('reviews_limit')
+    limit = int(limit) if limit not in (None, '') else None
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("reviews_offset and reviews_limit must not be negative")
+    fields = option('fields')
+    if fields is not None and not isinstance(fields, (str, list)):
+        raise ValueError("fields must be a comma-separated string or a list")
+    return {
+        "fields": fields,
+        "include_reviews": True if include_reviews is None else bool(include_reviews),
+        "reviews_offset": offset,
+        "reviews_limit": limit
     }
-    
-    products = []
-    page = 1
-    max_pages = 3  # Limit to first 3 pages to avoid being blocked
-    
-    print(f"Scraping category: {category}")
-    
-    while len(products) < max_products and page <= max_pages:
+
+def cached_analysis_response(kind, data, key):
+    """Serve complete-analysis from the result cache; stale entries trigger a background refresh"""
+    if kind != "complete-analysis" or request_flag(data, 'refresh'):
+        return None
+    prepared, state, age = analysis_cache.get_prepared(key)
+    if prepared is None:
+        return None
+    if state == "stale":
         try:
-            page_url = f"{base_url}?page={page}" if page > 1 else base_url
-            print(f"Scraping page {page}: {page_url}")
-            
-            response = requests.get(page_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Try multiple selectors for product containers
-            product_containers = soup.select(".product-tuple-listing") or \
-                               soup.select(".col-xs-6") or \
-                               soup.select("[data-snap-id]") or \
-                               soup.select(".product-item")
-            
-            if not product_containers:
-                print(f"No products found on page {page} with standard selectors")
-                # Try alternative approach
-                product_containers = soup.find_all("div", class_=lambda x: x and "product" in x.lower())
-                
-            if not product_containers:
-                print(f"No products found on page {page}, breaking")
-                break
-            
-            print(f"Found {len(product_containers)} product containers on page {page}")
-            
-            for i, product in enumerate(product_containers):
-                if len(products) >= max_products:
-                    break
-                
-                try:
-                    # Extract title - try multiple selectors
-                    title = None
-                    title_selectors = [
-                        ".product-title",
-                        "[data-key='name']",
-                        ".prodName",
-                        ".product-item-name",
-                        "p[title]",
-                        ".dp-widget-link"
-                    ]
-                    
-                    for selector in title_selectors:
-                        title_tag = product.select_one(selector)
-                        if title_tag:
-                            title = title_tag.get_text(strip=True) or title_tag.get("title", "").strip()
-                            if title:
-                                break
-                    
-                    if not title:
-                        continue
-                    
-                    # Extract link - try multiple selectors
-                    link = None
-                    link_selectors = [
-                        "a.dp-widget-link",
-                        "a[href*='/product/']",
-                        ".product-item-name a",
-                        ".prodName a",
-                        "a"
-                    ]
-                    
-                    for selector in link_selectors:
-                        link_tag = product.select_one(selector)
-                        if link_tag and link_tag.get("href"):
-                            link = link_tag["href"]
-                            if link.startswith("/product/"):
-                                link = "https://www.snapdeal.com" + link
-                                break
-                            elif "snapdeal.com" in link:
-                                break
-                    
-                    if not link or "snapdeal.com" not in link:
-                        continue
-                    
-                    # Extract price - try multiple selectors
-                    price = None
-                    price_selectors = [
-                        ".product-price",
-                        ".lfloat.product-price",
-                        ".price",
-                        "[data-key='price']",
-                        ".product-tuple-price"
-                    ]
-                    
-                    for selector in price_selectors:
-                        price_tag = product.select_one(selector)
-                        if price_tag:
-                            price_text = price_tag.get_text(strip=True)
-                            # Extract numeric price
-                            import re
-                            price_match = re.search(r'[\d,]+', price_text.replace('₹', '').replace('Rs', '').replace(',', ''))
-                            if price_match:
-                                try:
-                                    price = int(price_match.group())
-                                    break
-                                except ValueError:
-                                    pass
-                    
-                    # Extract image URL - try multiple selectors
-                    image_url = None
-                    img_selectors = [
-                        "img",
-                        ".product-image img",
-                        ".picture-elem img"
-                    ]
-                    
-                    for selector in img_selectors:
-                        img_tag = product.select_one(selector)
-                        if img_tag:
-                            src = img_tag.get("src") or img_tag.get("data-src") or img_tag.get("data-lazy-src")
-                            if src:
-                                if src.startswith("//"):
-                                    image_url = "https:" + src
-                                elif src.startswith("http"):
-                                    image_url = src
-                                break
-                    
-                    # Extract discount/offer info
-                    discount = None
-                    discount_selectors = [
-                        ".product-discount",
-                        ".discount-percent",
-                        ".offer-price"
-                    ]
-                    
-                    for selector in discount_selectors:
-                        discount_tag = product.select_one(selector)
-                        if discount_tag:
-                            discount = discount_tag.get_text(strip=True)
-                            if discount:
-                                break
-                    
-                    product_data = {
-                        "id": f"{category}-{len(products)}-{int(time.time())}",
-                        "title": title,
-                        "link": link,
-                        "price": price,
-                        "image_url": image_url,
-                        "discount": discount,
-                        "category": category,
-                        "reviews": [],
-                        "sentiment": None,
-                        "scraped_at": datetime.now().isoformat()
-                    }
-                    
-                    products.append(product_data)
-                    print(f"Scraped product {len(products)}: {title[:50]}...")
-                    
-                except Exception as e:
-                    print(f"Error parsing product {i}: {e}")
-                    continue
-            
-            page += 1
-            
-            # Add delay to avoid being blocked
-            time.sleep(random.uniform(2, 4))
-            
-        except Exception as e:
-            print(f"Error scraping page {page}: {e}")
-            
-            # Fallback to category-specific mock data if scraping fails
-            if len(products) == 0:
-                print(f"Scraping failed, generating category-specific mock data for: {category}")
-                return generate_category_mock_data(category, max_products)
-            break
-    
-    if len(products) == 0:
-        # Generate category-specific mock data as fallback
-        print(f"No products scraped, generating category-specific mock data for: {category}")
-        return generate_category_mock_data(category, max_products)
-    
-    print(f"Successfully scraped {len(products)} products for category: {category}")
-    return products
+            job = job_manager.submit(kind, data, user_key=request_user_key(), coalesce_key=key)
+            print(f"♻️  Serving stale analysis, refreshing in job {job['id']}")
+        except QueueFull:
+            print("⚠️  Serving stale analysis, queue full so no refresh")
+    body, etag = prepared
+    # The cache field varies with age, so it is spliced onto the prepared body
+    body = body[:-1] + b',"cache":' + json.dumps({"status": state, "age": round(age, 1)}).encode() + b'}'
+    if state == "fresh":
+        cache_control = f"private, max-age={int(max(analysis_cache.ttl - age, 0))}"
+    else:
+        cache_control = "private, no-cache"
+    response = conditional_response(body, etag, cache_control, stable=False)
+    response.headers['X-Cache'] = 'HIT' if state == "fresh" else 'STALE'
+    response.headers['Age'] = str(int(age))
+    return response
 
-def generate_category_mock_data(category, max_products=20):
-    """Generate category-specific mock data when scraping fails"""
-    
-    # Category-specific product data
-    category_products = {
-        "women-apparel-stiched-kurtis": [
-            {
-                "title": "Women's Cotton A-Line Kurti",
-                "price": 599,
-                "discount": "70% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Cotton+Kurti"
-            },
-            {
-                "title": "Anarkali Kurti with Palazzo Set",
-                "price": 899,
-                "discount": "60% off", 
-                "image_url": "https://via.placeholder.com/300x300?text=Anarkali+Set"
-            },
-            {
-                "title": "Rayon Printed Straight Kurti",
-                "price": 449,
-                "discount": "65% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Printed+Kurti"
-            },
-            {
-                "title": "Ethnic Embroidered Kurti",
-                "price": 1299,
-                "discount": "50% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Embroidered+Kurti"
-            },
-            {
-                "title": "Designer Party Wear Kurti",
-                "price": 1899,
-                "discount": "45% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Party+Kurti"
-            }
-        ],
-        "men-apparel-shirts": [
-            {
-                "title": "Men's Cotton Formal Shirt",
-                "price": 799,
-                "discount": "60% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Formal+Shirt"
-            },
-            {
-                "title": "Casual Slim Fit Shirt",
-                "price": 599,
-                "discount": "65% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Casual+Shirt"
-            },
-            {
-                "title": "Check Pattern Full Sleeve Shirt",
-                "price": 699,
-                "discount": "55% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Check+Shirt"
-            },
-            {
-                "title": "Cotton Blend Party Wear Shirt",
-                "price": 1199,
-                "discount": "50% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Party+Shirt"
-            },
-            {
-                "title": "Denim Casual Shirt for Men",
-                "price": 899,
-                "discount": "40% off",
-                "image_url": "https://via.placeholder.com/300x300?text=Denim+Shirt"
-            }
-        ]
-    }
-    
-    # Get products for the specific category or use a default set
-    category_key = category.lower()
-    base_products = category_products.get(category_key, category_products.get("women-apparel-stiched-kurtis", []))
-    
-    # If no specific category found, generate generic products based on category name
-    if category_key not in category_products:
-        base_products = [
-            {
-                "title": f"{category.replace('-', ' ').title()} Product {i+1}",
-                "price": random.randint(299, 2999),
-                "discount": f"{random.randint(30, 70)}% off",
-                "image_url": f"https://via.placeholder.com/300x300?text=Product+{i+1}"
-            }
-            for i in range(5)
-        ]
-    
-    # Generate products up to max_products
-    products = []
-    for i in range(min(max_products, len(base_products) * 4)):  # Multiply to get more variety
-        base_product = base_products[i % len(base_products)]
-        
-        # Add some variation to avoid exact duplicates
-        variation_suffix = f" - Style {(i // len(base_products)) + 1}" if i >= len(base_products) else ""
-        price_variation = random.randint(-200, 500)
-        
-        product = {
-            "id": f"{category}-mock-{i}-{int(time.time())}",
-            "title": base_product["title"] + variation_suffix,
-            "link": f"https://www.snapdeal.com/product/{category}/{random.randint(100000, 999999)}",
-            "price": max(199, base_product["price"] + price_variation),
-            "image_url": base_product["image_url"],
-            "discount": base_product["discount"],
-            "category": category,
-            "reviews": [],
-            "sentiment": None,
-            "scraped_at": datetime.now().isoformat()
-        }
-        
-        products.append(product)
-    
-    print(f"Generated {len(products)} mock products for category: {category}")
-    return products
+def job_timeout(data):
+    """The job deadline a client asked for: positive seconds, at most JOBS_DEFAULT_TIMEOUT (None = default)"""
+    timeout = data.get('timeout') if isinstance(data, dict) else None
+    if timeout is None:
+        return None
+    limit = app.config['JOBS_DEFAULT_TIMEOUT']
+    try:
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float, str)):
+            raise ValueError
+        timeout = float(timeout)
+        if not 0 < timeout <= limit:  # also rejects nan and inf
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"timeout must be a number of seconds greater than 0 and at most {limit:g}")
+    return timeout
+
+def run_pipeline(kind, data):
+    """Queue a pipeline as a background job (202 + job id), or wait for it if asked to.
+    Identical concurrent requests attach to the same in-flight job; cached analyses are served directly."""
+    validate, _, coalesce_key = PIPELINES[kind]
+    try:
+        validate(data)
+    except PipelineError as e:
+        return jsonify(e.body), e.status
+
+    callback_url = data.get('callback_url')
+    if callback_url:
+        try:
+            validate_callback_url(callback_url, WEBHOOK_ALLOWED_HOSTS)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+    try:
+        timeout = job_timeout(data)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
 
+    key = coalesce_key(data)
+    cached = cached_analysis_response(kind, data, key)
+    if cached is not None:
+        return cached
+
+    try:
+        job = job_manager.submit(
+            kind, data, user_key=request_user_key(), coalesce_key=key, timeout=timeout,
+            callback_url=callback_url
+        )
+    except QueueFull as e:
+        response = jsonify({"success": False, "error": str(e), "retry_after": e.retry_after})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+
+    if request_flag(data, 'wait'):
+        finished = job_manager.wait(job["id"], timeout=app.config['JOBS_WAIT_TIMEOUT'])
+        if finished is None:
+            return jsonify({
+                "success": False,
+                "job_id": job["id"],
+                "status_url": f"/api/jobs/{job['id']}",
+                "error": "Timed out waiting for the job; it is still running"
+            }), 504
+        return jsonify(finished["result"]), finished["status_code"]
+
+    return jsonify({
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "coalesced": job["coalesced"],
+        "status_url": f"/api/jobs/{job['id']}",
+        "message": f"Attached to in-flight {kind} job" if job["coalesced"] else f"{kind} job queued"
+    }), 202
+
+# EXISTING SCRAPING FUNCTIONS
 def scrape_product_reviews(product_link, max_reviews=50):
     """
     Scrape reviews for a specific product using Selenium
@@ -707,76 +609,6 @@ def scrape_product_reviews(product_link, max_reviews=50):
         print(f"Error scraping reviews: {e}")
         return []
 
-def analyze_sentiment(text):
-    """Analyze sentiment using trained model"""
-    try:
-        if not text or not text.strip():
-            return {
-                "sentiment": "neutral",
-                "score": 50.0,
-                "confidence": 50.0,
-                "polarity": 0.0
-            }
-        
-        if sentiment_analyzer is None:
-            # TextBlob fallback
-            from textblob import TextBlob
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            
-            if polarity > 0.1:
-                sentiment = "positive"
-            elif polarity < -0.1:
-                sentiment = "negative"
-            else:
-                sentiment = "neutral"
-            
-            return {
-                "sentiment": sentiment,
-                "score": abs(polarity) * 100,
-                "confidence": abs(polarity) * 100,
-                "polarity": polarity
-            }
-        
-        # Use trained model
-        analysis = sentiment_analyzer.analyze_single_review(text)
-        return {
-            "sentiment": analysis["sentiment"],
-            "score": analysis["confidence"],
-            "confidence": analysis["confidence"],
-            "polarity": analysis["polarity"]
-        }
-    except Exception as e:
-        print(f"Error analyzing: {e}")
-        return {
-            "sentiment": "neutral",
-            "score": 50.0,
-            "confidence": 50.0,
-            "polarity": 0.0,
-            "error": str(e)
-        }
-
-def calculate_sentiment_summary(analyzed_reviews):
-    """Calculate sentiment percentages"""
-    if not analyzed_reviews:
-        return {"positive": 0, "negative": 0, "neutral": 100}
-    
-    sentiments = [review.get("sentiment", {}).get("sentiment", "neutral") for review in analyzed_reviews]
-    total = len(sentiments)
-    
-    if total == 0:
-        return {"positive": 0, "negative": 0, "neutral": 100}
-    
-    positive = (sentiments.count("positive") / total) * 100
-    negative = (sentiments.count("negative") / total) * 100
-    neutral = (sentiments.count("neutral") / total) * 100
-    
-    return {
-        "positive": round(positive, 1),
-        "negative": round(negative, 1),
-        "neutral": round(neutral, 1)
-    }
-
 # EXISTING ROUTES
 @app.route('/')
 def home():
@@ -795,6 +627,15 @@ def home():
             "/api/scrape-products",
             "/api/scrape-reviews", 
             "/api/analyze-sentiment",
+            "/api/complete-analysis",
+            "/api/bulk-analysis",
+            "/api/jobs",
+            "/api/jobs/<job_id>",
+            "/api/jobs/<job_id>/events",
+            "/api/scraper/selector-stats",
+            "/api/cache/stats",
+            "/api/tracking",
+            "/api/workers",
             "/api/health"
         ]
     })
@@ -815,45 +656,26 @@ def health_check():
         "timestamp": datetime.now().isoformat()
     })
 
-@app.route('/api/scrape-products', methods=['POST'])
-def api_scrape_products():
-    """API endpoint to scrape products"""
+@app.route('/api/scraper/selector-stats', methods=['GET'])
+def api_selector_stats():
+    """Per-selector hit counts and timings recorded by the scrapers"""
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
-        
-        category = data.get('category', '')
-        max_products = data.get('max_products', 20)
-        
-        if not category:
-            return jsonify({"error": "Category is required"}), 400
-        
-        print(f"Starting to scrape products for category: {category}")
-        
-        products = scrape_snapdeal_products(category, max_products)
-        
-        if not products:
-            return jsonify({
-                "products": [],
-                "message": "No products found for this category",
-                "category": category
-            })
-        
-        # Save to JSON file
-        filename = f"data/products_{category}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(products, f, indent=4, ensure_ascii=False)
-        
+        stats = selector_cache.stats()
         return jsonify({
             "success": True,
-            "products": products,
-            "count": len(products),
-            "category": category,
-            "saved_to": filename,
-            "message": f"Successfully scraped {len(products)} products"
+            "selectors": stats,
+            "count": len(stats),
+            "dead_selectors": [row for row in stats if row["hits"] == 0]
         })
-        
+    except Exception as e:
+        print(f"Error in api_selector_stats: {e}")
+        return jsonify({"success": False, "error": f"Failed to get selector stats: {str(e)}"}), 500
+
+@app.route('/api/scrape-products', methods=['POST'])
+def api_scrape_products():
+    """API endpoint to scrape products"""
+    try:
+        return run_pipeline("scrape-products", request.get_json())
     except Exception as e:
         print(f"Error in api_scrape_products: {e}")
         return jsonify({"success": False, "error": f"Failed to scrape products: {str(e)}"}), 500
@@ -862,122 +684,7 @@ def api_scrape_products():
 def api_scrape_reviews():
     """API endpoint to scrape reviews for products"""
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"success": False, "error": "No JSON data provided"}), 400
-        
-        # Get products array
-        products = data.get('products', [])
-        product_ids = data.get('product_ids', [])
-        
-        if not products:
-            return jsonify({
-                "success": False, 
-                "error": "products array is required"
-            }), 400
-        
-        print(f"\n{'='*70}")
-        print(f"Scraping reviews for {len(products)} product(s)")
-        print(f"{'='*70}\n")
-        
-        # Import the scraping function
-        from scrape_products import setup_driver, scrape_product_reviews_selenium
-        
-        # Create a single browser instance
-        driver = setup_driver()
-        
-        results = []
-        total_reviews = 0
-        
-        try:
-            for idx, product in enumerate(products, 1):
-                product_id = product.get('id', '')
-                product_title = product.get('title', 'Unknown Product')
-                product_url = product.get('link', '')
-                
-                if not product_url:
-                    print(f"[{idx}/{len(products)}] Skipping {product_title} - no URL")
-                    results.append({
-                        "id": product_id,
-                        "title": product_title,
-                        "reviews": [],
-                        "error": "No product URL provided"
-                    })
-                    continue
-                
-                print(f"[{idx}/{len(products)}] Scraping: {product_title[:60]}...")
-                
-                try:
-                    # Scrape reviews using the shared driver
-                    reviews = scrape_product_reviews_selenium(
-                        product_url,
-                        driver=driver  # Removed max_reviews limit
-                    )
-                    
-                    if reviews:
-                        print(f"  ✓ Found {len(reviews)} reviews")
-                        total_reviews += len(reviews)
-                    else:
-                        print(f"  ✗ No reviews found")
-                    
-                    results.append({
-                        "id": product_id,
-                        "title": product_title,
-                        "url": product_url,
-                        "reviews": reviews,
-                        "review_count": len(reviews),
-                        "scraped_at": datetime.now().isoformat()
-                    })
-                    
-                except Exception as scrape_error:
-                    print(f"  ✗ Error scraping product: {scrape_error}")
-                    results.append({
-                        "id": product_id,
-                        "title": product_title,
-                        "url": product_url,
-                        "reviews": [],
-                        "review_count": 0,
-                        "error": str(scrape_error),
-                        "scraped_at": datetime.now().isoformat()
-                    })
-                
-                # Small delay between products
-                if idx < len(products):
-                    time.sleep(2)
-        
-        finally:
-            # Always close the driver
-            driver.quit()
-            print(f"\n{'='*70}")
-            print(f"SCRAPING COMPLETED")
-            print(f"{'='*70}")
-            print(f"Products processed: {len(results)}")
-            print(f"Total reviews: {total_reviews}")
-            print(f"{'='*70}\n")
-        
-        # Save results to file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"data/reviews_bulk_{timestamp}.json"
-        
-        save_data = {
-            "scraped_at": datetime.now().isoformat(),
-            "total_products": len(results),
-            "total_reviews": total_reviews,
-            "results": results
-        }
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(save_data, f, indent=2, ensure_ascii=False)
-        
-        return jsonify({
-            "success": True,
-            "results": results,
-            "total_products": len(results),
-            "total_reviews": total_reviews,
-            "file_saved": filename,
-            "message": f"Successfully scraped {total_reviews} reviews from {len(results)} products"
-        })
-        
+        return run_pipeline("scrape-reviews", request.get_json())
     except Exception as e:
         print(f"\n❌ Error in api_scrape_reviews: {e}")
         import traceback
@@ -995,6 +702,10 @@ def api_analyze_sentiment():
     """Analyze sentiment for product reviews - FIXED VERSION"""
     try:
         data = request.get_json()
+        try:
+            view = analysis_view_options(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"success": False, "error": f"Invalid view options: {e}"}), 400
         
         print("\n" + "="*70)
         print("📊 SENTIMENT ANALYSIS REQUEST - FIXED")
@@ -1045,7 +756,7 @@ def api_analyze_sentiment():
                     continue
                 
                 # Analyze reviews with proper sentiment analysis
-                analysis_result = analyze_reviews_comprehensive(reviews)
+                analysis_result = analyze_reviews_comprehensive(reviews, store_product_id(product))
                 
                 print(f"   ✅ Analysis complete:")
                 print(f"      - Total: {analysis_result['summary']['total_reviews']}")
@@ -1057,7 +768,7 @@ def api_analyze_sentiment():
                 results.append({
                     "id": product_id,
                     "success": True,
-                    "sentiment_analysis": analysis_result
+                    "sentiment_analysis": shape_analysis(analysis_result, **view)
                 })
             
             print(f"\n✅ ANALYSIS COMPLETE - Processed {len(results)} products")
@@ -1075,7 +786,7 @@ def api_analyze_sentiment():
             
             return jsonify({
                 "success": True,
-                "analysis": analysis_result,
+                "analysis": shape_analysis(analysis_result, **view),
                 "message": f"Analyzed {analysis_result['summary']['total_reviews']} reviews"
             })
         
@@ -1094,184 +805,6 @@ def api_analyze_sentiment():
             "error": str(e)
         }), 500
 
-def analyze_reviews_comprehensive(reviews):
-    """Comprehensive sentiment analysis for reviews"""
-    from textblob import TextBlob
-    
-    analyzed_reviews = []
-    sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
-    sentiment_scores = []
-    
-    print(f"🔍 Analyzing {len(reviews)} reviews...")
-    
-    for i, review in enumerate(reviews):
-        # Extract text from review (handle both string and object formats)
-        if isinstance(review, dict):
-            text = review.get('text', '') or review.get('review', '') or str(review)
-            reviewer = review.get('reviewer', 'Anonymous')
-            date = review.get('date', 'Unknown')
-            rating = review.get('rating', None)
-        else:
-            text = str(review)
-            reviewer = 'Anonymous'
-            date = 'Unknown'
-            rating = None
-        
-        # Clean and validate text
-        if not text or len(text.strip()) < 3:
-            continue
-        
-        text = text.strip()
-        
-        # Analyze sentiment with TextBlob
-        try:
-            blob = TextBlob(text)
-            polarity = blob.sentiment.polarity
-            subjectivity = blob.sentiment.subjectivity
-            
-            # Enhanced sentiment classification
-            if polarity > 0.2:
-                sentiment = "positive"
-                score = min(100, int(60 + (polarity * 40)))  # 60-100 range
-            elif polarity < -0.2:
-                sentiment = "negative" 
-                score = max(0, int(40 + (polarity * 40)))   # 0-40 range
-            else:
-                sentiment = "neutral"
-                score = 50  # Middle ground
-            
-            # Calculate confidence based on polarity strength
-            confidence = min(95, int((abs(polarity) * 80) + 50))
-            
-            sentiment_counts[sentiment] += 1
-            sentiment_scores.append(score)
-            
-            analyzed_review = {
-                "text": text,
-                "reviewer": reviewer,
-                "date": date,
-                "rating": rating,
-                "sentiment_analysis": {
-                    "sentiment": sentiment,
-                    "score": score,
-                    "confidence": confidence,
-                    "polarity": round(polarity, 3),
-                    "subjectivity": round(subjectivity, 3)
-                }
-            }
-            
-            analyzed_reviews.append(analyzed_review)
-            
-            print(f"   Review {i+1}: {sentiment} (score: {score}, polarity: {polarity:.3f})")
-            
-        except Exception as e:
-            print(f"   ⚠️ Error analyzing review {i+1}: {e}")
-            continue
-    
-    # Calculate comprehensive summary
-    total_reviews = len(analyzed_reviews)
-    
-    if total_reviews == 0:
-        return {
-            "analyzed_reviews": [],
-            "summary": {
-                "total_reviews": 0,
-                "positive_reviews": 0,
-                "negative_reviews": 0,
-                "neutral_reviews": 0,
-                "positive_percentage": 0,
-                "negative_percentage": 0,
-                "neutral_percentage": 0,
-                "sentiment_score": 0,
-                "overall_sentiment": "neutral",
-                "average_confidence": 0
-            },
-            "insights": ["No valid reviews available for analysis"],
-            "analysis_timestamp": datetime.now().isoformat()
-        }
-    
-    # Calculate percentages
-    positive_percent = round((sentiment_counts["positive"] / total_reviews) * 100, 1)
-    negative_percent = round((sentiment_counts["negative"] / total_reviews) * 100, 1)
-    neutral_percent = round((sentiment_counts["neutral"] / total_reviews) * 100, 1)
-    
-    # Calculate overall sentiment score (weighted average)
-    avg_sentiment_score = round(sum(sentiment_scores) / len(sentiment_scores), 1) if sentiment_scores else 50
-    
-    # Determine overall sentiment
-    if positive_percent > negative_percent and positive_percent > neutral_percent:
-        overall_sentiment = "positive"
-    elif negative_percent > positive_percent and negative_percent > neutral_percent:
-        overall_sentiment = "negative"
-    else:
-        overall_sentiment = "neutral"
-    
-    # Calculate average confidence
-    avg_confidence = round(sum(r["sentiment_analysis"]["confidence"] for r in analyzed_reviews) / total_reviews, 1)
-    
-    print(f"📊 FINAL RESULTS:")
-    print(f"   Total: {total_reviews}")
-    print(f"   Positive: {positive_percent}% ({sentiment_counts['positive']})")
-    print(f"   Negative: {negative_percent}% ({sentiment_counts['negative']})") 
-    print(f"   Neutral: {neutral_percent}% ({sentiment_counts['neutral']})")
-    print(f"   Overall: {overall_sentiment} (score: {avg_sentiment_score})")
-    
-    return {
-        "analyzed_reviews": analyzed_reviews,
-        "summary": {
-            "total_reviews": total_reviews,
-            "positive_reviews": sentiment_counts["positive"],
-            "negative_reviews": sentiment_counts["negative"],
-            "neutral_reviews": sentiment_counts["neutral"],
-            "positive_percentage": positive_percent,
-            "negative_percentage": negative_percent,
-            "neutral_percentage": neutral_percent,
-            "sentiment_score": avg_sentiment_score,
-            "overall_sentiment": overall_sentiment,
-            "average_confidence": avg_confidence
-        },
-        "insights": generate_detailed_insights(sentiment_counts, total_reviews, avg_sentiment_score),
-        "analysis_timestamp": datetime.now().isoformat()
-    }
-def generate_detailed_insights(sentiment_counts, total_reviews, sentiment_score):
-    """Generate detailed insights based on analysis"""
-    insights = []
-    
-    positive = sentiment_counts["positive"]
-    negative = sentiment_counts["negative"] 
-    neutral = sentiment_counts["neutral"]
-    
-    if total_reviews == 0:
-        return ["No reviews available for analysis"]
-    
-    # Sentiment strength insights
-    if sentiment_score >= 70:
-        insights.append("Strong positive customer sentiment")
-    elif sentiment_score <= 30:
-        insights.append("Significant negative customer feedback")
-    else:
-        insights.append("Moderate customer sentiment")
-    
-    # Distribution insights
-    if positive > negative and positive > neutral:
-        insights.append(f"Positive reviews dominate ({positive}/{total_reviews})")
-        if positive >= total_reviews * 0.7:
-            insights.append("Excellent customer satisfaction levels")
-    elif negative > positive and negative > neutral:
-        insights.append(f"Negative feedback requires attention ({negative}/{total_reviews})")
-        if negative >= total_reviews * 0.4:
-            insights.append("Urgent action needed to address concerns")
-    else:
-        insights.append("Mixed customer opinions with neutral dominance")
-    
-    # Additional insights based on ratios
-    if positive >= total_reviews * 0.8:
-        insights.append("Outstanding product reception")
-    elif negative >= total_reviews * 0.5:
-        insights.append("Critical issues need immediate resolution")
-    
-    return insights
-  
 def handle_legacy_sentiment_analysis(reviews):
     """Handle old format where just reviews array is sent"""
     analyzed = []
@@ -1447,143 +980,529 @@ def generate_insights_simple(sentiment_counts, total, sentiment_score):
 @app.route('/api/complete-analysis', methods=['POST'])
 def api_complete_analysis():
     """Complete workflow: scrape reviews and analyze sentiment for a single product"""
+    try:
+        return run_pipeline("complete-analysis", request.get_json())
+    except Exception as e:
+        print(f"Error in api_complete_analysis: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"success": False, "error": f"Failed to complete analysis: {str(e)}"}), 500
+    
+
+@app.route('/api/bulk-analysis', methods=['POST'])
+def api_bulk_analysis():
+    """Scrape and analyze many products in one job with shared browsers and one analysis pass"""
+    try:
+        return run_pipeline("bulk-analysis", request.get_json())
+    except Exception as e:
+        print(f"Error in api_bulk_analysis: {e}")
+        return jsonify({"success": False, "error": f"Failed to run bulk analysis: {str(e)}"}), 500
+
+@app.route('/api/cache/stats', methods=['GET'])
+def api_cache_stats():
+    """Hit rates and size of the complete-analysis result cache and the product catalog"""
+    try:
+        return jsonify({
+            "success": True,
+            "analysis_cache": analysis_cache.stats(),
+            "product_catalog": product_catalog.stats()
+        })
+    except Exception as e:
+        print(f"Error in api_cache_stats: {e}")
+        return jsonify({"success": False, "error": f"Failed to get cache stats: {str(e)}"}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def api_list_jobs():
+    """The caller's recent background jobs, newest first"""
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        jobs = job_manager.list(status=request.args.get('status'), limit=limit, user_key=request_user_key())
+        return jsonify({"success": True, "jobs": jobs, "count": len(jobs)})
+    except ValueError:
+        return jsonify({"success": False, "error": "limit must be an integer"}), 400
+    except Exception as e:
+        print(f"Error in api_list_jobs: {e}")
+        return jsonify({"success": False, "error": f"Failed to list jobs: {str(e)}"}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@app.route('/api/status/<job_id>', methods=['GET'])
+def api_get_job(job_id):
+    """Status, progress and (once finished) the result of one of the caller's background jobs"""
+    try:
+        job = job_manager.get(job_id, user_key=request_user_key())
+        if not job:
+            return jsonify({"success": False, "error": "Job not found"}), 404
+        return jsonify({"success": True, "job": job})
+    except Exception as e:
+        print(f"Error in api_get_job: {e}")
+        return jsonify({"success": False, "error": f"Failed to get job: {str(e)}"}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def api_cancel_job(job_id):
+    """Cancel a queued or running job; running jobs stop at the next page or product.
+    On a job shared by coalesced requests only the caller's subscription is dropped"""
+    try:
+        job = job_manager.cancel(
+            job_id, request.args.get('reason') or "cancelled by client", user_key=request_user_key()
+        )
+        if not job:
+            return jsonify({"success": False, "error": "Job not found"}), 404
+        return jsonify({"success": True, "job": job})
+    except Exception as e:
+        print(f"Error in api_cancel_job: {e}")
+        return jsonify({"success": False, "error": f"Failed to cancel job: {str(e)}"}), 500
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def api_job_events(job_id):
+    """Stream a job's events as Server-Sent Events, or NDJSON with ?format=ndjson"""
+    try:
+        user_key = request_user_key()
+        if not job_manager.get(job_id, include_result=False, user_key=user_key):
+            return jsonify({"success": False, "error": "Job not found"}), 404
+
+        ndjson = (request.args.get('format') == 'ndjson'
+                  or 'application/x-ndjson' in request.headers.get('Accept', ''))
+        # SSE clients resume with Last-Event-ID after a reconnect
+        after = request.headers.get('Last-Event-ID') or request.args.get('after') or '0'
+        if not after.isdigit():
+            return jsonify({"success": False, "error": "Last-Event-ID and after must be event ids"}), 400
+        after = int(after)
+
+        # With ?cancel_on_disconnect=1 a client that goes away gives up its subscription,
+        # and the job is cancelled once nobody else is waiting for it
+        cancel_on_disconnect = request_flag(None, 'cancel_on_disconnect')
+
+        def generate():
+            finished = False
+            try:
+                for event in job_manager.stream(job_id, after, heartbeat=5.0 if cancel_on_disconnect else 15.0):
+                    if event is None:
+                        yield '{"event": "heartbeat"}\n' if ndjson else ': keep-alive\n\n'
+                        continue
+                    finished = event['event'] == 'done'
+                    if ndjson:
+                        yield json.dumps(event, ensure_ascii=False) + "\n"
+                    else:
+                        yield (f"id: {event['id']}\nevent: {event['event']}\n"
+                               f"data: {json.dumps(event['data'], ensure_ascii=False)}\n\n")
+            finally:
+                if cancel_on_disconnect and not finished:
+                    job_manager.cancel(job_id, "client disconnected", release=True, user_key=user_key)
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson' if ndjson else 'text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception as e:
+        print(f"Error in api_job_events: {e}")
+        return jsonify({"success": False, "error": f"Failed to stream job events: {str(e)}"}), 500
+
+# WORKER API FOR JOB WORKERS ON OTHER HOSTS (see worker.py)
+def worker_token_required(f):
+    """Decorator to require the shared WORKER_TOKEN; the worker API is off when it is unset"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        expected = app.config['WORKER_TOKEN']
+        if not expected:
+            return jsonify({"success": False, "error": "Remote workers are disabled; set WORKER_TOKEN"}), 403
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {expected}"):
+            return jsonify({"success": False, "error": "Invalid worker token"}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+@app.route('/api/workers', methods=['GET'])
+def api_list_workers():
+    """Live job workers with their capabilities and running jobs"""
+    try:
+        workers = job_manager.workers()
+        return jsonify({"success": True, "workers": workers, "count": len(workers)})
+    except Exception as e:
+        print(f"Error in api_list_workers: {e}")
+        return jsonify({"success": False, "error": f"Failed to list workers: {str(e)}"}), 500
+
+@app.route('/api/workers/jobs', methods=['GET'])
+@worker_token_required
+def api_admin_list_jobs():
+    """Recent jobs of every user, for operators holding the worker token"""
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        jobs = job_manager.list(status=request.args.get('status'), limit=limit)
+        return jsonify({"success": True, "jobs": jobs, "count": len(jobs)})
+    except ValueError:
+        return jsonify({"success": False, "error": "limit must be an integer"}), 400
+    except Exception as e:
+        print(f"Error in api_admin_list_jobs: {e}")
+        return jsonify({"success": False, "error": f"Failed to list jobs: {str(e)}"}), 500
+
+@app.route('/api/workers/jobs/<job_id>', methods=['GET'])
+@worker_token_required
+def api_admin_get_job(job_id):
+    """Any job with its result, for operators holding the worker token"""
+    try:
+        job = job_manager.get(job_id)
+        if not job:
+            return jsonify({"success": False, "error": "Job not found"}), 404
+        return jsonify({"success": True, "job": job})
+    except Exception as e:
+        print(f"Error in api_admin_get_job: {e}")
+        return jsonify({"success": False, "error": f"Failed to get job: {str(e)}"}), 500
+
+@app.route('/api/workers/claim', methods=['POST'])
+@worker_token_required
+def api_worker_claim():
+    """Lease the next job a remote worker can run, waiting up to `wait` seconds for one"""
+    try:
+        data = request.get_json() or {}
+        worker_id = data.get('worker_id')
+        if not worker_id:
+            return jsonify({"success": False, "error": "worker_id is required"}), 400
+
+        capabilities = data.get('capabilities', [])
+        kinds = [kind for kind in job_manager.runnable_kinds(capabilities) if kind in data.get('kinds', [])]
+        job_manager.register_worker(worker_id, capabilities, kinds, int(data.get('slots', 1)))
+
+        deadline = time.monotonic() + min(float(data.get('wait', 0)), 30)
+        row = job_manager.claim(worker_id, kinds)
+        while row is None and time.monotonic() < deadline:
+            job_manager.queue.wait(min(job_manager.poll_interval, deadline - time.monotonic()))
+            row = job_manager.claim(worker_id, kinds)
+
+        if row is None:
+            return jsonify({"success": True, "job": None})
+        return jsonify({"success": True, "job": {
+            "id": row["id"],
+            "kind": row["kind"],
+            "params": json.loads(row["params"]),
+            "timeout": row["timeout"],
+            "cancel_requested": row["cancel_requested"],
+            "attempts": row["attempts"] + 1,
+            "lease_seconds": job_manager.lease_seconds
+        }})
+    except Exception as e:
+        print(f"Error in api_worker_claim: {e}")
+        return jsonify({"success": False, "error": f"Failed to claim job: {str(e)}"}), 500
+
+@app.route('/api/workers/jobs/<job_id>/heartbeat', methods=['POST'])
+@worker_token_required
+def api_worker_heartbeat(job_id):
+    """Renew a remote worker's lease and record the progress and events it buffered"""
+    try:
+        data = request.get_json() or {}
+        cancel_requested = job_manager.heartbeat(job_id, data.get('worker_id'), data.get('progress'))
+        if cancel_requested is None:
+            return jsonify({"success": False, "error": "Lease lost; the job was re-queued or finished"}), 409
+        for event in data.get('events', []):
+            job_manager.append_event(job_id, event['event'], event.get('data', {}))
+        return jsonify({"success": True, "cancel_requested": cancel_requested})
+    except Exception as e:
+        print(f"Error in api_worker_heartbeat: {e}")
+        return jsonify({"success": False, "error": f"Failed to record heartbeat: {str(e)}"}), 500
+
+@app.route('/api/workers/jobs/<job_id>/finish', methods=['POST'])
+@worker_token_required
+def api_worker_finish(job_id):
+    """Store the outcome of a job run by a remote worker"""
+    try:
+        data = request.get_json() or {}
+        if data.get('status') not in ('succeeded', 'failed', 'cancelled'):
+            return jsonify({"success": False, "error": "status must be succeeded, failed or cancelled"}), 400
+        finished = job_manager.finish(
+            job_id, data['status'], data.get('result'), int(data.get('status_code') or 200),
+            error=data.get('error'), owner=data.get('worker_id')
+        )
+        if not finished:
+            return jsonify({"success": False, "error": "Lease lost; the job was re-queued or finished"}), 409
+        # Remote workers cache nothing here, so fill this process's analysis cache
+        if data['status'] == 'succeeded' and job_manager.get(job_id, include_result=False)['kind'] == 'complete-analysis':
+            _, _, coalesce_key = PIPELINES['complete-analysis']
+            analysis_cache.put(coalesce_key(job_manager.params(job_id)), data.get('result'))
+        return jsonify({"success": True})
+    except Exception as e:
+        print(f"Error in api_worker_finish: {e}")
+        return jsonify({"success": False, "error": f"Failed to finish job: {str(e)}"}), 500
+
+@app.route('/api/tracking', methods=['POST'])
+def api_track():
+    """Track a product (product_url) or a category for scheduled re-crawls"""
     try:
         data = request.get_json()
         if not data:
             return jsonify({"success": False, "error": "No JSON data provided"}), 400
-        
-        # Extract product information
-        product_id = data.get('product_id', '')
-        product_title = data.get('product_title', '')
-        product_url = data.get('product_url', '')
-        max_reviews = data.get('max_reviews', 50)
-        
-        if not all([product_id, product_title, product_url]):
+
+        if data.get('product_url'):
+            kind, target = "product", data['product_url']
+        elif data.get('category'):
+            kind, target = "category", data['category']
+        else:
+            return jsonify({"success": False, "error": "product_url or category is required"}), 400
+
+        interval_hours = data.get('interval_hours', 24)
+        min_hours = app.config['RECRAWL_MIN_INTERVAL_HOURS']
+        if (isinstance(interval_hours, bool) or not isinstance(interval_hours, (int, float))
+                or not min_hours <= interval_hours <= 24 * 365):
             return jsonify({
-                "success": False, 
-                "error": "product_id, product_title, and product_url are required"
+                "success": False,
+                "error": f"interval_hours must be a number from {min_hours:g} to {24 * 365}"
             }), 400
-        
-        print(f"Starting complete analysis for: {product_title}")
-        
-        # Step 1: Scrape reviews
-        reviews = scrape_product_reviews(product_url, max_reviews)
-        
-        if not reviews:
+
+        max_products = data.get('max_products', 10)
+        if isinstance(max_products, bool) or not isinstance(max_products, int) or not 1 <= max_products <= SCRAPE_MAX_PRODUCTS:
             return jsonify({
                 "success": False,
-                "error": "No reviews found for this product"
-            }), 404
-        
-        # Step 2: Analyze sentiment directly (don't call the endpoint)
-        analyzed_reviews = []
-        sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
-        
-        for review in reviews:
-            review_text = review.get('text', '') if isinstance(review, dict) else str(review)
-            
-            if not review_text:
-                continue
-                
-            sentiment_result = analyze_sentiment(review_text)
-            sentiment_label = sentiment_result.get("sentiment", "neutral")
-            sentiment_counts[sentiment_label] = sentiment_counts.get(sentiment_label, 0) + 1
-            
-            analyzed_reviews.append({
-                "review": review_text,
-                "rating": review.get('rating', 'No rating') if isinstance(review, dict) else 'No rating',
-                "sentiment": sentiment_result,
-                "analyzed_at": datetime.now().isoformat()
-            })
-        
-        # Calculate summary
-        total_reviews = len(analyzed_reviews)
-        sentiment_summary = {
-            "positive": round((sentiment_counts["positive"] / total_reviews) * 100, 1) if total_reviews > 0 else 0,
-            "negative": round((sentiment_counts["negative"] / total_reviews) * 100, 1) if total_reviews > 0 else 0,
-            "neutral": round((sentiment_counts["neutral"] / total_reviews) * 100, 1) if total_reviews > 0 else 0
-        }
-        
-        max_sentiment = max(sentiment_summary.items(), key=lambda x: x[1])
-        overall_sentiment = max_sentiment[0]
-        
-        # Prepare complete result
-        complete_result = {
-            "product_id": product_id,
-            "product_title": product_title,
-            "product_url": product_url,
-            "reviews": reviews,
-            "analyzed_reviews": analyzed_reviews,
-            "sentiment_summary": sentiment_summary,
-            "overall_sentiment": overall_sentiment,
-            "analysis_id": f"analysis_{product_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "scraped_at": datetime.now().isoformat(),
-            "analyzed_at": datetime.now().isoformat(),
-            "total_reviews": total_reviews
-        }
-        
-        # Save complete result
-        filename = f"data/complete_analysis_{product_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(complete_result, f, indent=4, ensure_ascii=False)
-        
+                "error": f"max_products must be a whole number from 1 to {SCRAPE_MAX_PRODUCTS}"
+            }), 400
+
+        item = tracking_store.add(
+            kind, normalize_target(kind, target), request_user_key(), interval_hours * 3600,
+            title=data.get('title'), max_products=max_products
+        )
+        return jsonify({"success": True, "item": item}), 201
+    except Exception as e:
+        print(f"Error in api_track: {e}")
+        return jsonify({"success": False, "error": f"Failed to track item: {str(e)}"}), 500
+
+@app.route('/api/tracking', methods=['GET'])
+def api_list_tracked():
+    """The caller's tracked items with their merged sentiment summaries"""
+    try:
+        items = tracking_store.list(request_user_key())
+        return jsonify({"success": True, "items": items, "count": len(items)})
+    except Exception as e:
+        print(f"Error in api_list_tracked: {e}")
+        return jsonify({"success": False, "error": f"Failed to list tracked items: {str(e)}"}), 500
+
+@app.route('/api/tracking/<item_id>', methods=['GET'])
+def api_get_tracked(item_id):
+    """A tracked item with per-product summaries"""
+    try:
+        item = tracking_store.get(item_id, with_products=True, user_key=request_user_key())
+        if not item:
+            return jsonify({"success": False, "error": "Tracked item not found"}), 404
+        return jsonify({"success": True, "item": item})
+    except Exception as e:
+        print(f"Error in api_get_tracked: {e}")
+        return jsonify({"success": False, "error": f"Failed to get tracked item: {str(e)}"}), 500
+
+@app.route('/api/tracking/<item_id>', methods=['DELETE'])
+def api_untrack(item_id):
+    """Stop tracking an item and drop its stored summaries"""
+    try:
+        if not tracking_store.remove(item_id, user_key=request_user_key()):
+            return jsonify({"success": False, "error": "Tracked item not found"}), 404
+        return jsonify({"success": True, "message": "Item is no longer tracked"})
+    except Exception as e:
+        print(f"Error in api_untrack: {e}")
+        return jsonify({"success": False, "error": f"Failed to untrack item: {str(e)}"}), 500
+
+@app.route('/api/tracking/<item_id>/job', methods=['GET'])
+def api_tracked_job(item_id):
+    """The latest re-crawl job of a tracked item, including scheduled ones the caller didn't submit"""
+    try:
+        item = tracking_store.get(item_id, user_key=request_user_key())
+        job = job_manager.get(item["last_job_id"]) if item and item.get("last_job_id") else None
+        if not job:
+            return jsonify({"success": False, "error": "No re-crawl job for this item"}), 404
+        return jsonify({"success": True, "job": job})
+    except Exception as e:
+        print(f"Error in api_tracked_job: {e}")
+        return jsonify({"success": False, "error": f"Failed to get re-crawl job: {str(e)}"}), 500
+
+@app.route('/api/tracking/<item_id>/refresh', methods=['POST'])
+def api_refresh_tracked(item_id):
+    """Re-crawl a tracked item now instead of waiting for its schedule"""
+    try:
+        user_key = request_user_key()
+        if not tracking_store.get(item_id, user_key=user_key):
+            return jsonify({"success": False, "error": "Tracked item not found"}), 404
+        job = recrawl_scheduler.submit(item_id, priority=PRIORITY_NORMAL, user_key=user_key)
         return jsonify({
             "success": True,
-            "analysis": complete_result,
-            "file_saved": filename,
-            "message": f"Successfully completed analysis for {total_reviews} reviews"
-        })
-        
+            "job_id": job["id"],
+            "status": job["status"],
+            "status_url": f"/api/jobs/{job['id']}"
+        }), 202
+    except QueueFull as e:
+        response = jsonify({"success": False, "error": str(e), "retry_after": e.retry_after})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
     except Exception as e:
-        print(f"Error in api_complete_analysis: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"success": False, "error": f"Failed to complete analysis: {str(e)}"}), 500
-    
+        print(f"Error in api_refresh_tracked: {e}")
+        return jsonify({"success": False, "error": f"Failed to refresh tracked item: {str(e)}"}), 500
 
 @app.route('/api/products', methods=['GET'])
 @app.route('/api/products/<category>', methods=['GET'])
 def api_get_products(category=None):
     """API endpoint to get saved products"""
     try:
-        data_dir = "data"
-        products = []
-        
-        if category:
-            # Look for files specific to this category
-            pattern = f"products_{category}"
-            files = [f for f in os.listdir(data_dir) if f.startswith(pattern) and f.endswith('.json')]
-        else:
-            # Get all product files
-            files = [f for f in os.listdir(data_dir) if f.startswith('products_') and f.endswith('.json')]
-        
-        if not files:
-            return jsonify({
-                "success": True,
-                "products": [],
-                "message": "No saved products found",
-                "category": category
-            })
-        
-        # Load the most recent file
-        files.sort(reverse=True)  # Most recent first
-        latest_file = files[0]
-        
-        with open(os.path.join(data_dir, latest_file), 'r', encoding='utf-8') as f:
-            products = json.load(f)
-        
+        limit = min(max(int(request.args.get('limit', 200)), 1), 1000)
+        body, etag = product_catalog.listing(category, limit)
+        return conditional_response(body, etag, "no-cache")
+
+    except ValueError:
+        return jsonify({"success": False, "error": "limit must be an integer"}), 400
+    except Exception as e:
+        print(f"Error in api_get_products: {e}")
+        return jsonify({"success": False, "error": f"Failed to load products: {str(e)}"}), 500
+
+@app.route('/api/reviews', methods=['GET'])
+def api_get_reviews():
+    """Stored reviews of one product, optionally of one sentiment, with its latest analysis"""
+    try:
+        product_id = request.args.get('product_id', '')
+        if not product_id:
+            return jsonify({"success": False, "error": "product_id is required"}), 400
+        product = review_store.product(product_id)
+        if not product:
+            return jsonify({"success": False, "error": "Product not found"}), 404
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        reviews = review_store.reviews(product_id, sentiment=request.args.get('sentiment'), limit=limit, offset=offset)
         return jsonify({
             "success": True,
-            "products": products,
-            "count": len(products),
-            "source_file": latest_file,
+            "product": product,
+            "reviews": reviews,
+            "count": len(reviews),
+            "sentiment_counts": review_store.sentiment_counts(product_id),
+            "latest_analysis": review_store.latest_analysis(product_id)
+        })
+    except ValueError:
+        return jsonify({"success": False, "error": "limit and offset must be integers"}), 400
+    except Exception as e:
+        print(f"Error in api_get_reviews: {e}")
+        return jsonify({"success": False, "error": f"Failed to load reviews: {str(e)}"}), 500
+
+@app.route('/api/reviews/search', methods=['GET'])
+def api_search_reviews():
+    """Full-text search over stored reviews, best match first, with highlighted snippets"""
+    try:
+        text = request.args.get('q', '').strip()
+        query = text if request.args.get('syntax') == 'fts' else fts_query(text)
+        if not query:
+            return jsonify({"success": False, "error": "q is required"}), 400
+        limit = min(max(int(request.args.get('limit', 20)), 1), 200)
+        offset = max(int(request.args.get('offset', 0)), 0)
+        started = time.perf_counter()
+        try:
+            results = review_store.search_reviews(
+                query, sentiment=request.args.get('sentiment'), category=request.args.get('category'),
+                product_id=request.args.get('product_id'), limit=limit, offset=offset
+            )
+        except sqlite3.OperationalError as e:
+            return jsonify({"success": False, "error": f"Invalid search query: {str(e)}"}), 400
+        return jsonify({
+            "success": True,
+            "query": query,
+            "results": results,
+            "count": len(results),
+            "offset": offset,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        })
+    except ValueError:
+        return jsonify({"success": False, "error": "limit and offset must be integers"}), 400
+    except Exception as e:
+        print(f"Error in api_search_reviews: {e}")
+        return jsonify({"success": False, "error": f"Failed to search reviews: {str(e)}"}), 500
+
+@app.route('/api/trends', methods=['GET'])
+def api_sentiment_trend():
+    """Daily, weekly or monthly sentiment series of a product or a category, by review date"""
+    try:
+        product_id = request.args.get('product_id')
+        category = request.args.get('category')
+        granularity = request.args.get('granularity', 'day')
+        if bool(product_id) == bool(category):
+            return jsonify({"success": False, "error": "Pass exactly one of product_id or category"}), 400
+        if granularity not in TREND_GRANULARITIES:
+            return jsonify({"success": False, "error": f"granularity must be one of: {', '.join(TREND_GRANULARITIES)}"}), 400
+        try:
+            series = review_store.trend(
+                "product" if product_id else "category", product_id or category, granularity,
+                since=request.args.get('since'), until=request.args.get('until')
+            )
+        except ValueError:
+            return jsonify({"success": False, "error": "since and until must be dates like 2025-10-01"}), 400
+        return jsonify({
+            "success": True,
+            "product_id": product_id,
             "category": category,
-            "message": f"Loaded {len(products)} products from {latest_file}"
+            "granularity": granularity,
+            "series": series
         })
-        
     except Exception as e:
-        print(f"Error in api_get_products: {e}")
-        return jsonify({"success": False, "error": f"Failed to load products: {str(e)}"}), 500
+        print(f"Error in api_sentiment_trend: {e}")
+        return jsonify({"success": False, "error": f"Failed to load trend: {str(e)}"}), 500
+
+def run_export(params, job):
+    """Job body of POST /api/exports: write one dataset under EXPORT_DIR, then drop expired ones"""
+    export_id = params["export_id"]
+    out_dir = os.path.join(app.config['EXPORT_DIR'], export_id)
+    job.progress(stage="export")
+    try:
+        manifest = export_reviews(
+            review_store, out_dir, category=params.get('category'), since=params.get('since'),
+            until=params.get('until')
+        )
+    except Exception:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        raise
+    removed = remove_old_exports(app.config['EXPORT_DIR'], app.config['EXPORT_RETENTION_DAYS'], keep=export_id)
+    if removed:
+        print(f"🧹 Removed {len(removed)} export(s) older than {app.config['EXPORT_RETENTION_DAYS']:g} days")
+
+    manifest["export_id"] = export_id
+    del manifest["out_dir"]
+    for entry in manifest["files"]:
+        entry["url"] = f"/api/exports/{export_id}/{entry['path']}"
+    return {
+        "success": True,
+        "export": manifest,
+        "message": f"Exported {manifest['rows']} reviews into {len(manifest['files'])} Parquet file(s)"
+    }
+
+# Exports write to this host's EXPORT_DIR, so only local workers run them
+job_manager.register("export", run_export)
+
+@app.route('/api/exports', methods=['POST'])
+def api_create_export():
+    """Queue an export of stored reviews and their sentiment as a Parquet dataset partitioned by category
+    and date (202 + job id; the finished job's result lists the download URLs)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        params = {}
+        for name in ('category', 'since', 'until'):
+            if data.get(name) is not None and not isinstance(data[name], str):
+                return jsonify({"success": False, "error": f"{name} must be a string"}), 400
+            params[name] = data.get(name) or None
+        require_pyarrow()
+
+        params["export_id"] = f"reviews_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        job = job_manager.submit("export", params, user_key=request_user_key())
+        return jsonify({
+            "success": True,
+            "job_id": job["id"],
+            "export_id": params["export_id"],
+            "status": job["status"],
+            "status_url": f"/api/jobs/{job['id']}",
+            "message": "export job queued"
+        }), 202
+    except ExportUnavailable as e:
+        return jsonify({"success": False, "error": str(e)}), 501
+    except QueueFull as e:
+        response = jsonify({"success": False, "error": str(e), "retry_after": e.retry_after})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+    except Exception as e:
+        print(f"Error in api_create_export: {e}")
+        return jsonify({"success": False, "error": f"Failed to queue export: {str(e)}"}), 500
+
+@app.route('/api/exports/<export_id>/<path:filename>', methods=['GET'])
+def api_download_export(export_id, filename):
+    """One Parquet file of an export"""
+    if not re.fullmatch(r'reviews_[0-9_]+', export_id):
+        return jsonify({"success": False, "error": "Export not found"}), 404
+    return send_from_directory(os.path.abspath(os.path.join(app.config['EXPORT_DIR'], export_id)), filename,
+                               mimetype='application/vnd.apache.parquet', as_attachment=True)
 
 @app.route('/api/save-products', methods=['POST'])
 def api_save_products():
@@ -1599,10 +1518,12 @@ def api_save_products():
         if not products:
             return jsonify({"success": False, "error": "Products list is required"}), 400
         
-        # Save to JSON file
-        filename = f"data/products_{category}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(products, f, indent=4, ensure_ascii=False)
+        saved_at = datetime.now().isoformat()
+        filename = record_log.append_many("products", (
+            {"type": "product", "category": category, "saved_at": saved_at, "product": product}
+            for product in products
+        ))
+        review_store.upsert_products(products, category=category)
         
         return jsonify({
             "success": True,
@@ -1615,35 +1536,59 @@ def api_save_products():
         print(f"Error in api_save_products: {e}")
         return jsonify({"success": False, "error": f"Failed to save products: {str(e)}"}), 500
 
+# Predefined popular categories; the response never changes, so it is serialized once
+CATEGORIES = [
+    {"label": "Men's Sports Shoes", "value": "mens-footwear-sports-shoes", "category": "footwear"},
+    {"label": "Women's Kurtis", "value": "women-apparel-kurtis", "category": "apparel"},
+    {"label": "Mobile Phones", "value": "mobiles-mobile-phones", "category": "electronics"},
+    {"label": "Laptops", "value": "computers-laptops", "category": "electronics"},
+    {"label": "Home Decor", "value": "home-garden-home-decor", "category": "home"},
+    {"label": "Watches", "value": "jewellery-watches", "category": "accessories"},
+    {"label": "Kitchen Appliances", "value": "home-kitchen-appliances", "category": "appliances"},
+    {"label": "Men's T-Shirts", "value": "men-clothing-shirts-t-shirts", "category": "apparel"},
+    {"label": "Women's Sarees", "value": "women-apparel-sarees", "category": "apparel"},
+    {"label": "Books", "value": "books", "category": "books"},
+    {"label": "Beauty Products", "value": "health-beauty", "category": "beauty"},
+    {"label": "Sports Equipment", "value": "sports-fitness", "category": "sports"}
+]
+CATEGORIES_RESPONSE = prepared_json({"success": True, "categories": CATEGORIES, "count": len(CATEGORIES)})
+
 @app.route('/api/categories', methods=['GET'])
 def api_get_categories():
     """API endpoint to get available categories"""
     try:
-        # Predefined popular categories
-        categories = [
-            {"label": "Men's Sports Shoes", "value": "mens-footwear-sports-shoes", "category": "footwear"},
-            {"label": "Women's Kurtis", "value": "women-apparel-kurtis", "category": "apparel"},
-            {"label": "Mobile Phones", "value": "mobiles-mobile-phones", "category": "electronics"},
-            {"label": "Laptops", "value": "computers-laptops", "category": "electronics"},
-            {"label": "Home Decor", "value": "home-garden-home-decor", "category": "home"},
-            {"label": "Watches", "value": "jewellery-watches", "category": "accessories"},
-            {"label": "Kitchen Appliances", "value": "home-kitchen-appliances", "category": "appliances"},
-            {"label": "Men's T-Shirts", "value": "men-clothing-shirts-t-shirts", "category": "apparel"},
-            {"label": "Women's Sarees", "value": "women-apparel-sarees", "category": "apparel"},
-            {"label": "Books", "value": "books", "category": "books"},
-            {"label": "Beauty Products", "value": "health-beauty", "category": "beauty"},
-            {"label": "Sports Equipment", "value": "sports-fitness", "category": "sports"}
-        ]
-        
+        body, etag = CATEGORIES_RESPONSE
+        return conditional_response(body, etag, "public, max-age=3600")
+
+    except Exception as e:
+        print(f"Error in api_get_categories: {e}")
+        return jsonify({"success": False, "error": f"Failed to get categories: {str(e)}"}), 500
+
+@app.route('/api/categories/<category>/leaderboard', methods=['GET'])
+def api_category_leaderboard(category):
+    """Top or bottom products of a category by sentiment score, review volume or negative share"""
+    try:
+        metric = request.args.get('by', 'score')
+        order = request.args.get('order', 'top')
+        if metric not in LEADERBOARD_METRICS:
+            return jsonify({"success": False, "error": f"by must be one of: {', '.join(LEADERBOARD_METRICS)}"}), 400
+        if order not in ('top', 'bottom'):
+            return jsonify({"success": False, "error": "order must be top or bottom"}), 400
+        k = min(max(int(request.args.get('k', 10)), 1), 100)
+        min_reviews = max(int(request.args.get('min_reviews', 1)), 1)
         return jsonify({
             "success": True,
-            "categories": categories,
-            "count": len(categories)
+            "category": category,
+            "by": metric,
+            "order": order,
+            "category_summary": review_store.category_summary(category),
+            "products": review_store.leaderboard(category, metric, order, k, min_reviews)
         })
-        
+    except ValueError:
+        return jsonify({"success": False, "error": "k and min_reviews must be integers"}), 400
     except Exception as e:
-        print(f"Error in api_get_categories: {e}")
-        return jsonify({"success": False, "error": f"Failed to get categories: {str(e)}"}), 500
+        print(f"Error in api_category_leaderboard: {e}")
+        return jsonify({"success": False, "error": f"Failed to build leaderboard: {str(e)}"}), 500
 
 if __name__ == '__main__':
     print("🚀 Starting Snapdeal Product Sentiment Analyzer API with Authentication...")
@@ -1681,10 +1626,24 @@ if __name__ == '__main__':
     print("    POST /api/scrape-reviews - Scrape reviews for a product") 
     print("    POST /api/analyze-sentiment - Analyze sentiment of reviews")
     print("    POST /api/complete-analysis - Complete analysis workflow")
+    print("    POST /api/bulk-analysis - Complete analysis of many products in one job")
+    print("    (scrape/complete endpoints return 202 + job_id; pass ?wait=1 to run inline)")
     print("    GET  /api/products - Get all saved products")
     print("    GET  /api/products/<category> - Get products by category")
     print("    POST /api/save-products - Save products")
     print("    GET  /api/categories - Get available categories")
+    print("    GET  /api/scraper/selector-stats - Selector hit rates and timings")
+    print("    GET  /api/cache/stats - Analysis result cache hit rates")
+    print("    GET  /api/workers - Live job workers and their capabilities")
+    print("    POST /api/workers/claim - Lease a job to a remote worker (WORKER_TOKEN)")
+    print("    POST /api/tracking - Track a product or category for scheduled re-crawls")
+    print("    GET  /api/tracking[/<item_id>] - Tracked items and their sentiment summaries")
+    print("    POST /api/tracking/<item_id>/refresh - Re-crawl a tracked item now")
+    print("    DELETE /api/tracking/<item_id> - Stop tracking")
+    print("    GET  /api/jobs - Recent background jobs")
+    print("    GET  /api/jobs/<job_id> - Job status, progress and result")
+    print("    DELETE /api/jobs/<job_id> - Cancel a job")
+    print("    GET  /api/jobs/<job_id>/events - Live job events (SSE, or NDJSON with ?format=ndjson)")
     print(f"\n🌐 Integrated API is running on http://localhost:5000")
     print("🔧 CORS enabled for: http://localhost:3000, http://localhost:4028, http://localhost:5173")
     
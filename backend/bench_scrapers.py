@@ -0,0 +1,165 @@
+# backend/bench_scrapers.py
+"""Offline scraper benchmark against the local replay server.
+
+Usage:
+  python bench_scrapers.py [--category men-apparel-shirts] [--iterations 5]
+                           [--reviews <product_url> ...] [--dir recordings | --archive data/archive]
+                           [--latency 0.05] [--error-rate 0.0] [--json bench.json]
+
+The listing scraper always runs. Review scraping runs only when product URLs
+are passed with --reviews, because it needs a local Chrome. No request leaves
+the machine. Mock products from the scraper's fallback are reported apart from
+parsed ones, and the run fails if nothing was parsed.
+"""
+import argparse
+import json
+import sys
+import time
+
+import scrape_products
+from replay_server import ReplayServer, DEFAULT_PAGE
+from selector_cache import selector_cache
+
+
+def bench_listing(server, category, max_products, iterations):
+    """Run the requests-based listing scraper and count pages and products.
+    Mock products the scraper falls back to when parsing fails are counted separately"""
+    generate_mock = scrape_products.generate_category_mock_data
+    fallbacks = []
+
+    def counting_mock(*args, **kwargs):
+        mock = generate_mock(*args, **kwargs)
+        fallbacks.append(len(mock))
+        return mock
+
+    start_requests = server.request_count
+    products = 0
+    scrape_products.generate_category_mock_data = counting_mock
+    start = time.perf_counter()
+    try:
+        for _ in range(iterations):
+            products += len(scrape_products.scrape_snapdeal_products(category, max_products))
+    finally:
+        scrape_products.generate_category_mock_data = generate_mock
+    elapsed = time.perf_counter() - start
+    pages = server.request_count - start_requests
+    fallback_products = sum(fallbacks)
+    products -= fallback_products
+    return {
+        "iterations": iterations,
+        "pages": pages,
+        "products": products,
+        "fallback_runs": len(fallbacks),
+        "fallback_products": fallback_products,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0,
+        "products_per_sec": round(products / elapsed, 2) if elapsed else 0
+    }
+
+
+def bench_reviews(server, product_urls, iterations):
+    """Run the Selenium review scraper with one shared driver"""
+    driver = scrape_products.setup_driver()
+    start_requests = server.request_count
+    reviews = 0
+    start = time.perf_counter()
+    try:
+        for _ in range(iterations):
+            for url in product_urls:
+                reviews += len(scrape_products.scrape_product_reviews_selenium(url, driver=driver))
+    finally:
+        driver.quit()
+    elapsed = time.perf_counter() - start
+    pages = server.request_count - start_requests
+    return {
+        "iterations": iterations,
+        "products": len(product_urls) * iterations,
+        "pages": pages,
+        "reviews": reviews,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0,
+        "reviews_per_sec": round(reviews / elapsed, 2) if elapsed else 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against recorded pages")
+    parser.add_argument("--category", default="men-apparel-shirts")
+    parser.add_argument("--max-products", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--reviews", nargs="*", default=[], help="Product URLs for the review scraper")
+    parser.add_argument("--dir", help="Recordings directory with an optional manifest.json")
+    parser.add_argument("--archive", help="Raw page archive directory to replay")
+    parser.add_argument("--default-page", default=DEFAULT_PAGE)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--min-pages-per-sec", type=float, help="Exit non-zero if listing throughput drops below this")
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        recordings_dir=args.dir,
+        archive_dir=args.archive,
+        default_page=args.default_page,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed
+    ).start()
+
+    scrape_products.SNAPDEAL_BASE_URL = server.base_url
+    scrape_products.SCRAPER_DELAY_SCALE = 0
+    scrape_products.stage_timer.reset()
+    selector_cache.reset()
+
+    results = {"base_url": server.base_url}
+    try:
+        results["listing"] = bench_listing(server, args.category, args.max_products, args.iterations)
+        if args.reviews:
+            results["reviews"] = bench_reviews(server, args.reviews, args.iterations)
+    finally:
+        server.stop()
+
+    results["stages"] = scrape_products.stage_timer.snapshot()
+    results["selectors"] = selector_cache.stats()
+    results["server"] = {
+        "requests": server.request_count,
+        "errors": server.error_count,
+        "bytes_served": server.bytes_served
+    }
+
+    print("\n" + "=" * 70)
+    print("SCRAPER BENCHMARK")
+    print("=" * 70)
+    listing = results["listing"]
+    print(f"Listing: {listing['pages']} pages, {listing['products']} products in {listing['seconds']}s "
+          f"({listing['pages_per_sec']} pages/sec)")
+    if listing["fallback_runs"]:
+        print(f"⚠️  {listing['fallback_runs']} of {listing['iterations']} runs fell back to mock data "
+              f"({listing['fallback_products']} mock products, not counted above)")
+    if "reviews" in results:
+        reviews = results["reviews"]
+        print(f"Reviews: {reviews['pages']} pages, {reviews['reviews']} reviews in {reviews['seconds']}s "
+              f"({reviews['pages_per_sec']} pages/sec, {reviews['reviews_per_sec']} reviews/sec)")
+    print("\nStages:")
+    for name, stats in sorted(results["stages"].items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"  {name:<20} {stats['count']:>6} calls  {stats['total_ms']:>10.2f} ms  avg {stats['avg_ms']:.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved to: {args.json}")
+
+    if not listing["products"]:
+        print("❌ The listing scraper parsed no products; check the recordings and selectors")
+        sys.exit(1)
+
+    if args.min_pages_per_sec is not None and listing["pages_per_sec"] < args.min_pages_per_sec:
+        print(f"❌ Listing throughput {listing['pages_per_sec']} pages/sec is below {args.min_pages_per_sec}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
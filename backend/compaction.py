@@ -0,0 +1,262 @@
+# backend/compaction.py
+"""Compaction of scraped review files into the per-product review history.
+
+Every review scrape leaves a reviews_bulk_*.json file (or, since the record
+logs, reviews_<YYYYMMDD>.jsonl) that repeats products and reviews seen before.
+Compaction merges each file into the review store, whose reviews are keyed by
+stable review hash, so each product ends up with one deduplicated history.
+It then applies the retention policy to the file:
+
+    keep      leave it in place (it is not merged again unless it changes)
+    archive   gzip it into the archive directory and remove the original
+    delete    remove it
+
+Files are read as streams, one product at a time, so memory stays bounded by
+the largest single product rather than the file. Today's record log is still
+being appended to and is never touched. Files younger than `min_age_days` are
+merged but kept.
+
+    python compaction.py [--retention archive] [--min-age-days 7] [--dry-run]
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+from persistence import read_records
+from review_store import review_store, ReviewStore
+
+RETENTION_POLICIES = ("keep", "archive", "delete")
+BULK_FILE = re.compile(r'^reviews_bulk_(\d{8})_\d{6}\.json$')
+REVIEW_LOG = re.compile(r'^reviews_(\d{8})\.jsonl(\.gz|\.zst)?$')
+LOCK_NAME = ".compaction.lock"
+# A lock left behind by a crashed run is taken over after this long
+STALE_LOCK_SECONDS = 6 * 3600
+
+
+def iter_bulk_results(path, chunk_size=1 << 16):
+    """Yield the entries of a reviews_bulk_*.json file's "results" array one at a time,
+    reading the file in chunks so only one product's reviews are held in memory"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+
+        def fill(size=chunk_size):
+            nonlocal buffer
+            chunk = f.read(size)
+            buffer += chunk
+            return bool(chunk)
+
+        while True:
+            key = buffer.find('"results"')
+            start = buffer.find("[", key) if key >= 0 else -1
+            if start >= 0:
+                break
+            if not fill():
+                return
+        pos = start + 1
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                if not fill():
+                    raise ValueError(f"{path} ends inside its results array")
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Most likely an entry cut by the chunk boundary; grow geometrically to stay linear
+                if not fill(max(chunk_size, len(buffer) - pos)):
+                    raise
+                continue
+            yield item
+            buffer, pos = buffer[end:], 0
+
+
+def compaction_sources(data_dir, today=None):
+    """(path, file date) of the review files compaction may merge, oldest first"""
+    today = (today or datetime.now()).strftime("%Y%m%d")
+    sources = []
+    for name in sorted(os.listdir(data_dir)) if os.path.isdir(data_dir) else []:
+        log = REVIEW_LOG.match(name)
+        match = BULK_FILE.match(name) or log
+        if not match:
+            continue
+        if log and log.group(1) >= today:
+            continue  # today's record log is still being written
+        sources.append((os.path.join(data_dir, name), datetime.strptime(match.group(1), "%Y%m%d")))
+    return sources
+
+
+def _product_results(path):
+    """Per-product review results of a bulk file or record log"""
+    if BULK_FILE.match(os.path.basename(path)):
+        return iter_bulk_results(path)
+    return (record for record in read_records(path) if record.get("type") == "product_reviews")
+
+
+def merge_file(store, path):
+    """Merge one file's reviews into the store; returns the number of reviews read"""
+    fallback = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+    reviews = 0
+    for result in _product_results(path):
+        if result.get("url") and result.get("reviews"):
+            reviews += store.upsert_reviews(result, result["reviews"], scraped_at=result.get("scraped_at") or fallback)
+    return reviews
+
+
+def _archive(path, archive_dir):
+    """Move a file into the archive, gzip-compressed unless it already is"""
+    os.makedirs(archive_dir, exist_ok=True)
+    name = os.path.basename(path)
+    if name.endswith((".gz", ".zst")):
+        target = os.path.join(archive_dir, name)
+        shutil.move(path, target)
+        return target
+    target = os.path.join(archive_dir, name + ".gz")
+    partial = target + ".partial"
+    with open(path, "rb") as src, gzip.open(partial, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    with open(partial, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(partial, target)
+    os.remove(path)
+    return target
+
+
+def _acquire_lock(data_dir):
+    path = os.path.join(data_dir, LOCK_NAME)
+    try:
+        if time.time() - os.path.getmtime(path) > STALE_LOCK_SECONDS:
+            os.remove(path)
+    except OSError:
+        pass
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return path
+    except FileExistsError:
+        return None
+
+
+def compact(store, data_dir="data", retention="archive", archive_dir=None, min_age_days=7, dry_run=False,
+            now=None):
+    """Merge review files into the store and apply the retention policy; returns totals"""
+    if retention not in RETENTION_POLICIES:
+        raise ValueError(f"Unknown retention policy {retention!r}; use one of {', '.join(RETENTION_POLICIES)}")
+    now = now or datetime.now()
+    archive_dir = archive_dir or os.path.join(data_dir, "archive", "reviews")
+    totals = {"files": 0, "merged": 0, "reviews_read": 0, "new_reviews": 0, "archived": 0, "deleted": 0,
+              "bytes_freed": 0, "failed": 0}
+
+    lock = None if dry_run else _acquire_lock(data_dir)
+    if not dry_run and lock is None:
+        print("⏭️  Another compaction is running, skipped")
+        return dict(totals, skipped="locked")
+
+    reviews_before = store.stats()["reviews"]
+    try:
+        for path, file_date in compaction_sources(data_dir, now):
+            totals["files"] += 1
+            st = os.stat(path)
+            name = os.path.basename(path)
+            action = retention if file_date <= now - timedelta(days=min_age_days) else "keep"
+            if dry_run:
+                print(f"  {name}: {action}")
+                continue
+
+            if not store.is_compacted(name, st.st_size, st.st_mtime_ns):
+                try:
+                    read = merge_file(store, path)
+                except (OSError, ValueError) as e:
+                    print(f"  ✗ Could not merge {name}, left in place: {e}")
+                    totals["failed"] += 1
+                    continue
+                store.mark_compacted(name, st.st_size, st.st_mtime_ns, read, action)
+                totals["merged"] += 1
+                totals["reviews_read"] += read
+
+            if action == "archive":
+                _archive(path, archive_dir)
+                totals["archived"] += 1
+                totals["bytes_freed"] += st.st_size
+            elif action == "delete":
+                os.remove(path)
+                totals["deleted"] += 1
+                totals["bytes_freed"] += st.st_size
+    finally:
+        if lock:
+            os.remove(lock)
+
+    totals["new_reviews"] = store.stats()["reviews"] - reviews_before
+    return totals
+
+
+class CompactionScheduler:
+    """Runs compaction on a background thread every `interval_hours`"""
+
+    def __init__(self, store, data_dir="data", interval_hours=24, retention="archive", min_age_days=7,
+                 first_delay=60):
+        self.store = store
+        self.data_dir = data_dir
+        self.interval_hours = interval_hours
+        self.retention = retention
+        self.min_age_days = min_age_days
+        self.first_delay = first_delay
+        self.last_run = None
+        self._start_lock = threading.Lock()
+        self._started_pid = None
+
+    def start(self):
+        if self.interval_hours <= 0 or self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            threading.Thread(target=self._loop, name="review-compaction", daemon=True).start()
+            self._started_pid = os.getpid()
+            print(f"🗜️  Review compaction every {self.interval_hours}h ({self.retention} after {self.min_age_days} days)")
+
+    def run(self):
+        totals = compact(self.store, self.data_dir, self.retention, min_age_days=self.min_age_days)
+        self.last_run = dict(totals, finished_at=datetime.now().isoformat())
+        if totals["merged"] or totals["archived"] or totals["deleted"]:
+            print(f"🗜️  Compacted {totals['merged']} file(s): {totals['new_reviews']} new reviews, "
+                  f"{totals['archived']} archived, {totals['deleted']} deleted")
+        return totals
+
+    def _loop(self):
+        stop = threading.Event()
+        delay = self.first_delay
+        while not stop.wait(delay):
+            delay = self.interval_hours * 3600
+            try:
+                self.run()
+            except Exception as e:
+                print(f"⚠️  Review compaction failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge review files into the per-product review history")
+    parser.add_argument("--data", default="data", help="directory with reviews_bulk_*.json files and record logs")
+    parser.add_argument("--db", default=None, help="review store (default STORE_DB_PATH or data/store.db)")
+    parser.add_argument("--retention", choices=RETENTION_POLICIES, default="archive")
+    parser.add_argument("--min-age-days", type=float, default=7, help="files younger than this are merged but kept")
+    parser.add_argument("--archive-dir", default=None, help="default <data>/archive/reviews")
+    parser.add_argument("--dry-run", action="store_true", help="only list what would happen to each file")
+    args = parser.parse_args()
+
+    store = ReviewStore(args.db) if args.db else review_store
+    totals = compact(store, args.data, args.retention, args.archive_dir, args.min_age_days, args.dry_run)
+    print(json.dumps(totals, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# backend/http_cache.py
+"""Pre-serialized JSON bodies with ETags for conditional GETs.
+
+A body is serialized once, when its data changes. The ETag is a hash of those
+bytes. A client that sends the ETag back in If-None-Match gets an empty 304
+while the data is unchanged, so polling dashboards cost neither
+serialization nor transfer.
+
+Large JSON bodies are compressed for clients that accept it: brotli when
+the optional `brotli` package is installed, otherwise gzip. Compressed copies
+of prepared bodies are kept by ETag, so they are compressed only once.
+
+The ETag is always sent weak (W/"...") and compared weakly. The same content
+goes out in several encodings, and a 304 must carry the same validator as the
+200 it stands for, whichever encoding that 200 had.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+try:
+    import brotli  # optional, gzip is used without it
+except ImportError:
+    brotli = None
+
+COMPRESSED_CACHE_SIZE = 128
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+
+
+def prepared_json(payload):
+    """(body bytes, etag) of a JSON payload, for serving many times"""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def conditional_response(body, etag, cache_control, stable=True):
+    """200 with the prepared body, or 304 if the request's If-None-Match already has this ETag.
+    stable=False marks a body whose bytes vary under one ETag, so its compressed copy isn't kept"""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+        if stable:
+            response.compress_key = etag
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def compress_response(response, min_bytes=1024):
+    """after_request hook: compress a JSON body of at least min_bytes with the best encoding the client accepts"""
+    if response.mimetype != "application/json" and response.status_code != 304:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers or min_bytes <= 0):
+        return response
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if brotli else ["gzip"])
+    body = response.get_data()
+    if encoding is None or len(body) < min_bytes:
+        return response
+
+    # Only stable prepared bodies are kept; cached analyses vary in their cache field
+    etag = getattr(response, "compress_key", None)
+    cacheable = etag is not None
+    key = (etag, encoding)
+    compressed = None
+    if cacheable:
+        with _compressed_lock:
+            compressed = _compressed.get(key)
+            if compressed is not None:
+                _compressed.move_to_end(key)
+    if compressed is None:
+        compressed = _compress(body, encoding)
+        if cacheable:
+            with _compressed_lock:
+                _compressed[key] = compressed
+                while len(_compressed) > COMPRESSED_CACHE_SIZE:
+                    _compressed.popitem(last=False)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    return response
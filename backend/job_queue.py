@@ -0,0 +1,87 @@
+# backend/job_queue.py
+"""Wake-up channels that tell job workers new work may be available.
+
+The job table in SQLite stays the source of truth (claims, fairness, leases);
+a queue backend only decides how quickly idle workers notice a new job.
+LocalQueue wakes threads in this process and leaves other processes to poll.
+RedisQueue broadcasts over pub/sub, so workers in every process and on every
+host wake at once. It needs the optional `redis` package.
+"""
+import os
+import threading
+import time
+
+REDIS_CHANNEL = "sentimentpulse:jobs"
+REDIS_RECONNECT_DELAY = 5.0
+
+
+class LocalQueue:
+    """Wake-ups within this process; other processes find new jobs by polling"""
+    name = "local"
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def notify(self):
+        self._event.set()
+
+    def wait(self, timeout):
+        """Block until notified or timeout; True if woken by a notification"""
+        woken = self._event.wait(timeout)
+        self._event.clear()
+        return woken
+
+
+class RedisQueue(LocalQueue):
+    """Wake-ups broadcast over Redis pub/sub to workers in all processes and hosts"""
+    name = "redis"
+
+    def __init__(self, url, channel=REDIS_CHANNEL):
+        super().__init__()
+        import redis  # optional dependency, only needed for this backend
+        self._redis = redis.Redis.from_url(url)
+        self.channel = channel
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def notify(self):
+        super().notify()
+        try:
+            self._redis.publish(self.channel, "1")
+        except Exception as e:
+            print(f"⚠️  Redis notify failed, workers will poll: {e}")
+
+    def wait(self, timeout):
+        self._ensure_listener()
+        return super().wait(timeout)
+
+    def _ensure_listener(self):
+        """Subscribe once per process (a forked child needs its own subscription)"""
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            threading.Thread(target=self._listen, name="job-queue-redis", daemon=True).start()
+            self._listener_pid = os.getpid()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for _ in pubsub.listen():
+                    self._event.set()
+            except Exception as e:
+                print(f"⚠️  Redis subscription lost, retrying: {e}")
+                time.sleep(REDIS_RECONNECT_DELAY)
+
+
+def make_queue(url=None):
+    """Queue backend for a JOBS_QUEUE_URL: redis://... or rediss://... for Redis, else local"""
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisQueue(url)
+        except ImportError:
+            raise RuntimeError("JOBS_QUEUE_URL points at Redis but the redis package is not installed")
+    return LocalQueue()
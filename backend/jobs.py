@@ -0,0 +1,833 @@
+# backend/jobs.py
+"""SQLite-persisted background jobs with a bounded pool of worker threads.
+
+Jobs are claimed atomically from the database, so several processes sharing
+one JOBS_DB_PATH never run the same job twice. A claim is a lease that the
+worker renews with heartbeats; when a worker dies its lease runs out and the
+job is re-queued (or failed after max_attempts). Workers register the
+capabilities they offer ("browser", "model") and only claim kinds they can run,
+so scraping and inference capacity scale separately. Workers on other hosts
+claim through the API (see worker.py), and a queue backend (job_queue.py)
+decides how idle workers are woken.
+
+Jobs submitted with a coalesce key attach to an identical queued or running
+job instead of starting a second one (single-flight), so concurrent requests
+for the same product share one browser session and one result.
+
+Admission control bounds the queue globally and per user (QueueFull -> 429),
+and workers claim jobs fairly: higher priority first, then the user with the
+fewest running jobs who was served least recently, and nobody exceeds the
+per-user running cap. Background work (scheduled re-crawls) uses PRIORITY_LOW.
+
+Running jobs are cancelled cooperatively: DELETE /api/jobs/<id>, the last
+streaming client disconnecting, or the job's deadline sets a token that the
+job body checks between pages and products. Only a user subscribed to a job
+(its submitter or a coalesced requester) may cancel it, and on a shared job
+that only drops their own subscription.
+
+Jobs may carry callback URLs; when a job finishes, its completion payload is
+handed to a WebhookSender (webhooks.py), which delivers it in the background.
+
+Each job also has an append-only event log (status changes, progress, pages,
+per-product results) that clients can follow with JobManager.stream().
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+
+from job_queue import LocalQueue
+
+PROGRESS_FLUSH_INTERVAL = 0.5
+CANCEL_POLL_INTERVAL = 1.0
+DEFAULT_JOB_SECONDS = 30
+LEASE_SECONDS = 60
+HEARTBEAT_INTERVAL = 15
+MIN_LEASE_SECONDS = 3
+MAX_ATTEMPTS = 3
+ALL_CAPABILITIES = ("browser", "model")
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+TERMINAL_EVENT = "done"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    status_code INTEGER,
+    user_key TEXT,
+    owner TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    coalesce_key TEXT,
+    subscribers INTEGER NOT NULL DEFAULT 1,
+    timeout REAL,
+    cancel_requested TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    lease_expires_at REAL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job_seq ON job_events (job_id, seq);
+CREATE TABLE IF NOT EXISTS job_subscribers (
+    job_id TEXT NOT NULL,
+    user_key TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (job_id, user_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_callbacks (
+    job_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (job_id, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    capabilities TEXT NOT NULL,
+    kinds TEXT NOT NULL,
+    slots INTEGER NOT NULL,
+    started_at TEXT NOT NULL,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+# Columns added after the first release of the jobs table
+MIGRATIONS = {
+    "coalesce_key": "ALTER TABLE jobs ADD COLUMN coalesce_key TEXT",
+    "subscribers": "ALTER TABLE jobs ADD COLUMN subscribers INTEGER NOT NULL DEFAULT 1",
+    "timeout": "ALTER TABLE jobs ADD COLUMN timeout REAL",
+    "cancel_requested": "ALTER TABLE jobs ADD COLUMN cancel_requested TEXT",
+    "priority": "ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0",
+    "lease_expires_at": "ALTER TABLE jobs ADD COLUMN lease_expires_at REAL",
+}
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_user_status ON jobs (user_key, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_user_started ON jobs (user_key, started_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_inflight_key ON jobs (coalesce_key)
+    WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_jobs_owner_status ON jobs (owner, status);
+"""
+
+# A user sees the jobs they are subscribed to; jobs from before job_subscribers only their submitter
+VISIBLE_TO_USER = (
+    "(id IN (SELECT job_id FROM job_subscribers WHERE user_key = ?) OR "
+    "(user_key IS ? AND NOT EXISTS (SELECT 1 FROM job_subscribers s WHERE s.job_id = jobs.id)))"
+)
+
+
+def heartbeat_interval(lease_seconds):
+    """Seconds between lease renewals for a lease of lease_seconds"""
+    return min(HEARTBEAT_INTERVAL, lease_seconds / 3)
+
+
+class QueueFull(Exception):
+    """The job queue (global or the caller's share) is full; retry after `retry_after` seconds"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobCancelled(Exception):
+    """Raised inside a job body once its cancellation token is set"""
+
+    def __init__(self, reason, status=499):
+        super().__init__(reason)
+        self.status = status
+        self.body = {"success": False, "error": f"Job cancelled: {reason}"}
+
+
+class Job:
+    """Handle a job body uses to report progress and check for cancellation"""
+
+    def __init__(self, manager, job_id, kind, params, timeout=None):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self._manager = manager
+        self._progress = {}
+        self._dirty = False
+        self._last_flush = 0.0
+        self._deadline = time.monotonic() + timeout if timeout else None
+        self._cancel_reason = None
+        self._last_cancel_poll = time.monotonic()
+
+    def cancel(self, reason):
+        self._cancel_reason = self._cancel_reason or reason
+
+    def should_stop(self):
+        """True once the job was cancelled or ran past its deadline"""
+        if self._cancel_reason:
+            return True
+        if self._deadline and time.monotonic() > self._deadline:
+            self._cancel_reason = "deadline exceeded"
+            return True
+        now = time.monotonic()
+        if now - self._last_cancel_poll >= CANCEL_POLL_INTERVAL:
+            # Cancellation requested from another process
+            self._last_cancel_poll = now
+            row = self._manager._execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.id,)).fetchone()
+            if row and row["cancel_requested"]:
+                self._cancel_reason = row["cancel_requested"]
+                return True
+        return False
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job should stop; call between units of work"""
+        if self.should_stop():
+            status = 504 if self._cancel_reason == "deadline exceeded" else 499
+            raise JobCancelled(self._cancel_reason, status)
+
+    def progress(self, **fields):
+        """Merge fields into the job's progress; writes are throttled"""
+        self._progress.update(fields)
+        self._dirty = True
+        now = time.monotonic()
+        if now - self._last_flush >= PROGRESS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._manager._execute(
+            "UPDATE jobs SET progress = ? WHERE id = ?",
+            (json.dumps(self._progress), self.id)
+        )
+        self.emit("progress", **self._progress)
+
+    def emit(self, event, **data):
+        """Append an event (e.g. a scraped page or a finished product) to the job's stream"""
+        self._manager.append_event(self.id, event, data)
+
+
+class JobManager:
+    """Queue of jobs in SQLite executed by up to max_workers threads (0 = submit only)"""
+
+    def __init__(self, db_path, max_workers=2, poll_interval=2.0, retention_days=7, default_timeout=None,
+                 max_running=0, max_running_per_user=0, max_queued=0, max_queued_per_user=0,
+                 capabilities=ALL_CAPABILITIES, queue=None, lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, webhooks=None):
+        self.db_path = db_path
+        self.default_timeout = default_timeout
+        # Admission limits; 0 means unlimited. max_running caps jobs across all processes
+        self.max_running = max_running
+        self.max_running_per_user = max_running_per_user
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.retention_days = retention_days
+        self.capabilities = tuple(capabilities)
+        self.queue = queue or LocalQueue()
+        if lease_seconds < MIN_LEASE_SECONDS:
+            raise ValueError(f"lease_seconds must be at least {MIN_LEASE_SECONDS}")
+        self.lease_seconds = lease_seconds
+        # Several heartbeats fit in each lease, so one slow renewal doesn't lose it
+        self.heartbeat_interval = heartbeat_interval(lease_seconds)
+        self.max_attempts = max_attempts
+        self.webhooks = webhooks
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers = {}
+        self._requires = {}
+        self._local = threading.local()
+        self._events_changed = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._threads = []
+        self._started_pid = None
+        self._running = {}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._migrate()
+
+    def _migrate(self):
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                conn.execute(statement)
+        conn.executescript(INDEXES)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, sql, args=()):
+        return self._connection().execute(sql, args)
+
+    def register(self, kind, handler, requires=()):
+        """Register the function that runs jobs of this kind: handler(params, job) -> result dict.
+        requires names the worker capabilities the job needs, e.g. ("browser", "model")"""
+        self._handlers[kind] = handler
+        self._requires[kind] = tuple(requires)
+
+    def runnable_kinds(self, capabilities):
+        """Registered kinds a worker offering these capabilities can run"""
+        return sorted(kind for kind, requires in self._requires.items() if set(requires) <= set(capabilities))
+
+    def submit(self, kind, params, user_key=None, coalesce_key=None, timeout=None, priority=PRIORITY_NORMAL,
+               callback_url=None):
+        """Persist a new queued job and wake a worker, or attach to an identical in-flight job.
+        timeout is the job's run-time deadline in seconds (default_timeout if not given);
+        callback_url is POSTed the completion payload when the job finishes"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if coalesce_key:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE coalesce_key = ? AND status IN ('queued', 'running') "
+                    "ORDER BY created_at LIMIT 1",
+                    (coalesce_key,)
+                ).fetchone()
+                if row:
+                    conn.execute("UPDATE jobs SET subscribers = subscribers + 1 WHERE id = ?", (row["id"],))
+                    self._subscribe(conn, row["id"], user_key)
+                    self._add_callback(conn, row["id"], callback_url)
+                    conn.execute("COMMIT")
+                    print(f"🔗 Coalesced {kind} request onto in-flight job {row['id']}")
+                    return dict(self.get(row["id"], include_result=False), coalesced=True)
+
+            self._admit(conn, kind, user_key)
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, progress, user_key, coalesce_key, timeout, "
+                "priority, created_at) VALUES (?, ?, 'queued', ?, '{}', ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), user_key, coalesce_key,
+                 timeout or self.default_timeout, priority, datetime.now().isoformat())
+            )
+            self._subscribe(conn, job_id, user_key)
+            self._add_callback(conn, job_id, callback_url)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.append_event(job_id, "status", {"status": "queued", "kind": kind})
+        self.queue.notify()
+        return dict(self.get(job_id, include_result=False), coalesced=False)
+
+    def _subscribe(self, conn, job_id, user_key):
+        conn.execute(
+            "INSERT INTO job_subscribers (job_id, user_key) VALUES (?, ?) "
+            "ON CONFLICT (job_id, user_key) DO UPDATE SET count = count + 1",
+            (job_id, user_key or "")
+        )
+
+    def _add_callback(self, conn, job_id, callback_url):
+        if callback_url:
+            conn.execute("INSERT OR IGNORE INTO job_callbacks (job_id, url) VALUES (?, ?)", (job_id, callback_url))
+
+    def _send_callbacks(self, job_id):
+        """Queue the completion payload for each callback URL of a finished job (never blocks)"""
+        if self.webhooks is None:
+            return
+        urls = [row["url"] for row in self._execute("SELECT url FROM job_callbacks WHERE job_id = ?", (job_id,))]
+        if urls:
+            payload = dict(self.get(job_id), event="job.finished")
+            for url in urls:
+                self.webhooks.send(url, payload)
+
+    def _admit(self, conn, kind, user_key):
+        """Raise QueueFull if the global queue or this user's share of it is full"""
+        if self.max_queued:
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                raise QueueFull(
+                    "Job queue is full, try again later",
+                    self._retry_after(conn, kind, self.max_running or self.max_workers)
+                )
+        if self.max_queued_per_user:
+            mine = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND user_key IS ?", (user_key,)
+            ).fetchone()[0]
+            if mine >= self.max_queued_per_user:
+                raise QueueFull(
+                    f"You already have {mine} jobs waiting, try again later",
+                    self._retry_after(conn, kind, self.max_running_per_user or self.max_workers)
+                )
+
+    def _retry_after(self, conn, kind, slots):
+        """Seconds until one of `slots` running jobs is likely to finish, from recent run times"""
+        row = conn.execute(
+            "SELECT AVG((julianday(finished_at) - julianday(started_at)) * 86400) FROM ("
+            "SELECT started_at, finished_at FROM jobs WHERE kind = ? AND status = 'succeeded' "
+            "AND started_at IS NOT NULL ORDER BY finished_at DESC LIMIT 20)",
+            (kind,)
+        ).fetchone()
+        avg_seconds = row[0] or DEFAULT_JOB_SECONDS
+        return int(min(600, max(1, avg_seconds / max(1, slots))))
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job finishes and return it with its result (None on timeout)"""
+        deadline = time.monotonic() + timeout if timeout else None
+        for event in self.stream(job_id, heartbeat=1.0):
+            if event is not None and event["event"] == TERMINAL_EVENT:
+                break
+            if deadline and time.monotonic() > deadline:
+                return None
+        return self.get(job_id)
+
+    def cancel(self, job_id, reason="cancelled by client", release=False, user_key=None):
+        """Cancel a job. With release=True one subscriber detaches and the job is only
+        cancelled when no subscribers remain. With user_key set, the caller must be subscribed
+        to the job and detaches their own subscription. Returns the job, or None if unknown
+        (or not the caller's)"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT status, subscribers, user_key FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            subscription = None
+            if row is not None and user_key is not None:
+                subscription = conn.execute(
+                    "SELECT count FROM job_subscribers WHERE job_id = ? AND user_key = ?", (job_id, user_key)
+                ).fetchone()
+                if subscription is None:
+                    # Jobs from before job_subscribers only know their submitter
+                    if not self._visible(conn, job_id, user_key):
+                        row = None
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["status"] not in ("queued", "running"):
+                conn.execute("COMMIT")
+                return self.get(job_id, include_result=False)
+            if subscription is not None:
+                if subscription["count"] > 1:
+                    conn.execute(
+                        "UPDATE job_subscribers SET count = count - 1 WHERE job_id = ? AND user_key = ?",
+                        (job_id, user_key)
+                    )
+                else:
+                    conn.execute("DELETE FROM job_subscribers WHERE job_id = ? AND user_key = ?", (job_id, user_key))
+            if (release or user_key is not None) and row["subscribers"] > 1:
+                conn.execute("UPDATE jobs SET subscribers = subscribers - 1 WHERE id = ?", (job_id,))
+                conn.execute("COMMIT")
+                print(f"🔓 A subscriber left job {job_id}; it keeps running for the others")
+                return self.get(job_id, include_result=False)
+            if row["status"] == "queued":
+                conn.execute(
+                    "UPDATE jobs SET status = 'cancelled', cancel_requested = ?, error = ?, status_code = 499, "
+                    "result = ?, finished_at = ? WHERE id = ?",
+                    (reason, reason, json.dumps(JobCancelled(reason).body), datetime.now().isoformat(), job_id)
+                )
+            else:
+                conn.execute("UPDATE jobs SET cancel_requested = ? WHERE id = ?", (reason, job_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if row["status"] == "queued":
+            self.append_event(job_id, TERMINAL_EVENT, {
+                "status": "cancelled", "status_code": 499, "error": reason, "result": JobCancelled(reason).body
+            })
+            self._send_callbacks(job_id)
+        else:
+            running = self._running.get(job_id)
+            if running:
+                running.cancel(reason)
+            self.append_event(job_id, "status", {"status": "cancelling", "reason": reason})
+        print(f"🛑 Cancel requested for job {job_id}: {reason}")
+        return self.get(job_id, include_result=False)
+
+    def get(self, job_id, include_result=True, user_key=None):
+        """A job as a dict; with user_key set, only if that user is subscribed to it"""
+        if user_key is not None and not self._visible(self._connection(), job_id, user_key):
+            return None
+        row = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row, include_result) if row else None
+
+    def _visible(self, conn, job_id, user_key):
+        row = conn.execute(
+            "SELECT 1 FROM jobs WHERE id = ? AND " + VISIBLE_TO_USER, (job_id, user_key, user_key)
+        ).fetchone()
+        return row is not None
+
+    def params(self, job_id):
+        row = self._execute("SELECT params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row["params"]) if row else None
+
+    def list(self, status=None, limit=50, user_key=None):
+        """Recent jobs, newest first; with user_key set, only the ones that user is subscribed to"""
+        where, args = [], []
+        if status:
+            where.append("status = ?")
+            args.append(status)
+        if user_key is not None:
+            where.append(VISIBLE_TO_USER)
+            args += [user_key, user_key]
+        rows = self._execute(
+            "SELECT * FROM jobs {} ORDER BY created_at DESC LIMIT ?".format(
+                "WHERE " + " AND ".join(where) if where else ""
+            ),
+            (*args, limit)
+        ).fetchall()
+        return [self._to_dict(row, include_result=False) for row in rows]
+
+    def append_event(self, job_id, event, data):
+        self._execute(
+            "INSERT INTO job_events (job_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, event, json.dumps(data, ensure_ascii=False), datetime.now().isoformat())
+        )
+        with self._events_changed:
+            self._events_changed.notify_all()
+
+    def events(self, job_id, after=0, limit=500):
+        """Events of a job with sequence number greater than `after`"""
+        rows = self._execute(
+            "SELECT seq, event, data, created_at FROM job_events WHERE job_id = ? AND seq > ? "
+            "ORDER BY seq LIMIT ?",
+            (job_id, after, limit)
+        ).fetchall()
+        return [
+            {"id": row["seq"], "event": row["event"], "data": json.loads(row["data"]), "at": row["created_at"]}
+            for row in rows
+        ]
+
+    def stream(self, job_id, after=0, heartbeat=15.0, poll_interval=0.5):
+        """Yield a job's events as they are appended until it finishes; None is a keep-alive tick"""
+        last_sent = time.monotonic()
+        while True:
+            events = self.events(job_id, after)
+            for event in events:
+                after = event["id"]
+                yield event
+                if event["event"] == TERMINAL_EVENT:
+                    return
+            if events:
+                last_sent = time.monotonic()
+                continue
+            if time.monotonic() - last_sent >= heartbeat:
+                last_sent = time.monotonic()
+                yield None
+            # Woken early by events from this process; other processes are picked up by polling
+            with self._events_changed:
+                self._events_changed.wait(poll_interval)
+
+    def _to_dict(self, row, include_result=True):
+        job = {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": json.loads(row["progress"] or "{}"),
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "subscribers": row["subscribers"],
+            "priority": row["priority"],
+            "owner": row["owner"],
+            "cancel_requested": row["cancel_requested"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"]
+        }
+        if include_result and row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+            job["status_code"] = row["status_code"]
+        return job
+
+    def start(self):
+        """Start the worker threads and the lease keeper once per process (safe to call on every request)"""
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            # A forked child must not reuse the parent's connection or identity
+            self._local = threading.local()
+            self.owner = f"{socket.gethostname()}:{os.getpid()}"
+            self.reclaim_expired()
+            self._prune()
+            self._threads = [threading.Thread(target=self._keeper, name="job-lease-keeper", daemon=True)]
+            kinds = self.runnable_kinds(self.capabilities) if self.max_workers else []
+            for i in range(self.max_workers):
+                self._threads.append(
+                    threading.Thread(target=self._worker, args=(kinds,), name=f"job-worker-{i}", daemon=True)
+                )
+            if self.max_workers:
+                self.register_worker(self.owner, self.capabilities, kinds, self.max_workers)
+            for thread in self._threads:
+                thread.start()
+            self._started_pid = os.getpid()
+            if self.max_workers:
+                print(f"🧵 Started {self.max_workers} job workers ({self.owner}, "
+                      f"{'+'.join(self.capabilities) or 'no capabilities'}, {self.queue.name} queue)")
+            else:
+                print(f"🧵 No local job workers ({self.owner}); jobs run on separate workers")
+
+    def _keeper(self):
+        """Renew this process's leases, refresh its worker record and recover jobs of dead workers"""
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                if self._running:
+                    self._execute(
+                        "UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status = 'running'",
+                        (time.time() + self.lease_seconds, self.owner)
+                    )
+                if self.max_workers:
+                    self.register_worker(
+                        self.owner, self.capabilities, self.runnable_kinds(self.capabilities), self.max_workers
+                    )
+                self.reclaim_expired()
+            except sqlite3.OperationalError as e:
+                print(f"⚠️  Job lease keeper failed: {e}")
+
+    def register_worker(self, worker_id, capabilities, kinds, slots):
+        """Record or refresh a worker process and what it can run; doubles as its heartbeat"""
+        self._execute(
+            "INSERT INTO workers (id, host, capabilities, kinds, slots, started_at, heartbeat_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET capabilities = excluded.capabilities, "
+            "kinds = excluded.kinds, slots = excluded.slots, heartbeat_at = excluded.heartbeat_at",
+            (worker_id, worker_id.rsplit(":", 1)[0], json.dumps(list(capabilities)), json.dumps(list(kinds)),
+             slots, datetime.now().isoformat(), time.time())
+        )
+
+    def workers(self, alive_within=None):
+        """Workers that heartbeated recently, with their capabilities and running jobs"""
+        cutoff = time.time() - (alive_within or self.heartbeat_interval * 3)
+        rows = self._execute(
+            "SELECT w.*, (SELECT COUNT(*) FROM jobs j WHERE j.owner = w.id AND j.status = 'running') AS running "
+            "FROM workers w WHERE w.heartbeat_at >= ? ORDER BY w.id",
+            (cutoff,)
+        ).fetchall()
+        return [
+            {
+                "id": row["id"],
+                "host": row["host"],
+                "capabilities": json.loads(row["capabilities"]),
+                "kinds": json.loads(row["kinds"]),
+                "slots": row["slots"],
+                "running": row["running"],
+                "started_at": row["started_at"],
+                "last_heartbeat": datetime.fromtimestamp(row["heartbeat_at"]).isoformat()
+            }
+            for row in rows
+        ]
+
+    def heartbeat(self, job_id, owner, progress=None):
+        """Extend a running job's lease for its owner, optionally storing progress.
+        Returns the pending cancellation reason ("" if none), or None if the lease was lost"""
+        if progress is None:
+            cursor = self._execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id, owner)
+            )
+        else:
+            cursor = self._execute(
+                "UPDATE jobs SET lease_expires_at = ?, progress = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, json.dumps(progress), job_id, owner)
+            )
+        if cursor.rowcount == 0:
+            return None
+        row = self._execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["cancel_requested"] or ""
+
+    def reclaim_expired(self):
+        """Re-queue running jobs whose worker died: the lease ran out, or the owning process on
+        this host is gone. Jobs that already used max_attempts fail instead"""
+        host = socket.gethostname()
+        now = time.time()
+        rows = self._execute(
+            "SELECT id, owner, attempts, lease_expires_at FROM jobs WHERE status = 'running'"
+        ).fetchall()
+        for row in rows:
+            owner_host, _, pid = (row["owner"] or "").rpartition(":")
+            lease_expired = row["lease_expires_at"] is not None and row["lease_expires_at"] < now
+            owner_dead = (owner_host == host and pid.isdigit() and int(pid) != os.getpid()
+                          and not _pid_alive(int(pid)))
+            if not (lease_expired or owner_dead):
+                continue
+            if row["attempts"] >= self.max_attempts:
+                error = f"Worker {row['owner']} was lost; gave up after {row['attempts']} attempts"
+                if self.finish(row["id"], "failed", {"success": False, "error": error}, 500,
+                                error=error, owner=row["owner"]):
+                    print(f"💀 Job {row['id']} failed: {error}")
+                continue
+            cursor = self._execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, lease_expires_at = NULL "
+                "WHERE id = ? AND status = 'running' AND owner IS ?",
+                (row["id"], row["owner"])
+            )
+            if cursor.rowcount:
+                self.append_event(row["id"], "status", {"status": "queued", "requeued_from": row["owner"]})
+                self.queue.notify()
+                print(f"♻️  Re-queued job {row['id']} from {row['owner']}")
+
+    def _prune(self):
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        self._execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') AND finished_at < ?", (cutoff,)
+        )
+        self._execute("DELETE FROM job_events WHERE job_id NOT IN (SELECT id FROM jobs)")
+        self._execute("DELETE FROM job_callbacks WHERE job_id NOT IN (SELECT id FROM jobs)")
+        self._execute("DELETE FROM job_subscribers WHERE job_id NOT IN (SELECT id FROM jobs)")
+        self._execute("DELETE FROM workers WHERE heartbeat_at < ?", (time.time() - self.retention_days * 86400,))
+
+    def claim(self, owner, kinds):
+        """Atomically lease the next queued job of one of `kinds` to `owner` and return its row.
+        Picks the highest priority, then the user with the fewest running jobs, then the one
+        served least recently, then the oldest job, skipping users at the per-user running cap."""
+        if not kinds:
+            return None
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.max_running:
+                running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0]
+                if running >= self.max_running:
+                    conn.execute("COMMIT")
+                    return None
+            row = conn.execute(
+                """
+                SELECT q.*,
+                    (SELECT COUNT(*) FROM jobs r WHERE r.status = 'running' AND r.user_key IS q.user_key)
+                        AS user_running,
+                    (SELECT MAX(s.started_at) FROM jobs s WHERE s.user_key IS q.user_key)
+                        AS user_last_started
+                FROM jobs q
+                WHERE q.status = 'queued' AND q.kind IN ({})
+                  AND (? = 0 OR (SELECT COUNT(*) FROM jobs r
+                                 WHERE r.status = 'running' AND r.user_key IS q.user_key) < ?)
+                ORDER BY q.priority DESC, user_running, COALESCE(user_last_started, ''), q.created_at
+                LIMIT 1
+                """.format(", ".join("?" * len(kinds))),
+                (*kinds, self.max_running_per_user, self.max_running_per_user)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, started_at = ?, attempts = attempts + 1, "
+                "lease_expires_at = ? WHERE id = ?",
+                (owner, datetime.now().isoformat(), time.time() + self.lease_seconds, row["id"])
+            )
+            conn.execute("COMMIT")
+            self.append_event(row["id"], "status", {"status": "running", "owner": owner})
+            return row
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def finish(self, job_id, status, result, status_code, error=None, owner=None):
+        """Store a job's outcome. With owner set, only while that owner still holds the lease;
+        returns False if the job was meanwhile re-queued or cancelled elsewhere"""
+        if owner is None:
+            cursor = self._execute(
+                "UPDATE jobs SET status = ?, result = ?, status_code = ?, error = ?, finished_at = ?, "
+                "lease_expires_at = NULL WHERE id = ?",
+                (status, json.dumps(result, ensure_ascii=False), status_code, error,
+                 datetime.now().isoformat(), job_id)
+            )
+        else:
+            cursor = self._execute(
+                "UPDATE jobs SET status = ?, result = ?, status_code = ?, error = ?, finished_at = ?, "
+                "lease_expires_at = NULL WHERE id = ? AND owner = ? AND status = 'running'",
+                (status, json.dumps(result, ensure_ascii=False), status_code, error,
+                 datetime.now().isoformat(), job_id, owner)
+            )
+        if cursor.rowcount == 0:
+            return False
+        self.append_event(job_id, TERMINAL_EVENT, {
+            "status": status, "status_code": status_code, "error": error, "result": result
+        })
+        self._send_callbacks(job_id)
+        # A finished job may unblock a user at the per-user cap
+        self.queue.notify()
+        return True
+
+    def _worker(self, kinds):
+        while True:
+            try:
+                row = self.claim(self.owner, kinds)
+            except sqlite3.OperationalError as e:
+                print(f"⚠️  Job claim failed: {e}")
+                row = None
+            if row is None:
+                self.queue.wait(self.poll_interval)
+                continue
+            try:
+                self._run(row)
+            except Exception as e:
+                # Never let one bad job take the worker thread down; its lease runs out and it is reclaimed
+                traceback.print_exc()
+                print(f"⚠️  Job worker failed on job {row['id']}: {e}")
+
+    def _run(self, row):
+        try:
+            job = Job(self, row["id"], row["kind"], json.loads(row["params"]), timeout=row["timeout"])
+            if row["cancel_requested"]:
+                job.cancel(row["cancel_requested"])
+            self._running[job.id] = job
+            print(f"▶️  Job {job.id} ({job.kind}) started")
+            status, body, status_code, error = execute_job(self._handlers.get(job.kind), job)
+        except Exception as e:
+            # The job row itself is unusable (bad params or timeout)
+            traceback.print_exc()
+            status, body, status_code, error = "failed", {"success": False, "error": str(e)}, 500, str(e)
+        finally:
+            self._running.pop(row["id"], None)
+        if not self.finish(row["id"], status, body, status_code, error=error, owner=self.owner):
+            print(f"⚠️  Job {row['id']} ({row['kind']}) lost its lease; {status} result discarded")
+
+
+def execute_job(handler, job):
+    """Run a job body and map its outcome to (status, result, status_code, error)"""
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job kind: {job.kind}")
+        result = handler(job.params, job)
+        job.flush()
+        print(f"✅ Job {job.id} ({job.kind}) succeeded")
+        return "succeeded", result, 200, None
+    except JobCancelled as e:
+        job.flush()
+        print(f"🛑 Job {job.id} ({job.kind}) cancelled: {e}")
+        return "cancelled", e.body, e.status, str(e)
+    except Exception as e:
+        job.flush()
+        status_code = getattr(e, "status", 500)
+        body = getattr(e, "body", None) or {"success": False, "error": str(e)}
+        if status_code >= 500:
+            traceback.print_exc()
+        print(f"❌ Job {job.id} ({job.kind}) failed: {e}")
+        return "failed", body, status_code, str(e)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
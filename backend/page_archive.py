@@ -0,0 +1,239 @@
+# backend/page_archive.py
+"""Content-addressed archive of raw scraped pages with offline re-parse.
+
+Scrapers archive every fetched page when SCRAPER_ARCHIVE_DIR is set. Bodies are
+gzip-compressed and stored once per SHA-256 under <root>/objects/, and every
+fetch is appended to <root>/index.jsonl with its URL, kind and time.
+
+Usage:
+  python page_archive.py reparse <archive_dir> [--out data] [--workers N] [--kind reviews|listing|all]
+  python page_archive.py stats <archive_dir>
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime
+from multiprocessing import Pool
+from urllib.parse import urlparse
+
+from stable_ids import product_id_for, assign_review_ids
+
+
+class PageArchive:
+    """Stores page bodies compressed and content-addressed, with a URL/time index"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html.gz")
+
+    def store(self, url, body, kind, **meta):
+        """Archive a page body and index the fetch. Returns the body's SHA-256"""
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "kind": kind,
+            "size": len(data),
+            "fetched_at": datetime.now().isoformat(),
+            **meta
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return digest
+
+    def load(self, digest):
+        """Return an archived page body as text"""
+        with gzip.open(self.object_path(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def entries(self, kind=None):
+        """Iterate index entries in fetch order"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crashed scraper
+                if kind is None or entry.get("kind") == kind:
+                    yield entry
+
+    def latest_entries(self, kind=None):
+        """Most recent capture of every URL"""
+        latest = {}
+        for entry in self.entries(kind):
+            latest[entry["url"]] = entry
+        return list(latest.values())
+
+    def replay_routes(self):
+        """Map request paths to archived objects for the replay server"""
+        routes = {}
+        for entry in self.latest_entries():
+            parsed = urlparse(entry["url"])
+            path = f"{parsed.path}?{parsed.query}" if parsed.query else parsed.path
+            routes[path] = self.object_path(entry["sha256"])
+        return routes
+
+    def stats(self):
+        entries = list(self.entries())
+        by_kind = defaultdict(int)
+        for entry in entries:
+            by_kind[entry.get("kind", "unknown")] += 1
+        digests = {entry["sha256"] for entry in entries}
+        stored_bytes = sum(
+            os.path.getsize(self.object_path(digest)) for digest in digests
+            if os.path.exists(self.object_path(digest))
+        )
+        return {
+            "fetches": len(entries),
+            "unique_pages": len(digests),
+            "urls": len({entry["url"] for entry in entries}),
+            "by_kind": dict(by_kind),
+            "raw_bytes": sum(entry.get("size", 0) for entry in entries),
+            "stored_bytes": stored_bytes
+        }
+
+
+def _reparse_entry(task):
+    """Run the current extractors over one archived page (executed in a worker process)"""
+    root, entry = task
+    from scrape_products import extract_reviews_from_html, extract_products_from_listing
+    from bs4 import BeautifulSoup
+
+    html = PageArchive(root).load(entry["sha256"])
+    if entry["kind"] == "reviews":
+        return entry, extract_reviews_from_html(html)
+    if entry["kind"] == "listing":
+        soup = BeautifulSoup(html, "html.parser")
+        return entry, extract_products_from_listing(
+            soup, entry.get("category", "unknown"), sys.maxsize, page=entry.get("page", 1)
+        ) or []
+    return entry, []
+
+
+def reparse_archive(root, out_dir="data", workers=None, kind="all"):
+    """Re-run the extractors over an archive in parallel and write fresh review/product files"""
+    archive = PageArchive(root)
+    kinds = ["reviews", "listing"] if kind == "all" else [kind]
+    tasks = [(root, entry) for k in kinds for entry in archive.latest_entries(k)]
+    if not tasks:
+        print("No archived pages to re-parse")
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    print(f"🔁 Re-parsing {len(tasks)} archived pages on {workers} workers...")
+    with Pool(processes=workers) as pool:
+        parsed = pool.map(_reparse_entry, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+
+    os.makedirs(out_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    written = []
+
+    reviews_by_product = defaultdict(list)
+    products_by_category = defaultdict(list)
+    titles = {}
+    for entry, records in parsed:
+        if entry["kind"] == "reviews":
+            product_url = entry.get("product_url", entry["url"])
+            reviews_by_product[product_url].append((entry.get("page", 1), records))
+            if entry.get("title"):
+                titles[product_id_for(product_url)] = entry["title"]
+        elif entry["kind"] == "listing":
+            products_by_category[entry.get("category", "unknown")].append((entry.get("page", 1), records))
+
+    # Pages archived before titles were recorded fall back to an archived listing of the product
+    for _, pages in products_by_category.items():
+        for _, page_products in pages:
+            for product in page_products:
+                if product.get("title"):
+                    titles.setdefault(product["id"], product["title"])
+
+    if reviews_by_product:
+        results = []
+        for product_url, pages in reviews_by_product.items():
+            product_id = product_id_for(product_url)
+            reviews = assign_review_ids(
+                [review for _, page_reviews in sorted(pages, key=lambda p: p[0]) for review in page_reviews],
+                product_id
+            )
+            results.append({
+                "id": product_id,
+                "title": titles.get(product_id, "Unknown Product"),
+                "url": product_url,
+                "reviews": reviews,
+                "review_count": len(reviews),
+                "scraped_at": datetime.now().isoformat()
+            })
+        total_reviews = sum(result["review_count"] for result in results)
+        filename = os.path.join(out_dir, f"reviews_bulk_{timestamp}.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump({
+                "scraped_at": datetime.now().isoformat(),
+                "total_products": len(results),
+                "total_reviews": total_reviews,
+                "reparsed_from": root,
+                "results": results
+            }, f, indent=2, ensure_ascii=False)
+        print(f"✓ {total_reviews} reviews for {len(results)} products → {filename}")
+        written.append(filename)
+
+    for category, pages in products_by_category.items():
+        products = [product for _, page_products in sorted(pages, key=lambda p: p[0]) for product in page_products]
+        filename = os.path.join(out_dir, f"products_{category}_{timestamp}.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(products, f, indent=4, ensure_ascii=False)
+        print(f"✓ {len(products)} products for {category} → {filename}")
+        written.append(filename)
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or re-parse the raw page archive")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reparse = subparsers.add_parser("reparse", help="Run the current extractors over archived pages")
+    reparse.add_argument("archive")
+    reparse.add_argument("--out", default="data")
+    reparse.add_argument("--workers", type=int)
+    reparse.add_argument("--kind", choices=["all", "reviews", "listing"], default="all")
+
+    stats = subparsers.add_parser("stats", help="Show archive size and contents")
+    stats.add_argument("archive")
+
+    args = parser.parse_args()
+    if args.command == "reparse":
+        reparse_archive(args.archive, args.out, args.workers, args.kind)
+    else:
+        print(json.dumps(PageArchive(args.archive).stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
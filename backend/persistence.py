@@ -0,0 +1,265 @@
+# backend/persistence.py
+"""Append-only JSONL record logs for scrape and analysis results.
+
+Results are appended as compact one-line JSON records to a log per stream and
+day (data/<stream>_<YYYYMMDD>.jsonl, with .gz or .zst when compressed). The
+request or job thread only queues a record. A background thread writes queued
+records in batches, one write per batch, and fsyncs at most once per
+`fsync_interval`. Pipelines append as they go, so a crash loses at most the
+records of the last interval rather than a whole run. With compression each
+batch is its own gzip member or zstd frame. A torn last batch therefore only
+loses that batch, and read_records() stops cleanly at it.
+
+    python persistence.py cat data/reviews_20261019.jsonl.gz | head
+"""
+import argparse
+import atexit
+import gzip
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+# Handles of logs not written for this long are closed
+IDLE_CLOSE_SECONDS = 60
+
+
+class RecordLog:
+    """Background, batched appender of JSONL records"""
+
+    def __init__(self, data_dir="data", compression="none", fsync_interval=1.0, max_pending=10000,
+                 batch_size=500):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression {compression!r}; use none, gzip or zstd")
+        if compression == "zstd":
+            import zstandard  # optional dependency, only needed for zstd logs
+            self._zstd = zstandard.ZstdCompressor()
+        self.data_dir = data_dir
+        self.compression = compression
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._files = {}  # path -> [fd, last_write_monotonic]
+        self._dirty = set()
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._unwritten = 0
+        self._started_pid = None
+        self.records = 0
+        self.bytes = 0
+        self.batches = 0
+        self.fsyncs = 0
+
+    def path_for(self, stream, when=None):
+        day = (when or datetime.now()).strftime("%Y%m%d")
+        return os.path.join(self.data_dir, f"{stream}_{day}.jsonl{COMPRESSION_SUFFIXES[self.compression]}")
+
+    def append(self, stream, record):
+        """Queue one record for the stream's log of today and return that log's path.
+        Blocks only when max_pending records are already waiting"""
+        path = self.path_for(stream)
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._unwritten += 1
+        self._start()
+        self._queue.put((path, line.encode("utf-8")))
+        return path
+
+    def append_many(self, stream, records):
+        path = None
+        for record in records:
+            path = self.append(stream, record)
+        return path or self.path_for(stream)
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is written and fsynced; False on timeout"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._idle:
+            if self._started_pid != os.getpid():
+                return not self._unwritten
+            try:
+                self._queue.put_nowait(None)  # have the writer fsync without waiting out the interval
+            except queue.Full:
+                pass
+            while self._unwritten or self._dirty:
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "compression": self.compression,
+                "pending": self._unwritten,
+                "records": self.records,
+                "bytes": self.bytes,
+                "batches": self.batches,
+                "fsyncs": self.fsyncs,
+                "open_files": len(self._files)
+            }
+
+    def _start(self):
+        if self._started_pid == os.getpid():
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._files = {}
+            self._dirty = set()
+            threading.Thread(target=self._loop, name="record-log-writer", daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def _loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                item = None
+            batch = [item] if item else []
+            flush_now = item is None
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    flush_now = True
+                else:
+                    batch.append(item)
+            try:
+                self._write(batch)
+                if self._dirty and (flush_now or time.monotonic() - self._last_fsync >= self.fsync_interval):
+                    self._fsync()
+                self._close_idle()
+            except OSError as e:
+                print(f"❌ Record log write failed, {len(batch)} record(s) lost: {e}")
+                self._dirty.clear()
+            with self._idle:
+                self._unwritten -= len(batch)
+                self._idle.notify_all()
+
+    def _write(self, batch):
+        by_path = {}
+        for path, line in batch:
+            by_path.setdefault(path, []).append(line)
+        for path, lines in by_path.items():
+            data = self._frame(b"".join(lines))
+            entry = self._files.get(path)
+            if entry is None:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                entry = self._files[path] = [os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644), 0]
+            view = memoryview(data)
+            while view:
+                view = view[os.write(entry[0], view):]
+            entry[1] = time.monotonic()
+            with self._lock:
+                self._dirty.add(path)
+                self.records += len(lines)
+                self.bytes += len(data)
+                self.batches += 1
+
+    def _frame(self, data):
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=6)
+        if self.compression == "zstd":
+            return self._zstd.compress(data)
+        return data
+
+    def _fsync(self):
+        for path in list(self._dirty):
+            entry = self._files.get(path)
+            if entry:
+                os.fsync(entry[0])
+        with self._lock:
+            self._dirty.clear()
+            self.fsyncs += 1
+        self._last_fsync = time.monotonic()
+
+    def _close_idle(self):
+        now = time.monotonic()
+        for path, (fd, last_write) in list(self._files.items()):
+            if path not in self._dirty and now - last_write > IDLE_CLOSE_SECONDS:
+                os.close(fd)
+                del self._files[path]
+
+
+def _open_log(path):
+    """Line iterator over a log's uncompressed contents, and the errors a torn final batch raises"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb"), (EOFError, OSError)
+    if path.endswith(".zst"):
+        import zstandard  # optional dependency, only needed for zstd logs
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8"), (zstandard.ZstdError, OSError)
+    return open(path, "rb"), ()
+
+
+def read_records(path):
+    """Yield the records of one log in order, one at a time. A torn final batch from a crash
+    is skipped with a warning rather than failing the whole read"""
+    lines, torn_errors = _open_log(path)
+    with lines:
+        try:
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"⚠️  Skipping a torn record in {path}")
+        except torn_errors as e:
+            print(f"⚠️  {path} ends in an incomplete batch, stopped there: {e}")
+
+
+def log_files(stream, data_dir="data"):
+    """A stream's logs, oldest day first"""
+    prefix = f"{stream}_"
+    names = [
+        name for name in os.listdir(data_dir)
+        if name.startswith(prefix) and name[len(prefix):].split(".")[0].isdigit() and ".jsonl" in name
+    ] if os.path.isdir(data_dir) else []
+    return [os.path.join(data_dir, name) for name in sorted(names)]
+
+
+def iter_stream(stream, data_dir="data", record_type=None):
+    """Yield every record of a stream across its daily logs, optionally of one type"""
+    for path in log_files(stream, data_dir):
+        for record in read_records(path):
+            if record_type is None or record.get("type") == record_type:
+                yield record
+
+
+record_log = RecordLog(
+    data_dir=os.environ.get('PERSIST_DATA_DIR') or 'data',
+    compression=os.environ.get('PERSIST_COMPRESSION') or 'none',
+    fsync_interval=float(os.environ.get('PERSIST_FSYNC_INTERVAL') or 1),
+    max_pending=int(os.environ.get('PERSIST_MAX_PENDING') or 10000)
+)
+atexit.register(record_log.flush, 5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read SentimentPulse record logs")
+    parser.add_argument("command", choices=["cat", "count"])
+    parser.add_argument("paths", nargs="+", help="log files (.jsonl, .jsonl.gz or .jsonl.zst)")
+    args = parser.parse_args()
+    for path in args.paths:
+        if args.command == "cat":
+            for record in read_records(path):
+                sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            print(f"{path}: {sum(1 for _ in read_records(path))} records")
+
+
+if __name__ == "__main__":
+    main()
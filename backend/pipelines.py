@@ -0,0 +1,548 @@
+# backend/pipelines.py
+"""Bodies of the long-running scrape and analysis endpoints.
+
+Each pipeline takes the request JSON and a job handle and returns the same dict
+the endpoint used to return inline, so it can run in a background job or
+directly inside a request.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+from scrape_products import (
+    setup_driver, scrape_product_reviews_selenium, scrape_snapdeal_products, polite_sleep
+)
+from stable_ids import review_id_for, normalize_product_url, product_id_for, store_product_id
+from review_analysis import analyze_sentiments, analyze_review_batches
+from result_cache import analysis_cache
+from review_store import review_store
+from persistence import record_log
+from sentiment_summary import SentimentSummary
+
+# Emit a running sentiment summary every N analyzed reviews
+SUMMARY_EVENT_EVERY = 10
+# Products one category scrape (or tracked category re-crawl) may collect
+SCRAPE_MAX_PRODUCTS = int(os.environ.get('SCRAPE_MAX_PRODUCTS') or 100)
+# Bulk analysis limits: products per request and browsers scraping them in parallel
+BULK_MAX_PRODUCTS = 50
+BULK_MAX_DRIVERS = int(os.environ.get('BULK_MAX_DRIVERS') or 3)
+
+
+class PipelineError(Exception):
+    """Request problem reported to the client with an HTTP status"""
+
+    def __init__(self, message, status=400, body=None):
+        super().__init__(message)
+        self.status = status
+        self.body = body or {"success": False, "error": message}
+
+
+class DetachedJob:
+    """Stand-in job handle for pipelines run inline in a request"""
+    id = None
+
+    def progress(self, **fields):
+        pass
+
+    def emit(self, event, **data):
+        pass
+
+    def should_stop(self):
+        return False
+
+    def check_cancelled(self):
+        pass
+
+
+def sentiment_percentages(counts):
+    total = sum(counts.values())
+    return {
+        label: round((count / total) * 100, 1) if total > 0 else 0
+        for label, count in counts.items()
+    }
+
+
+def analyze_reviews(reviews, product_id=""):
+    """Sentiment for scraped reviews in the stored analyzed-review shape, in one analyze_sentiments
+    pass; reviews without text are left out. Reviews without an id get the one the review store
+    would give them under product_id"""
+    texts = [(review, review.get('text', '') if isinstance(review, dict) else str(review)) for review in reviews]
+    texts = [(review, text) for review, text in texts if text]
+    sentiments = analyze_sentiments([text for _, text in texts])
+    analyzed_at = datetime.now().isoformat()
+    return [
+        {
+            "id": (review.get('id') if isinstance(review, dict) else None) or review_id_for(review, product_id),
+            "review": text,
+            "rating": review.get('rating', 'No rating') if isinstance(review, dict) else 'No rating',
+            "sentiment": sentiment,
+            "analyzed_at": analyzed_at
+        }
+        for (review, text), sentiment in zip(texts, sentiments)
+    ]
+
+
+def validate_scrape_products(data):
+    if not data:
+        raise PipelineError("No JSON data provided", body={"error": "No JSON data provided"})
+    if not data.get('category', ''):
+        raise PipelineError("Category is required", body={"error": "Category is required"})
+    max_products = data.get('max_products', 20)
+    if isinstance(max_products, bool) or not isinstance(max_products, int) or not 1 <= max_products <= SCRAPE_MAX_PRODUCTS:
+        message = f"max_products must be a whole number from 1 to {SCRAPE_MAX_PRODUCTS}"
+        raise PipelineError(message, body={"error": message})
+
+
+def validate_scrape_reviews(data):
+    if not data:
+        raise PipelineError("No JSON data provided")
+    if not data.get('products', []):
+        raise PipelineError("products array is required")
+
+
+def validate_complete_analysis(data):
+    if not data:
+        raise PipelineError("No JSON data provided")
+    if not all([data.get('product_id', ''), data.get('product_title', ''), data.get('product_url', '')]):
+        raise PipelineError("product_id, product_title, and product_url are required")
+
+
+def product_link(product):
+    return product.get('link') or product.get('product_url', '')
+
+
+def validate_bulk_analysis(data):
+    if not data:
+        raise PipelineError("No JSON data provided")
+    products = data.get('products', [])
+    if not products:
+        raise PipelineError("products array is required")
+    if len(products) > BULK_MAX_PRODUCTS:
+        raise PipelineError(f"At most {BULK_MAX_PRODUCTS} products can be analyzed per request")
+    if not all(product_link(product) for product in products):
+        raise PipelineError("Every product needs a link")
+    drivers = data.get('drivers', 1)
+    if isinstance(drivers, bool) or not isinstance(drivers, int) or not 1 <= drivers <= BULK_MAX_DRIVERS:
+        raise PipelineError(f"drivers must be a whole number from 1 to {BULK_MAX_DRIVERS}")
+
+
+def coalesce_scrape_products(data):
+    return json.dumps(["scrape-products", data.get('category', '').strip().lower(), data.get('max_products', 20)])
+
+
+def coalesce_scrape_reviews(data):
+    products = sorted(
+        (str(product.get('id', '')), normalize_product_url(product.get('link', '')))
+        for product in data.get('products', [])
+    )
+    return json.dumps(["scrape-reviews", products])
+
+
+def coalesce_complete_analysis(data):
+    return json.dumps([
+        "complete-analysis", normalize_product_url(data.get('product_url', '')), data.get('max_reviews', 50)
+    ])
+
+
+def coalesce_bulk_analysis(data):
+    products = sorted(
+        (str(product.get('id', '')), normalize_product_url(product_link(product)))
+        for product in data.get('products', [])
+    )
+    return json.dumps(["bulk-analysis", products, data.get('max_reviews', 50)])
+
+
+def scrape_products(data, job=DetachedJob()):
+    """Scrape a category listing and save the products"""
+    validate_scrape_products(data)
+    category = data.get('category', '')
+    max_products = data.get('max_products', 20)
+
+    print(f"Starting to scrape products for category: {category}")
+    job.progress(stage="scraping", category=category)
+
+    products = scrape_snapdeal_products(
+        category, max_products,
+        on_page=lambda page, page_products: job.emit("page", page=page, products=page_products),
+        should_stop=job.should_stop
+    )
+    job.check_cancelled()
+
+    if not products:
+        return {
+            "products": [],
+            "message": "No products found for this category",
+            "category": category
+        }
+
+    saved_at = datetime.now().isoformat()
+    filename = record_log.append_many("products", (
+        {"type": "product", "category": category, "saved_at": saved_at, "product": product}
+        for product in products
+    ))
+    review_store.upsert_products(products, category=category)
+
+    return {
+        "success": True,
+        "products": products,
+        "count": len(products),
+        "category": category,
+        "saved_to": filename,
+        "message": f"Successfully scraped {len(products)} products"
+    }
+
+
+def scrape_reviews(data, job=DetachedJob()):
+    """Scrape reviews for a list of products with one shared browser"""
+    validate_scrape_reviews(data)
+    products = data.get('products', [])
+
+    print(f"\n{'='*70}")
+    print(f"Scraping reviews for {len(products)} product(s)")
+    print(f"{'='*70}\n")
+
+    # Create a single browser instance
+    driver = setup_driver()
+
+    results = []
+    total_reviews = 0
+    job.progress(products_total=len(products), products_done=0, total_reviews=0)
+
+    try:
+        for idx, product in enumerate(products, 1):
+            job.check_cancelled()
+            product_id = product.get('id', '')
+            product_title = product.get('title', 'Unknown Product')
+            product_url = product.get('link', '')
+
+            if not product_url:
+                print(f"[{idx}/{len(products)}] Skipping {product_title} - no URL")
+                results.append({
+                    "id": product_id,
+                    "title": product_title,
+                    "reviews": [],
+                    "error": "No product URL provided"
+                })
+                record_log.append("reviews", dict(results[-1], type="product_reviews"))
+                job.emit("product", index=idx, total=len(products), result=results[-1])
+                job.progress(products_done=idx)
+                continue
+
+            print(f"[{idx}/{len(products)}] Scraping: {product_title[:60]}...")
+            job.progress(current_product=product_id)
+
+            try:
+                # Scrape reviews using the shared driver
+                reviews = scrape_product_reviews_selenium(
+                    product_url, driver=driver,
+                    on_page=lambda page, new_reviews: job.emit(
+                        "page", product_id=product_id, page=page, reviews=len(new_reviews)
+                    ),
+                    should_stop=job.should_stop, title=product_title
+                )
+
+                if reviews:
+                    print(f"  ✓ Found {len(reviews)} reviews")
+                    total_reviews += len(reviews)
+                else:
+                    print(f"  ✗ No reviews found")
+
+                results.append({
+                    "id": product_id,
+                    "title": product_title,
+                    "url": product_url,
+                    "reviews": reviews,
+                    "review_count": len(reviews),
+                    "scraped_at": datetime.now().isoformat()
+                })
+                review_store.upsert_reviews(results[-1], reviews, scraped_at=results[-1]["scraped_at"])
+
+            except Exception as scrape_error:
+                print(f"  ✗ Error scraping product: {scrape_error}")
+                results.append({
+                    "id": product_id,
+                    "title": product_title,
+                    "url": product_url,
+                    "reviews": [],
+                    "review_count": 0,
+                    "error": str(scrape_error),
+                    "scraped_at": datetime.now().isoformat()
+                })
+
+            record_log.append("reviews", dict(results[-1], type="product_reviews"))
+            job.emit("product", index=idx, total=len(products), result=results[-1])
+            job.progress(products_done=idx, total_reviews=total_reviews)
+
+            # Small delay between products
+            if idx < len(products):
+                polite_sleep(2)
+
+    finally:
+        # Always close the driver
+        driver.quit()
+        print(f"\n{'='*70}")
+        print(f"SCRAPING COMPLETED")
+        print(f"{'='*70}")
+        print(f"Products processed: {len(results)}")
+        print(f"Total reviews: {total_reviews}")
+        print(f"{'='*70}\n")
+
+    # Each product was logged as it finished; close the run with its totals
+    filename = record_log.append("reviews", {
+        "type": "reviews_run",
+        "job_id": job.id,
+        "scraped_at": datetime.now().isoformat(),
+        "total_products": len(results),
+        "total_reviews": total_reviews
+    })
+
+    return {
+        "success": True,
+        "results": results,
+        "total_products": len(results),
+        "total_reviews": total_reviews,
+        "file_saved": filename,
+        "message": f"Successfully scraped {total_reviews} reviews from {len(results)} products"
+    }
+
+
+def complete_analysis(data, job=DetachedJob()):
+    """Scrape one product's reviews and analyze their sentiment"""
+    validate_complete_analysis(data)
+    product_id = data.get('product_id', '')
+    product_title = data.get('product_title', '')
+    product_url = data.get('product_url', '')
+    max_reviews = data.get('max_reviews', 50)
+
+    print(f"Starting complete analysis for: {product_title}")
+
+    # Step 1: Scrape reviews
+    job.progress(stage="scraping")
+    try:
+        reviews = scrape_product_reviews_selenium(
+            product_url, max_reviews,
+            on_page=lambda page, new_reviews: job.emit("page", page=page, reviews=len(new_reviews)),
+            should_stop=job.should_stop, title=product_title
+        )
+    except Exception as e:
+        print(f"Error scraping reviews: {e}")
+        reviews = []
+
+    job.check_cancelled()
+    if not reviews:
+        raise PipelineError("No reviews found for this product", status=404)
+
+    # Step 2: Analyze sentiment directly (don't call the endpoint)
+    job.progress(stage="analyzing", reviews_total=len(reviews), reviews_done=0)
+    analyzed_reviews = []
+    sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
+
+    # Scored in batches, so a cancel lands between batches and clients see partial summaries
+    store_id = product_id_for(product_url)
+    for start in range(0, len(reviews), SUMMARY_EVENT_EVERY):
+        job.check_cancelled()
+        batch = analyze_reviews(reviews[start:start + SUMMARY_EVENT_EVERY], store_id)
+        for analyzed in batch:
+            sentiment_label = analyzed["sentiment"].get("sentiment", "neutral")
+            sentiment_counts[sentiment_label] = sentiment_counts.get(sentiment_label, 0) + 1
+        analyzed_reviews.extend(batch)
+
+        job.progress(reviews_done=min(start + SUMMARY_EVENT_EVERY, len(reviews)))
+        if batch:
+            job.emit(
+                "summary",
+                analyzed=len(analyzed_reviews),
+                total=len(reviews),
+                counts=dict(sentiment_counts),
+                sentiment_summary=sentiment_percentages(sentiment_counts),
+                reviews=batch
+            )
+
+    # Calculate summary
+    total_reviews = len(analyzed_reviews)
+    sentiment_summary = sentiment_percentages(sentiment_counts)
+
+    max_sentiment = max(sentiment_summary.items(), key=lambda x: x[1])
+    overall_sentiment = max_sentiment[0]
+
+    # Prepare complete result
+    complete_result = {
+        "product_id": product_id,
+        "product_title": product_title,
+        "product_url": product_url,
+        "reviews": reviews,
+        "analyzed_reviews": analyzed_reviews,
+        "sentiment_summary": sentiment_summary,
+        "overall_sentiment": overall_sentiment,
+        "analysis_id": f"analysis_{product_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        "scraped_at": datetime.now().isoformat(),
+        "analyzed_at": datetime.now().isoformat(),
+        "total_reviews": total_reviews
+    }
+
+    filename = record_log.append("analyses", dict(complete_result, type="complete_analysis"))
+    store_product = {"id": product_id, "title": product_title, "url": product_url}
+    review_store.upsert_reviews(store_product, reviews, scraped_at=complete_result["scraped_at"])
+    review_store.record_analysis(complete_result["analysis_id"], store_product, analyzed_reviews, {
+        "total_reviews": total_reviews,
+        "counts": sentiment_counts,
+        "sentiment_summary": sentiment_summary,
+        "overall_sentiment": overall_sentiment
+    }, created_at=complete_result["analyzed_at"])
+
+    result = {
+        "success": True,
+        "analysis": complete_result,
+        "file_saved": filename,
+        "message": f"Successfully completed analysis for {total_reviews} reviews"
+    }
+    analysis_cache.put(coalesce_complete_analysis(data), result)
+    return result
+
+
+def scrape_with_driver_pool(products, max_reviews, drivers, job=DetachedJob()):
+    """Scrape the reviews of many products with `drivers` browsers, each reused across products.
+    Returns {"reviews": [...], "error": str|None} per product, in input order"""
+    scraped = [None] * len(products)
+    pending = iter(range(len(products)))
+    lock = threading.Lock()
+    done = [0]
+
+    def scrape_next():
+        try:
+            driver = setup_driver()
+        except Exception as e:
+            print(f"  ✗ Could not start a browser: {e}")
+            return
+        try:
+            while not job.should_stop():
+                with lock:
+                    idx = next(pending, None)
+                if idx is None:
+                    return
+                product = products[idx]
+                product_id = product.get('id', '')
+                print(f"[{idx + 1}/{len(products)}] Scraping: {product.get('title', 'Unknown Product')[:60]}...")
+                try:
+                    reviews = scrape_product_reviews_selenium(
+                        product_link(product), max_reviews, driver=driver,
+                        on_page=lambda page, new_reviews: job.emit(
+                            "page", product_id=product_id, page=page, reviews=len(new_reviews)
+                        ),
+                        should_stop=job.should_stop, title=product.get('title')
+                    )
+                    scraped[idx] = {"reviews": reviews or [], "error": None}
+                except Exception as scrape_error:
+                    print(f"  ✗ Error scraping product: {scrape_error}")
+                    scraped[idx] = {"reviews": [], "error": str(scrape_error)}
+                with lock:
+                    done[0] += 1
+                    job.progress(products_done=done[0])
+                polite_sleep(2)
+        finally:
+            driver.quit()
+
+    threads = [threading.Thread(target=scrape_next, name=f"bulk-driver-{i}") for i in range(drivers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [entry or {"reviews": [], "error": "Product was not scraped"} for entry in scraped]
+
+
+def bulk_analysis(data, job=DetachedJob()):
+    """Analyze many products in one job: shared browsers for scraping, then one batched
+    sentiment pass over every product's reviews, with per-product and combined summaries"""
+    validate_bulk_analysis(data)
+    products = data.get('products', [])
+    max_reviews = data.get('max_reviews', 50)
+    drivers = min(data.get('drivers', 1), len(products))
+
+    print(f"\n{'='*70}")
+    print(f"Bulk analysis of {len(products)} product(s) with {drivers} browser(s)")
+    print(f"{'='*70}\n")
+
+    # Step 1: Scrape every product, reusing the browsers
+    job.progress(stage="scraping", products_total=len(products), products_done=0)
+    scraped = scrape_with_driver_pool(products, max_reviews, drivers, job)
+    job.check_cancelled()
+
+    # Step 2: One analysis pass over all reviews, with the same analyzer as complete-analysis
+    job.progress(stage="analyzing", reviews_total=sum(len(entry["reviews"]) for entry in scraped))
+    analyses = analyze_review_batches(
+        [entry["reviews"] for entry in scraped], scorer=analyze_sentiments,
+        product_ids=[store_product_id({"id": product.get('id'), "link": product_link(product)}) for product in products]
+    )
+
+    results = []
+    combined = SentimentSummary()
+    for idx, (product, entry, analysis) in enumerate(zip(products, scraped, analyses), 1):
+        summary = SentimentSummary()
+        for review in analysis["analyzed_reviews"]:
+            scores = review["sentiment_analysis"]
+            summary.add(scores["sentiment"], scores["polarity"], review["rating"])
+        combined.merge(summary)
+
+        analyzed = bool(analysis["analyzed_reviews"])
+        results.append({
+            "product_id": product.get('id', ''),
+            "product_title": product.get('title', 'Unknown Product'),
+            "product_url": product_link(product),
+            "success": analyzed,
+            "error": None if analyzed else entry["error"] or "No reviews found for this product",
+            "review_count": len(entry["reviews"]),
+            "sentiment_analysis": analysis,
+            "summary": summary.to_dict(),
+            "analyzed_at": datetime.now().isoformat()
+        })
+        record_log.append("analyses", dict(results[-1], type="bulk_analysis_product"))
+        job.emit("product", index=idx, total=len(products), result=results[-1])
+
+    succeeded = sum(1 for result in results if result["success"])
+    bulk_result = {
+        "success": True,
+        "results": results,
+        "combined_summary": combined.to_dict(),
+        "total_products": len(results),
+        "succeeded": succeeded,
+        "total_reviews": combined.total,
+        "analyzed_at": datetime.now().isoformat()
+    }
+
+    filename = record_log.append("analyses", dict(
+        {key: value for key, value in bulk_result.items() if key != "results"},
+        type="bulk_analysis", job_id=job.id
+    ))
+    for result in results:
+        if result["success"]:
+            review_store.record_analysis(
+                f"bulk_{result['analyzed_at']}_{result['product_id']}",
+                {"id": result["product_id"], "title": result["product_title"], "url": result["product_url"]},
+                result["sentiment_analysis"]["analyzed_reviews"], result["summary"],
+                kind="bulk-analysis", created_at=result["analyzed_at"]
+            )
+
+    return dict(
+        bulk_result,
+        file_saved=filename,
+        message=f"Analyzed {combined.total} reviews across {succeeded} of {len(results)} products"
+    )
+
+
+# kind -> (validate, run, coalesce key); identical in-flight requests share one job
+PIPELINES = {
+    "scrape-products": (validate_scrape_products, scrape_products, coalesce_scrape_products),
+    "scrape-reviews": (validate_scrape_reviews, scrape_reviews, coalesce_scrape_reviews),
+    "complete-analysis": (validate_complete_analysis, complete_analysis, coalesce_complete_analysis),
+    "bulk-analysis": (validate_bulk_analysis, bulk_analysis, coalesce_bulk_analysis),
+}
+
+# Worker capabilities each job kind needs; scrapers drive a browser, analysis loads the model
+JOB_REQUIREMENTS = {
+    "scrape-products": ("browser",),
+    "scrape-reviews": ("browser",),
+    "complete-analysis": ("browser", "model"),
+    "bulk-analysis": ("browser", "model"),
+    "recrawl": ("browser", "model"),
+}
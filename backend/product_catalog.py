@@ -0,0 +1,113 @@
+# backend/product_catalog.py
+"""In-memory catalog behind GET /api/products.
+
+Listing bodies are kept per (category, limit) as ready-to-send JSON bytes
+with their ETag, so a repeated GET is a dict lookup with no query, no
+serialization and no disk I/O. Entries are dropped together when the review
+store's version changes. Product writes in this process bump it at once. Commits from other processes
+(workers) show up in the database/WAL mtimes, which are checked at most once
+per `check_interval` seconds.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from http_cache import prepared_json
+from review_store import review_store
+
+
+class ProductCatalog:
+    """Pre-serialized product listings, invalidated by the store's version"""
+
+    def __init__(self, store, check_interval=1.0, max_entries=256):
+        self.store = store
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._generation = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def listing(self, category=None, limit=200):
+        """(body bytes, etag) of the /api/products response for this category and limit"""
+        key = (category, limit)
+        with self._lock:
+            self._refresh_version()
+            prepared = self._entries.get(key)
+            if prepared is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return prepared
+            self.misses += 1
+            version = self._version
+
+        prepared = self._build(category, limit)
+        with self._lock:
+            # Don't keep a body built from data that changed while it was being built
+            if version == self._version and self.max_entries > 0:
+                self._entries[key] = prepared
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return prepared
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "check_interval": self.check_interval,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
+
+    def _refresh_version(self):
+        """Re-read the store version when this process wrote or the check interval passed"""
+        now = time.monotonic()
+        if self.store.generation == self._generation and now - self._checked_at < self.check_interval:
+            return
+        self._generation = self.store.generation
+        self._checked_at = now
+        version = self.store.version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def _build(self, category, limit):
+        products = self.store.products(category, limit=limit)
+        if products:
+            body = {
+                "success": True,
+                "products": products,
+                "count": len(products),
+                "source": "store",
+                "category": category,
+                "message": f"Loaded {len(products)} products"
+            }
+        else:
+            body = {
+                "success": True,
+                "products": [],
+                "message": "No saved products found",
+                "category": category
+            }
+        return prepared_json(body)
+
+
+product_catalog = ProductCatalog(
+    review_store,
+    check_interval=float(os.environ.get('PRODUCT_CATALOG_CHECK_INTERVAL') or 1),
+    max_entries=int(os.environ.get('PRODUCT_CATALOG_MAX_ENTRIES') or 256)
+)
@@ -0,0 +1,198 @@
+# backend/replay_server.py
+"""Local HTTP stand-in for snapdeal.com that serves recorded pages.
+
+Usage:
+  python replay_server.py [--dir recordings | --archive data/archive] [--port 8765]
+                          [--latency 0.2] [--error-rate 0.05]
+
+Then run the scrapers with SNAPDEAL_BASE_URL=http://127.0.0.1:8765 and
+SCRAPER_DELAY_SCALE=0 so no request leaves the machine.
+
+A recordings directory may contain a manifest.json mapping request paths
+(optionally with the query string) or path prefixes to files:
+  {"/products/men-apparel-shirts": "listing_shirts.html", "/product/": "pdp.html"}
+The longest matching prefix wins. Anything unmatched is served from the
+default page (backend/page_source.html).
+
+A raw page archive (see page_archive.py) can be replayed instead with
+--archive <dir>, which serves the latest capture of every archived URL.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "page_source.html")
+
+
+class ReplayServer:
+    """Serves recorded pages with configurable latency and error injection"""
+
+    def __init__(self, recordings_dir=None, routes=None, archive_dir=None, default_page=DEFAULT_PAGE,
+                 latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 seed=None, host="127.0.0.1", port=0):
+        self.recordings_dir = recordings_dir
+        self.routes = dict(routes or {})
+        self.default_page = default_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.host = host
+        self.port = port
+        self.request_count = 0
+        self.error_count = 0
+        self.bytes_served = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies = {}
+        self._httpd = None
+        self._thread = None
+
+        if archive_dir:
+            from page_archive import PageArchive
+            for path, filename in PageArchive(archive_dir).replay_routes().items():
+                self.routes.setdefault(path, filename)
+
+        if recordings_dir:
+            manifest_path = os.path.join(recordings_dir, "manifest.json")
+            if os.path.exists(manifest_path):
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    for path, filename in json.load(f).items():
+                        self.routes.setdefault(path, os.path.join(recordings_dir, filename))
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def resolve(self, path):
+        """Return the recording file for a request path, or the default page"""
+        if path in self.routes:
+            return self.routes[path]
+        bare_path = path.split("?")[0]
+        if bare_path in self.routes:
+            return self.routes[bare_path]
+        prefixes = [prefix for prefix in self.routes if bare_path.startswith(prefix)]
+        if prefixes:
+            return self.routes[max(prefixes, key=len)]
+        return self.default_page
+
+    def load(self, filename):
+        """Read a recording once and keep the bytes in memory"""
+        with self._lock:
+            body = self._bodies.get(filename)
+        if body is None:
+            if filename.endswith(".gz"):
+                import gzip
+                with gzip.open(filename, "rb") as f:
+                    body = f.read()
+            else:
+                with open(filename, "rb") as f:
+                    body = f.read()
+            with self._lock:
+                self._bodies[filename] = body
+        return body
+
+    def _next_fault(self):
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if failed:
+                self.error_count += 1
+        return delay, failed
+
+    def _make_handler(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay, failed = server._next_fault()
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    self.send_response(server.error_status)
+                    self.send_header("Content-Type", "text/plain")
+                    self.end_headers()
+                    self.wfile.write(b"injected error")
+                    return
+                try:
+                    body = server.load(server.resolve(self.path))
+                except OSError:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                with server._lock:
+                    server.bytes_served += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return ReplayHandler
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded Snapdeal pages locally")
+    parser.add_argument("--dir", help="Recordings directory with an optional manifest.json")
+    parser.add_argument("--archive", help="Raw page archive directory to replay")
+    parser.add_argument("--default-page", default=DEFAULT_PAGE)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        recordings_dir=args.dir,
+        archive_dir=args.archive,
+        default_page=args.default_page,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        host=args.host,
+        port=args.port
+    ).start()
+    print(f"🎞️  Replay server running on {server.base_url}")
+    print(f"   Run scrapers with SNAPDEAL_BASE_URL={server.base_url} SCRAPER_DELAY_SCALE=0")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
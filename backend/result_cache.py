@@ -0,0 +1,91 @@
+# backend/result_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from http_cache import prepared_json
+
+
+class AnalysisCache:
+    """Bounded LRU of finished analyses with a freshness TTL and a stale-while-revalidate window"""
+
+    def __init__(self, ttl=900, stale_ttl=3600, max_entries=256):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return (result, state, age) where state is "fresh", "stale" or "miss" """
+        entry, state, age = self._lookup(key)
+        return (entry[1] if entry else None), state, age
+
+    def get_prepared(self, key):
+        """Like get(), but the result comes serialized as (body bytes, etag), built once per entry"""
+        entry, state, age = self._lookup(key)
+        if entry is None:
+            return None, state, age
+        if entry[2] is None:
+            entry[2] = prepared_json(entry[1])
+        return entry[2], state, age
+
+    def _lookup(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, "miss", None
+            age = now - entry[0]
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry, "fresh", age
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return entry, "stale", age
+            del self._entries[key]
+            self.misses += 1
+            return None, "miss", None
+
+    def put(self, key, result):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            # [stored_at, result, (body, etag) once serialized]
+            self._entries[key] = [time.time(), result, None]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses
+            }
+
+
+analysis_cache = AnalysisCache(
+    ttl=float(os.environ.get('ANALYSIS_CACHE_TTL') or 900),
+    stale_ttl=float(os.environ.get('ANALYSIS_CACHE_STALE_TTL') or 3600),
+    max_entries=int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES') or 256)
+)
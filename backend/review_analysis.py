@@ -0,0 +1,332 @@
+# backend/review_analysis.py
+import os
+from datetime import datetime
+
+from stable_ids import review_id_for
+# Import the custom sentiment analyzer
+from analyzer.sentiment_analyzer import SentimentAnalyzer
+
+# Initialize the sentiment analyzer with trained DistilBERT model
+try:
+    # Try different paths for the sentiment model
+    possible_model_paths = [
+        "./sentiment_model",
+        "../sentiment_model", 
+        "./backend/sentiment_model"
+    ]
+    
+    sentiment_analyzer = None
+    for model_path in possible_model_paths:
+        try:
+            if os.path.exists(model_path):
+                sentiment_analyzer = SentimentAnalyzer(model_path)
+                print(f"✅ Sentiment analyzer initialized from: {model_path}")
+                break
+        except Exception as e:
+            print(f"❌ Failed to load from {model_path}: {e}")
+            continue
+    
+    if sentiment_analyzer is None:
+        print("⚠️  Could not load trained model, using fallback analysis")
+        
+except Exception as e:
+    print(f"❌ Error initializing sentiment analyzer: {e}")
+    print("⚠️  Falling back to TextBlob-based analysis")
+    sentiment_analyzer = None
+
+def analyze_sentiment(text):
+    """Analyze sentiment using trained model"""
+    try:
+        if not text or not text.strip():
+            return {
+                "sentiment": "neutral",
+                "score": 50.0,
+                "confidence": 50.0,
+                "polarity": 0.0
+            }
+        
+        if sentiment_analyzer is None:
+            # TextBlob fallback
+            from textblob import TextBlob
+            blob = TextBlob(text)
+            polarity = blob.sentiment.polarity
+            
+            if polarity > 0.1:
+                sentiment = "positive"
+            elif polarity < -0.1:
+                sentiment = "negative"
+            else:
+                sentiment = "neutral"
+            
+            return {
+                "sentiment": sentiment,
+                "score": abs(polarity) * 100,
+                "confidence": abs(polarity) * 100,
+                "polarity": polarity
+            }
+        
+        # Use trained model
+        analysis = sentiment_analyzer.analyze_single_review(text)
+        return {
+            "sentiment": analysis["sentiment"],
+            "score": analysis["confidence"],
+            "confidence": analysis["confidence"],
+            "polarity": analysis["polarity"]
+        }
+    except Exception as e:
+        print(f"Error analyzing: {e}")
+        return {
+            "sentiment": "neutral",
+            "score": 50.0,
+            "confidence": 50.0,
+            "polarity": 0.0,
+            "error": str(e)
+        }
+
+def analyze_sentiments(texts):
+    """analyze_sentiment for many texts in one pass; identical texts (short stock reviews repeat
+    a lot) are analyzed once. The entry point the analysis pipelines batch through"""
+    results = {}
+    for text in texts:
+        if text not in results:
+            results[text] = analyze_sentiment(text)
+    return [results[text] for text in texts]
+
+def calculate_sentiment_summary(analyzed_reviews):
+    """Calculate sentiment percentages"""
+    if not analyzed_reviews:
+        return {"positive": 0, "negative": 0, "neutral": 100}
+    
+    sentiments = [review.get("sentiment", {}).get("sentiment", "neutral") for review in analyzed_reviews]
+    total = len(sentiments)
+    
+    if total == 0:
+        return {"positive": 0, "negative": 0, "neutral": 100}
+    
+    positive = (sentiments.count("positive") / total) * 100
+    negative = (sentiments.count("negative") / total) * 100
+    neutral = (sentiments.count("neutral") / total) * 100
+    
+    return {
+        "positive": round(positive, 1),
+        "negative": round(negative, 1),
+        "neutral": round(neutral, 1)
+    }
+
+
+def _prepare_review(review, product_id=""):
+    """(id, text, reviewer, date, rating) of a scraped review; None if it has no usable text.
+    Reviews without an id get the one the review store would give them under product_id"""
+    # Extract text from review (handle both string and object formats)
+    if isinstance(review, dict):
+        text = review.get('text', '') or review.get('review', '') or str(review)
+        reviewer = review.get('reviewer', 'Anonymous')
+        date = review.get('date', 'Unknown')
+        rating = review.get('rating', None)
+        review_id = review.get('id') or review_id_for(review, product_id)
+    else:
+        text = str(review)
+        reviewer = 'Anonymous'
+        date = 'Unknown'
+        rating = None
+        review_id = review_id_for(text, product_id)
+
+    # Clean and validate text
+    if not text or len(text.strip()) < 3:
+        return None
+    return review_id, text.strip(), reviewer, date, rating
+
+
+def score_review_text(text):
+    """TextBlob sentiment of one cleaned review text"""
+    from textblob import TextBlob
+
+    blob = TextBlob(text)
+    polarity = blob.sentiment.polarity
+    subjectivity = blob.sentiment.subjectivity
+
+    # Enhanced sentiment classification
+    if polarity > 0.2:
+        sentiment = "positive"
+        score = min(100, int(60 + (polarity * 40)))  # 60-100 range
+    elif polarity < -0.2:
+        sentiment = "negative"
+        score = max(0, int(40 + (polarity * 40)))   # 0-40 range
+    else:
+        sentiment = "neutral"
+        score = 50  # Middle ground
+
+    # Calculate confidence based on polarity strength
+    confidence = min(95, int((abs(polarity) * 80) + 50))
+
+    return {
+        "sentiment": sentiment,
+        "score": score,
+        "confidence": confidence,
+        "polarity": round(polarity, 3),
+        "subjectivity": round(subjectivity, 3)
+    }
+
+
+def score_review_texts(texts):
+    """Score many texts in one pass; identical texts (short stock reviews repeat a lot) are scored once.
+    Returns one result per text, None where scoring failed"""
+    scores = {}
+    for text in texts:
+        if text not in scores:
+            try:
+                scores[text] = score_review_text(text)
+            except Exception as e:
+                print(f"   ⚠️ Error analyzing review: {e}")
+                scores[text] = None
+    return [scores[text] for text in texts]
+
+
+def analyze_reviews_comprehensive(reviews, product_id=""):
+    """Comprehensive sentiment analysis for reviews"""
+    return analyze_review_batches([reviews], product_ids=[product_id])[0]
+
+
+def analyze_review_batches(review_lists, scorer=score_review_texts, product_ids=None):
+    """Comprehensive analysis of several review lists (e.g. one per product, with its store id in
+    product_ids) with a single scoring pass over all of their reviews.
+    scorer(texts) returns one result per text, None to skip it"""
+    product_ids = product_ids or [""] * len(review_lists)
+    prepared = [
+        [entry for entry in (_prepare_review(review, product_id) for review in reviews) if entry]
+        for reviews, product_id in zip(review_lists, product_ids)
+    ]
+    total = sum(len(entries) for entries in prepared)
+    print(f"🔍 Analyzing {total} reviews...")
+    scores = iter(scorer([entry[1] for entries in prepared for entry in entries]))
+
+    results = []
+    for entries in prepared:
+        analyzed_reviews = []
+        for review_id, text, reviewer, date, rating in entries:
+            sentiment_analysis = next(scores)
+            if sentiment_analysis is None:
+                continue
+            analyzed_reviews.append({
+                "id": review_id,
+                "text": text,
+                "reviewer": reviewer,
+                "date": date,
+                "rating": rating,
+                "sentiment_analysis": sentiment_analysis
+            })
+        results.append(summarize_analyzed_reviews(analyzed_reviews))
+    return results
+
+
+def summarize_analyzed_reviews(analyzed_reviews):
+    """Summary, insights and timestamp around scored reviews"""
+    sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
+    for review in analyzed_reviews:
+        sentiment_counts[review["sentiment_analysis"]["sentiment"]] += 1
+    sentiment_scores = [review["sentiment_analysis"]["score"] for review in analyzed_reviews]
+
+    # Calculate comprehensive summary
+    total_reviews = len(analyzed_reviews)
+    
+    if total_reviews == 0:
+        return {
+            "analyzed_reviews": [],
+            "summary": {
+                "total_reviews": 0,
+                "positive_reviews": 0,
+                "negative_reviews": 0,
+                "neutral_reviews": 0,
+                "positive_percentage": 0,
+                "negative_percentage": 0,
+                "neutral_percentage": 0,
+                "sentiment_score": 0,
+                "overall_sentiment": "neutral",
+                "average_confidence": 0
+            },
+            "insights": ["No valid reviews available for analysis"],
+            "analysis_timestamp": datetime.now().isoformat()
+        }
+    
+    # Calculate percentages
+    positive_percent = round((sentiment_counts["positive"] / total_reviews) * 100, 1)
+    negative_percent = round((sentiment_counts["negative"] / total_reviews) * 100, 1)
+    neutral_percent = round((sentiment_counts["neutral"] / total_reviews) * 100, 1)
+    
+    # Calculate overall sentiment score (weighted average)
+    avg_sentiment_score = round(sum(sentiment_scores) / len(sentiment_scores), 1) if sentiment_scores else 50
+    
+    # Determine overall sentiment
+    if positive_percent > negative_percent and positive_percent > neutral_percent:
+        overall_sentiment = "positive"
+    elif negative_percent > positive_percent and negative_percent > neutral_percent:
+        overall_sentiment = "negative"
+    else:
+        overall_sentiment = "neutral"
+    
+    # Calculate average confidence
+    avg_confidence = round(sum(r["sentiment_analysis"]["confidence"] for r in analyzed_reviews) / total_reviews, 1)
+    
+    print(f"📊 FINAL RESULTS:")
+    print(f"   Total: {total_reviews}")
+    print(f"   Positive: {positive_percent}% ({sentiment_counts['positive']})")
+    print(f"   Negative: {negative_percent}% ({sentiment_counts['negative']})") 
+    print(f"   Neutral: {neutral_percent}% ({sentiment_counts['neutral']})")
+    print(f"   Overall: {overall_sentiment} (score: {avg_sentiment_score})")
+    
+    return {
+        "analyzed_reviews": analyzed_reviews,
+        "summary": {
+            "total_reviews": total_reviews,
+            "positive_reviews": sentiment_counts["positive"],
+            "negative_reviews": sentiment_counts["negative"],
+            "neutral_reviews": sentiment_counts["neutral"],
+            "positive_percentage": positive_percent,
+            "negative_percentage": negative_percent,
+            "neutral_percentage": neutral_percent,
+            "sentiment_score": avg_sentiment_score,
+            "overall_sentiment": overall_sentiment,
+            "average_confidence": avg_confidence
+        },
+        "insights": generate_detailed_insights(sentiment_counts, total_reviews, avg_sentiment_score),
+        "analysis_timestamp": datetime.now().isoformat()
+    }
+def generate_detailed_insights(sentiment_counts, total_reviews, sentiment_score):
+    """Generate detailed insights based on analysis"""
+    insights = []
+    
+    positive = sentiment_counts["positive"]
+    negative = sentiment_counts["negative"] 
+    neutral = sentiment_counts["neutral"]
+    
+    if total_reviews == 0:
+        return ["No reviews available for analysis"]
+    
+    # Sentiment strength insights
+    if sentiment_score >= 70:
+        insights.append("Strong positive customer sentiment")
+    elif sentiment_score <= 30:
+        insights.append("Significant negative customer feedback")
+    else:
+        insights.append("Moderate customer sentiment")
+    
+    # Distribution insights
+    if positive > negative and positive > neutral:
+        insights.append(f"Positive reviews dominate ({positive}/{total_reviews})")
+        if positive >= total_reviews * 0.7:
+            insights.append("Excellent customer satisfaction levels")
+    elif negative > positive and negative > neutral:
+        insights.append(f"Negative feedback requires attention ({negative}/{total_reviews})")
+        if negative >= total_reviews * 0.4:
+            insights.append("Urgent action needed to address concerns")
+    else:
+        insights.append("Mixed customer opinions with neutral dominance")
+    
+    # Additional insights based on ratios
+    if positive >= total_reviews * 0.8:
+        insights.append("Outstanding product reception")
+    elif negative >= total_reviews * 0.5:
+        insights.append("Critical issues need immediate resolution")
+    
+    return insights
+  
@@ -0,0 +1,53 @@
+# backend/review_dates.py
+"""Parsing of the free-form dates scraped with reviews.
+
+Snapdeal shows dates like "Sep 25, 2024" or "on 12 Oct, 2025". The scraper
+often can't separate them from the review body ("Unknown date"), but the body
+then usually ends in "by <name> on Oct 02, 2025". Reviews repeat the same few
+hundred date strings, so parsing is memoized.
+"""
+import re
+from datetime import datetime
+from functools import lru_cache
+
+DATE_FORMATS = ("%b %d %Y", "%B %d %Y", "%d %b %Y", "%d %B %Y", "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+DATE_IN_TEXT = re.compile(
+    r'\b(\d{1,2}(?:st|nd|rd|th)?\s+[A-Za-z]{3,9}\.?,?\s+\d{4}'
+    r'|[A-Za-z]{3,9}\.?\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}'
+    r'|\d{4}-\d{2}-\d{2}|\d{1,2}[/-]\d{1,2}[/-]\d{4})\b'
+)
+
+
+@lru_cache(maxsize=4096)
+def parse_review_date(value):
+    """ISO day ("2025-10-12") of a scraped date string, or None if it has no recognizable date"""
+    match = DATE_IN_TEXT.search(value or "")
+    if not match:
+        return None
+    text = re.sub(r'(?<=\d)(st|nd|rd|th)\b', '', match.group(1))
+    text = re.sub(r'[.,]', ' ', text)
+    text = " ".join(text.split())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def review_day(review):
+    """Day a review was written: from its date field, else from a "... on <date>" in its text"""
+    day = parse_review_date(review.get("date"))
+    if day is None:
+        # The "by <name> on <date>" byline comes last, after any dates mentioned in the body
+        dates = DATE_IN_TEXT.findall(review.get("text") or review.get("review") or "")
+        day = parse_review_date(dates[-1]) if dates else None
+    return day
+
+
+@lru_cache(maxsize=4096)
+def bucket_keys(day):
+    """{granularity: bucket} for an ISO day: the day, its ISO week ("2025-W41") and month ("2025-10")"""
+    date = datetime.strptime(day, "%Y-%m-%d").date()
+    year, week, _ = date.isocalendar()
+    return {"day": day, "week": f"{year}-W{week:02d}", "month": day[:7]}
@@ -0,0 +1,190 @@
+# backend/review_export.py
+"""Columnar export of reviews and their sentiment to partitioned Parquet.
+
+Rows are streamed out of the review store in batches and written as row
+groups. Output is a hive-partitioned dataset that pandas, pyarrow, DuckDB
+and Spark read directly, loading only the columns a query needs:
+
+    <out>/category=<category>/date=<YYYY-MM-DD>/part-0.parquet
+
+A category that isn't safe as a directory name is slugged and given a short
+hash suffix ("a b" -> category=a_b-<hash>), so two categories never share a
+partition.
+
+The sentiment label is dictionary-encoded, so pandas gets a category column.
+rating, score, confidence and polarity are float32. Needs the optional
+`pyarrow` package:
+
+    python review_export.py --out exports/reviews [--category c] [--since 2025-10-01] [--until ...]
+    pandas.read_parquet("exports/reviews", columns=["sentiment", "score"])
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+
+from review_store import review_store, ReviewStore
+
+ROW_GROUP_SIZE = 50000
+
+
+class ExportUnavailable(Exception):
+    """pyarrow is not installed"""
+    status = 501
+
+
+def require_pyarrow():
+    try:
+        import pyarrow  # optional dependency, only needed for exports
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportUnavailable("Parquet export needs pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def review_schema(pa):
+    return pa.schema([
+        ("review_id", pa.string()),
+        ("product_id", pa.string()),
+        ("product_title", pa.string()),
+        ("text", pa.string()),
+        ("rating", pa.float32()),
+        ("reviewer", pa.string()),
+        ("review_date", pa.string()),
+        ("sentiment", pa.dictionary(pa.int32(), pa.string())),
+        ("score", pa.float32()),
+        ("confidence", pa.float32()),
+        ("polarity", pa.float32()),
+        ("analyzed_at", pa.timestamp("ms")),
+        ("scraped_at", pa.timestamp("ms"))
+    ])
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _partition_dir(category, day):
+    safe = re.sub(r'[^A-Za-z0-9._-]+', '_', category)
+    if safe != category:
+        safe = f"{safe}-{hashlib.blake2b(category.encode('utf-8'), digest_size=4).hexdigest()}"
+    return f"category={safe}", f"date={day or 'unknown'}"
+
+
+def _to_table(pa, schema, rows):
+    columns = {
+        "review_id": [row["id"] for row in rows],
+        "product_id": [row["product_id"] for row in rows],
+        "product_title": [row["product_title"] for row in rows],
+        "text": [row["text"] for row in rows],
+        "rating": [row["rating"] for row in rows],
+        "reviewer": [row["reviewer"] for row in rows],
+        "review_date": [row["review_date"] for row in rows],
+        "sentiment": pa.array([row["sentiment"] for row in rows], pa.string()).dictionary_encode(),
+        "score": [row["score"] for row in rows],
+        "confidence": [row["confidence"] for row in rows],
+        "polarity": [row["polarity"] for row in rows],
+        "analyzed_at": [_timestamp(row["analyzed_at"]) for row in rows],
+        "scraped_at": [_timestamp(row["scraped_at"]) for row in rows]
+    }
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def export_reviews(store, out_dir, category=None, since=None, until=None, row_group_size=ROW_GROUP_SIZE,
+                   compression="zstd"):
+    """Write the selected reviews as a partitioned Parquet dataset; returns a manifest of files.
+    Only one partition's writer is open at a time: rows come ordered by category and day"""
+    pa, pq = require_pyarrow()
+    schema = review_schema(pa)
+    files = []
+    writer, current = None, None
+
+    def close():
+        if writer is not None:
+            writer.close()
+            files[-1]["bytes"] = os.path.getsize(files[-1]["full_path"])
+
+    try:
+        for rows in store.iter_review_rows(category, since, until, batch_size=row_group_size):
+            # A batch can straddle partitions; write each run of rows to its own partition
+            start = 0
+            while start < len(rows):
+                key = (rows[start]["category"], rows[start]["day"])
+                end = start
+                while end < len(rows) and (rows[end]["category"], rows[end]["day"]) == key:
+                    end += 1
+                if key != current:
+                    close()
+                    directory = os.path.join(out_dir, *_partition_dir(*key))
+                    os.makedirs(directory, exist_ok=True)
+                    path = os.path.join(directory, "part-0.parquet")
+                    writer = pq.ParquetWriter(path, schema, compression=compression)
+                    current = key
+                    files.append({"category": key[0], "date": key[1], "full_path": path,
+                                  "path": os.path.relpath(path, out_dir), "rows": 0})
+                writer.write_table(_to_table(pa, schema, rows[start:end]), row_group_size=row_group_size)
+                files[-1]["rows"] += end - start
+                start = end
+        close()
+        writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+
+    for entry in files:
+        del entry["full_path"]
+    return {
+        "out_dir": out_dir,
+        "filters": {"category": category, "since": since, "until": until},
+        "files": files,
+        "rows": sum(entry["rows"] for entry in files),
+        "bytes": sum(entry["bytes"] for entry in files),
+        "exported_at": datetime.now().isoformat()
+    }
+
+
+def remove_old_exports(export_dir, retention_days, keep=None):
+    """Delete export datasets under export_dir last written more than retention_days ago; returns their names"""
+    cutoff = time.time() - retention_days * 86400
+    removed = []
+    try:
+        names = os.listdir(export_dir)
+    except FileNotFoundError:
+        return removed
+    for name in names:
+        path = os.path.join(export_dir, name)
+        if name == keep or not os.path.isdir(path) or os.path.getmtime(path) >= cutoff:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(name)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export reviews and sentiment to partitioned Parquet")
+    parser.add_argument("--out", required=True, help="output directory of the dataset")
+    parser.add_argument("--db", default=None, help="review store (default STORE_DB_PATH or data/store.db)")
+    parser.add_argument("--category")
+    parser.add_argument("--since", help="first scrape date/time to include, e.g. 2025-10-01")
+    parser.add_argument("--until", help="scrape date/time to stop before")
+    parser.add_argument("--row-group-size", type=int, default=ROW_GROUP_SIZE)
+    args = parser.parse_args()
+
+    store = ReviewStore(args.db) if args.db else review_store
+    try:
+        manifest = export_reviews(store, args.out, args.category, args.since, args.until, args.row_group_size)
+    except ExportUnavailable as e:
+        parser.error(str(e))
+    print(f"✅ Exported {manifest['rows']} reviews into {len(manifest['files'])} partition(s) under {args.out}")
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,858 @@
+# backend/review_store.py
+"""SQLite store of scraped products, reviews and sentiment analyses.
+
+Products are keyed by their stable id (stable_ids.product_id_for) and reviews
+by their stable review hash, so re-scrapes upsert instead of piling up
+duplicates. Per-review sentiment lives on the review row. Product-level
+analysis runs go in `analyses`. Lookups by category, product, scrape time and
+sentiment are indexed.
+
+Import the historical JSON files from data/ (safe to re-run):
+  python review_store.py migrate [--data data] [--db data/store.db]
+  python review_store.py stats [--db data/store.db]
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from persistence import log_files, read_records
+from review_dates import review_day, bucket_keys
+from sentiment_summary import SentimentSummary, parse_rating
+from stable_ids import product_id_for, review_id_for, store_product_id
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id TEXT PRIMARY KEY,
+    url TEXT,
+    title TEXT,
+    category TEXT,
+    price REAL,
+    data TEXT NOT NULL,
+    first_seen_at TEXT NOT NULL,
+    scraped_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_category_scraped ON products (category, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_products_scraped ON products (scraped_at);
+CREATE TABLE IF NOT EXISTS reviews (
+    id TEXT PRIMARY KEY,
+    product_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    rating REAL,
+    reviewer TEXT,
+    review_date TEXT,
+    review_day TEXT,
+    sentiment TEXT,
+    score REAL,
+    confidence REAL,
+    polarity REAL,
+    analyzed_at TEXT,
+    first_seen_at TEXT NOT NULL,
+    scraped_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_product_scraped ON reviews (product_id, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_product_sentiment ON reviews (product_id, sentiment);
+CREATE INDEX IF NOT EXISTS idx_reviews_sentiment ON reviews (sentiment);
+CREATE INDEX IF NOT EXISTS idx_reviews_scraped ON reviews (scraped_at);
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    product_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    total_reviews INTEGER NOT NULL,
+    overall_sentiment TEXT,
+    summary TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_product_created ON analyses (product_id, created_at);
+CREATE TABLE IF NOT EXISTS product_rollups (
+    product_id TEXT PRIMARY KEY,
+    category TEXT,
+    total INTEGER NOT NULL,
+    average_polarity REAL NOT NULL,
+    negative_share REAL NOT NULL,
+    summary TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rollups_category_polarity ON product_rollups (category, average_polarity);
+CREATE INDEX IF NOT EXISTS idx_rollups_category_total ON product_rollups (category, total);
+CREATE INDEX IF NOT EXISTS idx_rollups_category_negative ON product_rollups (category, negative_share);
+CREATE TABLE IF NOT EXISTS category_rollups (
+    category TEXT PRIMARY KEY,
+    products INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sentiment_buckets (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    positive INTEGER NOT NULL,
+    negative INTEGER NOT NULL,
+    neutral INTEGER NOT NULL,
+    polarity_sum REAL NOT NULL,
+    rating_sum REAL NOT NULL,
+    rating_count INTEGER NOT NULL,
+    PRIMARY KEY (scope, key, granularity, bucket)
+);
+CREATE TABLE IF NOT EXISTS compacted_files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    reviews INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    compacted_at TEXT NOT NULL
+);
+"""
+
+# Full-text index over review text, kept in step with the reviews table by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+    text, content='reviews', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+    INSERT INTO reviews_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+    INSERT INTO reviews_fts (reviews_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS reviews_fts_update AFTER UPDATE OF text ON reviews BEGIN
+    INSERT INTO reviews_fts (reviews_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO reviews_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+TREND_GRANULARITIES = ("day", "week", "month")
+
+# Leaderboard metric -> indexed product_rollups column
+LEADERBOARD_METRICS = {"score": "average_polarity", "volume": "total", "negative_share": "negative_share"}
+
+FILE_TIMESTAMP = re.compile(r'_(\d{8}_\d{6})\.json$')
+
+
+def fts_query(text):
+    """FTS5 query for free text: every word must match (AND), "quoted phrases" match as
+    phrases and a trailing * matches a prefix. Operators and punctuation are not special"""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\w+\*?)', text):
+        if phrase:
+            words = re.findall(r'\w+', phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+        elif word.endswith("*"):
+            terms.append(f'"{word[:-1]}"*')
+        else:
+            terms.append(f'"{word}"')
+    return " ".join(terms)
+
+
+def _file_time(path):
+    """Scrape time encoded in a data/ filename, as ISO text"""
+    match = FILE_TIMESTAMP.search(path)
+    if match:
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').isoformat()
+    return datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+
+
+def _price(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r'\d+(?:\.\d+)?', str(value or "").replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def _sentiment_fields(review):
+    """(sentiment, score, confidence, polarity) from either analyzed-review shape, or Nones"""
+    scores = review.get("sentiment_analysis") or review.get("sentiment")
+    if not isinstance(scores, dict):
+        return None, None, None, None
+    return scores.get("sentiment"), scores.get("score"), scores.get("confidence"), scores.get("polarity")
+
+
+class ReviewStore:
+    """Products, reviews and analyses in one SQLite database (WAL, one connection per thread)"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        self.fts_available = None
+        # Bumped on every product write in this process; see version()
+        self.generation = 0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            if not self._ready:
+                with self._ready_lock:
+                    had_rollups = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sentiment_buckets'").fetchone()
+                    conn.executescript(SCHEMA)
+                    self._add_review_days(conn)
+                    self._create_fts(conn)
+                    if not had_rollups:
+                        self._rebuild_rollups(conn)
+                    self._ready = True
+        return conn
+
+    def _add_review_days(self, conn):
+        """Add and backfill reviews.review_day in stores created before it existed"""
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(reviews)")]
+        if "review_day" not in columns:
+            conn.execute("ALTER TABLE reviews ADD COLUMN review_day TEXT")
+            rows = conn.execute("SELECT rowid, review_date, text FROM reviews").fetchall()
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("UPDATE reviews SET review_day = ? WHERE rowid = ?", [
+                (review_day({"date": row["review_date"], "text": row["text"]}), row["rowid"]) for row in rows
+            ])
+            conn.execute("COMMIT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_reviews_product_day ON reviews (product_id, review_day)")
+
+    def _create_fts(self, conn):
+        """Create the full-text index, indexing existing reviews if it is new. Search is
+        unavailable (fts_available False) when this SQLite build lacks FTS5"""
+        existed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'reviews_fts'").fetchone()
+        try:
+            conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  Review search disabled, SQLite has no FTS5: {e}")
+            self.fts_available = False
+            return
+        if not existed:
+            conn.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild')")
+        self.fts_available = True
+
+    def version(self):
+        """Changes whenever the products may have changed: on writes in this process (generation)
+        and, via the database and WAL file mtimes, on commits from other processes"""
+        stamp = [self.generation]
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                st = os.stat(path)
+                stamp += [st.st_mtime_ns, st.st_size]
+            except OSError:
+                stamp += [None, None]
+        return tuple(stamp)
+
+    def _execute(self, sql, args=()):
+        return self._connection().execute(sql, args)
+
+    def _transaction(self, statements):
+        """Run [(sql, rows)] executemany batches in one write transaction"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, rows in statements:
+                if rows:
+                    conn.executemany(sql, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def upsert_products(self, products, category=None, scraped_at=None):
+        """Insert or refresh listing products; returns how many were written"""
+        scraped_at = scraped_at or datetime.now().isoformat()
+        rows = []
+        for product in products:
+            url = product.get("link") or product.get("url") or product.get("product_url")
+            if not url:
+                continue
+            product_id = product_id_for(url)
+            data = {key: value for key, value in product.items() if key not in ("reviews", "sentiment")}
+            data["id"] = product_id
+            if category and not data.get("category"):
+                data["category"] = category
+            rows.append((
+                product_id, url, product.get("title"), product.get("category") or category,
+                _price(product.get("price")), json.dumps(data, ensure_ascii=False),
+                product.get("scraped_at") or scraped_at, product.get("scraped_at") or scraped_at
+            ))
+        self._transaction([(
+            "INSERT INTO products (id, url, title, category, price, data, first_seen_at, scraped_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+            "url = excluded.url, title = COALESCE(excluded.title, products.title), "
+            "category = COALESCE(excluded.category, products.category), "
+            "price = COALESCE(excluded.price, products.price), data = excluded.data, "
+            "scraped_at = MAX(products.scraped_at, excluded.scraped_at)",
+            rows
+        )])
+        self.generation += 1
+        self._refresh_rollups(self._recategorized([row[0] for row in rows]))
+        return len(rows)
+
+    def upsert_reviews(self, product, reviews, scraped_at=None):
+        """Insert or refresh one product's reviews (raw or analyzed). `product` needs a url and
+        may carry id/title/category; it is created if missing. Returns how many reviews were written"""
+        scraped_at = scraped_at or datetime.now().isoformat()
+        url = product.get("url") or product.get("link") or product.get("product_url")
+        product_id = store_product_id(product)
+        product_rows = []
+        if url:
+            data = {"id": product_id, "title": product.get("title"), "link": url}
+            if product.get("category"):
+                data["category"] = product["category"]
+            product_rows.append((
+                product_id, url, product.get("title"), product.get("category"),
+                json.dumps(data, ensure_ascii=False), scraped_at, scraped_at
+            ))
+
+        review_rows = []
+        for review in reviews:
+            if not isinstance(review, dict):
+                review = {"text": str(review)}
+            text = review.get("text") or review.get("review")
+            if not text:
+                continue
+            sentiment, score, confidence, polarity = _sentiment_fields(review)
+            review_scraped_at = review.get("scraped_at") or scraped_at
+            review_rows.append((
+                review.get("id") or review_id_for(review, product_id), product_id, text,
+                parse_rating(review.get("rating")), review.get("reviewer"), review.get("date"), review_day(review),
+                sentiment, score, confidence, polarity,
+                review.get("analyzed_at") or (scraped_at if sentiment else None),
+                review_scraped_at, review_scraped_at
+            ))
+
+        self._transaction([
+            (
+                # Reviews may arrive before the listing; keep whatever the listing stored
+                "INSERT INTO products (id, url, title, category, data, first_seen_at, scraped_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "title = COALESCE(products.title, excluded.title), "
+                "category = COALESCE(products.category, excluded.category)",
+                product_rows
+            ),
+            (
+                "INSERT INTO reviews (id, product_id, text, rating, reviewer, review_date, review_day, sentiment, "
+                "score, confidence, polarity, analyzed_at, first_seen_at, scraped_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "rating = COALESCE(excluded.rating, reviews.rating), "
+                "review_day = COALESCE(reviews.review_day, excluded.review_day), "
+                "sentiment = COALESCE(excluded.sentiment, reviews.sentiment), "
+                "score = COALESCE(excluded.score, reviews.score), "
+                "confidence = COALESCE(excluded.confidence, reviews.confidence), "
+                "polarity = COALESCE(excluded.polarity, reviews.polarity), "
+                "analyzed_at = COALESCE(excluded.analyzed_at, reviews.analyzed_at), "
+                "scraped_at = MAX(reviews.scraped_at, excluded.scraped_at)",
+                review_rows
+            )
+        ])
+        if product_rows:
+            self.generation += 1
+        if review_rows:
+            self._refresh_rollups([product_id])
+        return len(review_rows)
+
+    def record_analysis(self, analysis_id, product, analyzed_reviews, summary, kind="complete-analysis",
+                        created_at=None):
+        """Store a product-level analysis run and the per-review sentiment it produced"""
+        created_at = created_at or datetime.now().isoformat()
+        self.upsert_reviews(product, analyzed_reviews, scraped_at=created_at)
+        url = product.get("url") or product.get("link") or product.get("product_url")
+        product_id = product_id_for(url) if url else product.get("id")
+        self._execute(
+            "INSERT OR REPLACE INTO analyses (id, product_id, kind, total_reviews, overall_sentiment, summary, "
+            "created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (analysis_id, product_id, kind, summary.get("total_reviews", len(analyzed_reviews)),
+             summary.get("overall_sentiment"), json.dumps(summary, ensure_ascii=False), created_at)
+        )
+
+    def leaderboard(self, category, metric="score", order="top", k=10, min_reviews=1):
+        """Top (or bottom) k products of a category by a precomputed rollup metric"""
+        column = LEADERBOARD_METRICS[metric]
+        direction = "DESC" if order == "top" else "ASC"
+        rows = self._execute(
+            f"SELECT pr.product_id, pr.total, pr.average_polarity, pr.negative_share, pr.summary, "
+            f"pr.updated_at, p.data FROM product_rollups pr JOIN products p ON p.id = pr.product_id "
+            f"WHERE pr.category = ? AND pr.total >= ? ORDER BY pr.{column} {direction}, pr.total DESC LIMIT ?",
+            (category, min_reviews, k)
+        ).fetchall()
+        return [{
+            "product": json.loads(row["data"]),
+            "reviews": row["total"],
+            "score": round(row["average_polarity"], 4),
+            "negative_share": round(row["negative_share"], 4),
+            "summary": json.loads(row["summary"]),
+            "updated_at": row["updated_at"]
+        } for row in rows]
+
+    def category_summary(self, category):
+        """Merged sentiment summary of every analyzed product in a category, or None"""
+        row = self._execute("SELECT * FROM category_rollups WHERE category = ?", (category,)).fetchone()
+        if row is None:
+            return None
+        return dict(SentimentSummary.from_dict(json.loads(row["summary"])).to_dict(),
+                    products=row["products"], updated_at=row["updated_at"])
+
+    def trend(self, scope, key, granularity="day", since=None, until=None):
+        """Sentiment time series of a product or category as parallel arrays, oldest bucket first.
+        since/until are ISO days; until is exclusive"""
+        clauses, args = ["scope = ?", "key = ?", "granularity = ?", "positive + negative + neutral > 0"], \
+            [scope, key, granularity]
+        if since:
+            clauses.append("bucket >= ?")
+            args.append(bucket_keys(since)[granularity])
+        if until:
+            clauses.append("bucket < ?")
+            args.append(bucket_keys(until)[granularity])
+        rows = self._execute(
+            "SELECT * FROM sentiment_buckets WHERE " + " AND ".join(clauses) + " ORDER BY bucket", args
+        ).fetchall()
+        series = {"buckets": [], "positive": [], "negative": [], "neutral": [], "average_polarity": [],
+                  "average_rating": []}
+        for row in rows:
+            total = row["positive"] + row["negative"] + row["neutral"]
+            series["buckets"].append(row["bucket"])
+            for label in ("positive", "negative", "neutral"):
+                series[label].append(row[label])
+            series["average_polarity"].append(round(row["polarity_sum"] / total, 4))
+            series["average_rating"].append(
+                round(row["rating_sum"] / row["rating_count"], 2) if row["rating_count"] else None
+            )
+        return series
+
+    def rebuild_rollups(self):
+        self._rebuild_rollups(self._connection())
+
+    def _recategorized(self, product_ids):
+        """Products whose rollup sits under a category other than the product's current one"""
+        moved = []
+        for start in range(0, len(product_ids), 500):
+            chunk = product_ids[start:start + 500]
+            moved += [row[0] for row in self._execute(
+                "SELECT pr.product_id FROM product_rollups pr JOIN products p ON p.id = pr.product_id "
+                f"WHERE pr.category IS NOT p.category AND pr.product_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )]
+        return moved
+
+    def _refresh_rollups(self, product_ids):
+        if not product_ids:
+            return
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = datetime.now().isoformat()
+            for product_id in product_ids:
+                self._refresh_rollup(conn, product_id, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _rebuild_rollups(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM product_rollups")
+            conn.execute("DELETE FROM category_rollups")
+            conn.execute("DELETE FROM sentiment_buckets")
+            now = datetime.now().isoformat()
+            product_ids = [row[0] for row in conn.execute(
+                "SELECT DISTINCT product_id FROM reviews WHERE sentiment IS NOT NULL"
+            ).fetchall()]
+            for product_id in product_ids:
+                self._refresh_rollup(conn, product_id, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _refresh_rollup(self, conn, product_id, now):
+        """Recompute one product's rollup from its reviews and move the difference into its
+        category's rollup, so category totals never need a full recomputation"""
+        fresh = SentimentSummary()
+        for row in conn.execute(
+            "SELECT sentiment, COUNT(*) AS n, SUM(polarity) AS polarity_sum, SUM(rating) AS rating_sum, "
+            "COUNT(rating) AS rating_count FROM reviews WHERE product_id = ? AND sentiment IS NOT NULL "
+            "GROUP BY sentiment",
+            (product_id,)
+        ):
+            fresh.merge(SentimentSummary({row["sentiment"]: row["n"]}, row["polarity_sum"] or 0.0,
+                                         row["rating_sum"] or 0.0, row["rating_count"]))
+        product = conn.execute("SELECT category FROM products WHERE id = ?", (product_id,)).fetchone()
+        category = product["category"] if product else None
+        old = conn.execute("SELECT category, summary FROM product_rollups WHERE product_id = ?",
+                           (product_id,)).fetchone()
+
+        if old:
+            self._apply_to_category(conn, old["category"], SentimentSummary.from_dict(json.loads(old["summary"])),
+                                    -1, now)
+        if fresh.total:
+            conn.execute(
+                "INSERT OR REPLACE INTO product_rollups (product_id, category, total, average_polarity, "
+                "negative_share, summary, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (product_id, category, fresh.total, fresh.polarity_sum / fresh.total,
+                 fresh.counts.get("negative", 0) / fresh.total, json.dumps(fresh.to_dict()), now)
+            )
+            self._apply_to_category(conn, category, fresh, 1, now)
+        elif old:
+            conn.execute("DELETE FROM product_rollups WHERE product_id = ?", (product_id,))
+        self._refresh_buckets(conn, product_id, old["category"] if old else None, category)
+
+    def _refresh_buckets(self, conn, product_id, old_category, category):
+        """Rebuild one product's time buckets from its dated reviews and move the difference
+        into its category's buckets"""
+        old_rows = conn.execute(
+            "SELECT * FROM sentiment_buckets WHERE scope = 'product' AND key = ?", (product_id,)
+        ).fetchall()
+        if old_category:
+            for row in old_rows:
+                summary = SentimentSummary(
+                    {label: row[label] for label in ("positive", "negative", "neutral")},
+                    row["polarity_sum"], row["rating_sum"], row["rating_count"]
+                )
+                self._add_bucket(conn, "category", old_category, row["granularity"], row["bucket"], summary, -1)
+            conn.execute(
+                "DELETE FROM sentiment_buckets WHERE scope = 'category' AND key = ? "
+                "AND positive = 0 AND negative = 0 AND neutral = 0",
+                (old_category,)
+            )
+        conn.execute("DELETE FROM sentiment_buckets WHERE scope = 'product' AND key = ?", (product_id,))
+
+        fresh = {}
+        for row in conn.execute(
+            "SELECT review_day, sentiment, COUNT(*) AS n, SUM(polarity) AS polarity_sum, SUM(rating) AS rating_sum, "
+            "COUNT(rating) AS rating_count FROM reviews WHERE product_id = ? AND sentiment IS NOT NULL "
+            "AND review_day IS NOT NULL GROUP BY review_day, sentiment",
+            (product_id,)
+        ):
+            part = SentimentSummary({row["sentiment"]: row["n"]}, row["polarity_sum"] or 0.0,
+                                    row["rating_sum"] or 0.0, row["rating_count"])
+            for granularity, bucket in bucket_keys(row["review_day"]).items():
+                fresh.setdefault((granularity, bucket), SentimentSummary()).merge(part)
+        for (granularity, bucket), summary in fresh.items():
+            self._add_bucket(conn, "product", product_id, granularity, bucket, summary, 1)
+            if category:
+                self._add_bucket(conn, "category", category, granularity, bucket, summary, 1)
+
+    def _add_bucket(self, conn, scope, key, granularity, bucket, summary, sign):
+        conn.execute(
+            "INSERT INTO sentiment_buckets (scope, key, granularity, bucket, positive, negative, neutral, "
+            "polarity_sum, rating_sum, rating_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(scope, key, granularity, bucket) DO UPDATE SET "
+            "positive = positive + excluded.positive, negative = negative + excluded.negative, "
+            "neutral = neutral + excluded.neutral, polarity_sum = polarity_sum + excluded.polarity_sum, "
+            "rating_sum = rating_sum + excluded.rating_sum, rating_count = rating_count + excluded.rating_count",
+            (scope, key, granularity, bucket,
+             sign * summary.counts.get("positive", 0), sign * summary.counts.get("negative", 0),
+             sign * summary.counts.get("neutral", 0), sign * summary.polarity_sum, sign * summary.rating_sum,
+             sign * summary.rating_count)
+        )
+
+    def _apply_to_category(self, conn, category, summary, sign, now):
+        """Merge (sign 1) or remove (sign -1) one product's summary in its category rollup"""
+        if category is None:
+            return
+        row = conn.execute("SELECT products, summary FROM category_rollups WHERE category = ?",
+                           (category,)).fetchone()
+        total = SentimentSummary.from_dict(json.loads(row["summary"])) if row else SentimentSummary()
+        if sign > 0:
+            total.merge(summary)
+        else:
+            total.subtract(summary)
+        conn.execute(
+            "INSERT OR REPLACE INTO category_rollups (category, products, summary, updated_at) VALUES (?, ?, ?, ?)",
+            (category, (row["products"] if row else 0) + sign, json.dumps(total.to_dict()), now)
+        )
+
+    def is_compacted(self, name, size, mtime_ns):
+        """Whether this exact version of a data file was already merged into the review history"""
+        row = self._execute(
+            "SELECT 1 FROM compacted_files WHERE name = ? AND size = ? AND mtime_ns = ?", (name, size, mtime_ns)
+        ).fetchone()
+        return row is not None
+
+    def mark_compacted(self, name, size, mtime_ns, reviews, action):
+        self._execute(
+            "INSERT OR REPLACE INTO compacted_files (name, size, mtime_ns, reviews, action, compacted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (name, size, mtime_ns, reviews, action, datetime.now().isoformat())
+        )
+
+    def products(self, category=None, limit=200, offset=0):
+        """Products, most recently scraped first"""
+        if category:
+            rows = self._execute(
+                "SELECT data FROM products WHERE category = ? ORDER BY scraped_at DESC LIMIT ? OFFSET ?",
+                (category, limit, offset)
+            ).fetchall()
+        else:
+            rows = self._execute(
+                "SELECT data FROM products ORDER BY scraped_at DESC LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def iter_review_rows(self, category=None, since=None, until=None, batch_size=10000):
+        """Reviews joined with their product's category, in batches of rows ordered by category
+        and scrape day (for partitioned exports). since/until bound scraped_at, until exclusive"""
+        clauses, args = [], []
+        if category:
+            clauses.append("p.category = ?")
+            args.append(category)
+        if since:
+            clauses.append("r.scraped_at >= ?")
+            args.append(since)
+        if until:
+            clauses.append("r.scraped_at < ?")
+            args.append(until)
+        cursor = self._execute(
+            "SELECT r.id, r.product_id, p.title AS product_title, COALESCE(p.category, 'unknown') AS category, "
+            "substr(r.scraped_at, 1, 10) AS day, r.text, r.rating, r.reviewer, r.review_date, r.sentiment, "
+            "r.score, r.confidence, r.polarity, r.analyzed_at, r.scraped_at "
+            "FROM reviews r JOIN products p ON p.id = r.product_id"
+            + (" WHERE " + " AND ".join(clauses) if clauses else "")
+            + " ORDER BY category, day",
+            args
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
+    def search_reviews(self, query, sentiment=None, category=None, product_id=None, limit=20, offset=0):
+        """Reviews matching an FTS5 query, best BM25 match first, with a highlighted snippet"""
+        self._connection()
+        if not self.fts_available:
+            raise RuntimeError("Review search needs SQLite with FTS5")
+        clauses, args = ["reviews_fts MATCH ?"], [query]
+        if sentiment:
+            clauses.append("r.sentiment = ?")
+            args.append(sentiment)
+        if category:
+            clauses.append("p.category = ?")
+            args.append(category)
+        if product_id:
+            clauses.append("r.product_id = ?")
+            args.append(product_id)
+        rows = self._execute(
+            "SELECT r.id, r.product_id, p.title AS product_title, p.category, r.rating, r.reviewer, "
+            "r.review_date, r.sentiment, r.score, r.scraped_at, "
+            "snippet(reviews_fts, 0, '**', '**', '…', 16) AS snippet, reviews_fts.rank AS relevance "
+            "FROM reviews_fts JOIN reviews r ON r.rowid = reviews_fts.rowid "
+            "JOIN products p ON p.id = r.product_id WHERE " + " AND ".join(clauses)
+            + " ORDER BY reviews_fts.rank LIMIT ? OFFSET ?",
+            args + [limit, offset]
+        ).fetchall()
+        return [dict(row, relevance=round(-row["relevance"], 4)) for row in rows]
+
+    def product(self, product_id):
+        row = self._execute("SELECT data FROM products WHERE id = ?", (product_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def reviews(self, product_id, sentiment=None, limit=500, offset=0):
+        """A product's reviews, newest scrape first, optionally of one sentiment"""
+        if sentiment:
+            rows = self._execute(
+                "SELECT * FROM reviews WHERE product_id = ? AND sentiment = ? "
+                "ORDER BY scraped_at DESC LIMIT ? OFFSET ?",
+                (product_id, sentiment, limit, offset)
+            ).fetchall()
+        else:
+            rows = self._execute(
+                "SELECT * FROM reviews WHERE product_id = ? ORDER BY scraped_at DESC LIMIT ? OFFSET ?",
+                (product_id, limit, offset)
+            ).fetchall()
+        return [self._review_dict(row) for row in rows]
+
+    def sentiment_counts(self, product_id):
+        rows = self._execute(
+            "SELECT sentiment, COUNT(*) AS n FROM reviews WHERE product_id = ? AND sentiment IS NOT NULL "
+            "GROUP BY sentiment",
+            (product_id,)
+        ).fetchall()
+        return {row["sentiment"]: row["n"] for row in rows}
+
+    def latest_analysis(self, product_id):
+        row = self._execute(
+            "SELECT * FROM analyses WHERE product_id = ? ORDER BY created_at DESC LIMIT 1", (product_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(json.loads(row["summary"]), analysis_id=row["id"], kind=row["kind"],
+                    created_at=row["created_at"])
+
+    def categories(self):
+        rows = self._execute(
+            "SELECT category, COUNT(*) AS products, MAX(scraped_at) AS last_scraped_at FROM products "
+            "WHERE category IS NOT NULL GROUP BY category ORDER BY category"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        counts = {
+            table: self._execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("products", "reviews", "analyses")
+        }
+        counts["analyzed_reviews"] = self._execute(
+            "SELECT COUNT(*) FROM reviews WHERE sentiment IS NOT NULL"
+        ).fetchone()[0]
+        return counts
+
+    def _review_dict(self, row):
+        review = {
+            "id": row["id"],
+            "product_id": row["product_id"],
+            "text": row["text"],
+            "rating": row["rating"],
+            "reviewer": row["reviewer"],
+            "date": row["review_date"],
+            "scraped_at": row["scraped_at"]
+        }
+        if row["sentiment"]:
+            review["sentiment"] = {
+                "sentiment": row["sentiment"],
+                "score": row["score"],
+                "confidence": row["confidence"],
+                "polarity": row["polarity"],
+                "analyzed_at": row["analyzed_at"]
+            }
+        return review
+
+
+review_store = ReviewStore(os.environ.get('STORE_DB_PATH') or 'data/store.db')
+
+
+def _import_complete_analysis(store, analysis, created_at):
+    product = {"id": analysis.get("product_id"), "title": analysis.get("product_title"),
+               "url": analysis["product_url"]}
+    store.upsert_reviews(product, analysis.get("reviews", []), scraped_at=analysis.get("scraped_at"))
+    store.record_analysis(
+        analysis.get("analysis_id") or f"analysis_{product['id']}_{created_at}", product,
+        analysis.get("analyzed_reviews", []), {
+            "total_reviews": analysis.get("total_reviews", 0),
+            "sentiment_summary": analysis.get("sentiment_summary", {}),
+            "overall_sentiment": analysis.get("overall_sentiment")
+        },
+        created_at=analysis.get("analyzed_at") or created_at
+    )
+
+
+def _import_bulk_result(store, result, created_at):
+    """One product of a bulk analysis; False if it has nothing to import"""
+    analysis = result.get("sentiment_analysis") or {}
+    if not result.get("product_url") or not analysis.get("analyzed_reviews"):
+        return False
+    created_at = result.get("analyzed_at") or created_at
+    product = {"id": result.get("product_id"), "title": result.get("product_title"), "url": result["product_url"]}
+    store.record_analysis(
+        f"bulk_{created_at}_{result.get('product_id')}", product, analysis["analyzed_reviews"],
+        result.get("summary") or analysis.get("summary", {}), kind="bulk-analysis", created_at=created_at
+    )
+    return True
+
+
+def migrate(store, data_dir):
+    """Import products_*, reviews_bulk_*, complete_analysis_* and bulk_analysis_* JSON files
+    and the products/reviews/analyses JSONL record logs"""
+    totals = {"files": 0, "products": 0, "reviews": 0, "analyses": 0, "skipped": 0}
+
+    def load(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  ✗ Skipping {path}: {e}")
+            totals["skipped"] += 1
+            return None
+
+    for path in sorted(glob.glob(os.path.join(data_dir, "products_*.json"))):
+        products = load(path)
+        if not isinstance(products, list):
+            continue
+        category = os.path.basename(path)[len("products_"):].rsplit("_", 2)[0]
+        totals["products"] += store.upsert_products(products, category=category, scraped_at=_file_time(path))
+        totals["files"] += 1
+
+    for path in sorted(glob.glob(os.path.join(data_dir, "reviews_bulk_*.json"))):
+        bulk = load(path)
+        if not isinstance(bulk, dict):
+            continue
+        for result in bulk.get("results", []):
+            if result.get("url"):
+                totals["reviews"] += store.upsert_reviews(
+                    result, result.get("reviews", []), scraped_at=result.get("scraped_at") or _file_time(path)
+                )
+        totals["files"] += 1
+
+    for path in sorted(glob.glob(os.path.join(data_dir, "complete_analysis_*.json"))):
+        analysis = load(path)
+        if isinstance(analysis, dict) and analysis.get("product_url"):
+            _import_complete_analysis(store, analysis, _file_time(path))
+            totals["analyses"] += 1
+            totals["files"] += 1
+
+    for path in sorted(glob.glob(os.path.join(data_dir, "bulk_analysis_*.json"))):
+        bulk = load(path)
+        if not isinstance(bulk, dict):
+            continue
+        for result in bulk.get("results", []):
+            totals["analyses"] += _import_bulk_result(store, result, _file_time(path))
+        totals["files"] += 1
+
+    for stream in ("products", "reviews", "analyses"):
+        for path in log_files(stream, data_dir):
+            batch = []
+            for record in read_records(path):
+                kind = record.get("type")
+                if kind == "product":
+                    batch.append(record)
+                    if len(batch) >= 500:
+                        totals["products"] += _import_product_records(store, batch)
+                        batch = []
+                elif kind == "product_reviews" and record.get("url"):
+                    totals["reviews"] += store.upsert_reviews(record, record.get("reviews", []),
+                                                              scraped_at=record.get("scraped_at"))
+                elif kind == "complete_analysis" and record.get("product_url"):
+                    _import_complete_analysis(store, record, record.get("saved_at"))
+                    totals["analyses"] += 1
+                elif kind == "bulk_analysis_product":
+                    totals["analyses"] += _import_bulk_result(store, record, record.get("saved_at"))
+            totals["products"] += _import_product_records(store, batch)
+            totals["files"] += 1
+
+    return totals
+
+
+def _import_product_records(store, records):
+    """Upsert product records, one batch per run of records saved together"""
+    written = 0
+    for (category, saved_at), group in itertools.groupby(
+            records, key=lambda record: (record.get("category"), record.get("saved_at"))):
+        written += store.upsert_products([record["product"] for record in group], category=category,
+                                         scraped_at=saved_at)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SentimentPulse product/review store")
+    parser.add_argument("command", choices=["migrate", "stats"])
+    parser.add_argument("--data", default="data", help="directory with the JSON files to import")
+    parser.add_argument("--db", default=os.environ.get('STORE_DB_PATH') or 'data/store.db')
+    args = parser.parse_args()
+
+    store = ReviewStore(args.db)
+    if args.command == "migrate":
+        print(f"📦 Importing JSON files from {args.data} into {args.db}")
+        totals = migrate(store, args.data)
+        print(f"✅ Imported {totals['files']} files: {totals['products']} product rows, "
+              f"{totals['reviews']} review rows, {totals['analyses']} analyses ({totals['skipped']} skipped)")
+    print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,82 @@
 import time
 import json
 import sys
+import os
+import re
+import random
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import urlparse
+import requests
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selector_cache import selector_cache, site_layout
+from page_archive import PageArchive
+from stable_ids import product_id_for, assign_review_ids
+
+SNAPDEAL_CANONICAL_URL = 'https://www.snapdeal.com'
+# Point every fetch at a different host (e.g. the replay server) with SNAPDEAL_BASE_URL
+SNAPDEAL_BASE_URL = os.environ.get('SNAPDEAL_BASE_URL', SNAPDEAL_CANONICAL_URL).rstrip('/')
+# Scale the politeness delays between requests (0 disables them for offline replay)
+SCRAPER_DELAY_SCALE = float(os.environ.get('SCRAPER_DELAY_SCALE', '1'))
+# Archive every fetched page body for offline re-parse when SCRAPER_ARCHIVE_DIR is set
+SCRAPER_ARCHIVE_DIR = os.environ.get('SCRAPER_ARCHIVE_DIR')
+page_archive = PageArchive(SCRAPER_ARCHIVE_DIR) if SCRAPER_ARCHIVE_DIR else None
+
+def rebase_url(url):
+    """Rewrite a snapdeal.com URL onto SNAPDEAL_BASE_URL"""
+    parsed = urlparse(url)
+    if not parsed.netloc.endswith('snapdeal.com') or SNAPDEAL_BASE_URL == SNAPDEAL_CANONICAL_URL:
+        return url
+    rebased = SNAPDEAL_BASE_URL + parsed.path
+    return f"{rebased}?{parsed.query}" if parsed.query else rebased
+
+def polite_sleep(seconds):
+    """Sleep between requests, scaled by SCRAPER_DELAY_SCALE"""
+    if SCRAPER_DELAY_SCALE > 0:
+        time.sleep(seconds * SCRAPER_DELAY_SCALE)
+
+class StageTimer:
+    """Accumulates wall-clock time per scraping stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self._stages.setdefault(name, {"count": 0, "total_time": 0.0})
+                stats["count"] += 1
+                stats["total_time"] += elapsed
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    "count": stats["count"],
+                    "total_ms": round(stats["total_time"] * 1000, 2),
+                    "avg_ms": round(stats["total_time"] * 1000 / stats["count"], 2) if stats["count"] else 0
+                }
+                for name, stats in self._stages.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+stage_timer = StageTimer()
 
 def setup_driver():
     """Setup Chrome driver with proper options"""
@@ -26,8 +95,10 @@ def setup_driver():
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     return driver
 
-def scrape_product_reviews_selenium(product_url, max_reviews=None, driver=None):
-    """Scrape ALL reviews using Selenium with pagination"""
+def scrape_product_reviews_selenium(product_url, max_reviews=None, driver=None, on_page=None, should_stop=None,
+                                    title=None):
+    """Scrape ALL reviews using Selenium with pagination; on_page(page, new_reviews) is called per page
+    and should_stop() is checked before each page load"""
     should_quit = driver is None
     if driver is None:
         driver = setup_driver()
@@ -42,12 +113,19 @@ def scrape_product_reviews_selenium(product_url, max_reviews=None, driver=None):
             reviews_base_url = product_url.split('?')[0]  # Remove query params
         
         print(f"Base reviews URL: {reviews_base_url}")
+        layout = site_layout(reviews_base_url, "reviews")
+        product_id = product_id_for(reviews_base_url)
         
         all_reviews = []
+        seen_review_ids = set()
         page = 1
         max_pages = 100  # Safety limit
         
         while page <= max_pages:
+            if should_stop and should_stop():
+                print(f"🛑 Stopping before page {page}: job cancelled")
+                break
+            
             # Construct page URL
             if page == 1:
                 page_url = reviews_base_url
@@ -55,28 +133,48 @@ def scrape_product_reviews_selenium(product_url, max_reviews=None, driver=None):
                 page_url = f"{reviews_base_url}?page={page}"
             
             print(f"\n📄 Loading reviews page {page}...")
-            driver.get(page_url)
-            time.sleep(3)
+            with stage_timer.stage("review_page_load"):
+                driver.get(rebase_url(page_url))
+                polite_sleep(3)
             
             # Check if we're on a valid reviews page
             try:
                 # Wait for reviews container
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#reviewsContainer, .user-review, .reviewCard"))
-                )
+                with stage_timer.stage("review_wait"):
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "#reviewsContainer, .user-review, .reviewCard"))
+                    )
             except TimeoutException:
                 print(f"✗ No reviews found on page {page}")
                 break
             
+            if page_archive:
+                # The title lets an offline re-parse label the product like the original run did
+                meta = {"title": title} if title else {}
+                page_archive.store(page_url, driver.page_source, "reviews", product_url=product_url, page=page, **meta)
+            
             # Extract reviews from current page
-            page_reviews = extract_reviews_from_page(driver)
+            with stage_timer.stage("review_extract"):
+                page_reviews = extract_reviews_from_page(driver, layout)
             
             if not page_reviews:
                 print(f"✗ No reviews extracted from page {page} - reached end")
                 break
             
-            all_reviews.extend(page_reviews)
-            print(f"✓ Extracted {len(page_reviews)} reviews from page {page} (Total: {len(all_reviews)})")
+            # Stable IDs let us drop reviews repeated across pages
+            new_reviews = [
+                review for review in assign_review_ids(page_reviews, product_id)
+                if review["id"] not in seen_review_ids
+            ]
+            if not new_reviews:
+                print(f"✗ Page {page} only repeated earlier reviews - reached end")
+                break
+            
+            seen_review_ids.update(review["id"] for review in new_reviews)
+            all_reviews.extend(new_reviews)
+            print(f"✓ Extracted {len(new_reviews)} reviews from page {page} (Total: {len(all_reviews)})")
+            if on_page:
+                on_page(page, new_reviews)
             
             # Check if there's a next page
             has_next_page = False
@@ -123,7 +221,7 @@ def scrape_product_reviews_selenium(product_url, max_reviews=None, driver=None):
                 break
             
             page += 1
-            time.sleep(2)  # Be polite to the server
+            polite_sleep(2)  # Be polite to the server
         
         print(f"\n✅ Total reviews extracted: {len(all_reviews)} from {page} pages")
         return all_reviews
@@ -138,25 +236,37 @@ def scrape_product_reviews_selenium(product_url, max_reviews=None, driver=None):
         if should_quit and driver:
             driver.quit()
 
-def extract_reviews_from_page(driver):
+REVIEW_CONTAINER_SELECTORS = [
+    ".user-review",
+    ".reviewCard",
+    ".review-card",
+    "[class*='review-item']",
+    ".comp-review-wrapper .review",
+    "#reviewsContainer .clearfix[class*='review']"
+]
+
+REVIEW_TEXT_SELECTORS = [
+    ".user-review-text",
+    ".reviewText",
+    ".review-text",
+    ".reviewdesc",
+    ".rvw-desc",
+    ".review-content",
+    "p",
+    ".review-description"
+]
+
+def extract_reviews_from_page(driver, layout=None):
     """Extract all reviews from the current page"""
     reviews = []
+    if layout is None:
+        layout = site_layout(driver.current_url, "reviews")
     
     # Find review items
-    review_selectors = [
-        ".user-review",
-        ".reviewCard",
-        ".review-card",
-        "[class*='review-item']",
-        ".comp-review-wrapper .review",
-        "#reviewsContainer .clearfix[class*='review']"
-    ]
-    
-    review_items = []
-    for selector in review_selectors:
-        review_items = driver.find_elements(By.CSS_SELECTOR, selector)
-        if len(review_items) > 0:
-            break
+    _, review_items = selector_cache.first_match(
+        layout, "review_container", REVIEW_CONTAINER_SELECTORS,
+        lambda selector: driver.find_elements(By.CSS_SELECTOR, selector)
+    )
     
     if not review_items:
         return reviews
@@ -164,30 +274,15 @@ def extract_reviews_from_page(driver):
     for item in review_items:
         try:
             # Extract review text
-            review_text = ""
-            text_selectors = [
-                ".user-review-text",
-                ".reviewText",
-                ".review-text",
-                ".reviewdesc",
-                ".rvw-desc",
-                ".review-content",
-                "p",
-                ".review-description"
-            ]
+            def find_review_text(selector):
+                for text_elem in item.find_elements(By.CSS_SELECTOR, selector):
+                    text = text_elem.text.strip()
+                    if text and len(text) > 20:
+                        return text
+                return None
             
-            for selector in text_selectors:
-                try:
-                    text_elements = item.find_elements(By.CSS_SELECTOR, selector)
-                    for text_elem in text_elements:
-                        text = text_elem.text.strip()
-                        if text and len(text) > 20:
-                            review_text = text
-                            break
-                    if review_text:
-                        break
-                except:
-                    continue
+            _, review_text = selector_cache.first_match(layout, "review_text", REVIEW_TEXT_SELECTORS, find_review_text)
+            review_text = review_text or ""
             
             if not review_text:
                 all_text = item.text.strip()
@@ -253,6 +348,75 @@ def extract_reviews_from_page(driver):
     
     return reviews
             
+def extract_reviews_from_html(html, layout="snapdeal.com:reviews"):
+    """Extract reviews from saved page HTML, mirroring extract_reviews_from_page without a browser"""
+    reviews = []
+    soup = BeautifulSoup(html, "html.parser")
+    
+    _, review_items = selector_cache.first_match(layout, "review_container", REVIEW_CONTAINER_SELECTORS, soup.select)
+    
+    if not review_items:
+        return reviews
+    
+    for item in review_items:
+        try:
+            def find_review_text(selector):
+                for text_elem in item.select(selector):
+                    text = text_elem.get_text(" ", strip=True)
+                    if text and len(text) > 20:
+                        return text
+                return None
+            
+            _, review_text = selector_cache.first_match(layout, "review_text", REVIEW_TEXT_SELECTORS, find_review_text)
+            review_text = review_text or ""
+            
+            if not review_text:
+                all_text = item.get_text("\n", strip=True)
+                if len(all_text) > 30 and len(all_text) < 2000:
+                    lines = all_text.split('\n')
+                    review_text = max(lines, key=len) if lines else all_text
+            
+            if not review_text or len(review_text) < 20:
+                continue
+            
+            rating = "No rating"
+            rating_elem = item.select_one(".filled-stars")
+            if rating_elem:
+                width_match = re.search(r'width:\s*(\d+\.?\d*)%', rating_elem.get("style", ""))
+                if width_match:
+                    rating = f"{float(width_match.group(1))/20:.1f}/5"
+            
+            reviewer = "Anonymous"
+            review_date = "Unknown date"
+            reviewer_elem = item.select_one(".reviewer-name, .user-name, .reviewer")
+            if reviewer_elem:
+                meta_text = reviewer_elem.get_text(" ", strip=True)
+                if " on " in meta_text:
+                    parts = meta_text.split(" on ")
+                    if len(parts) == 2:
+                        reviewer = parts[0].replace("by", "").replace("By", "").strip()
+                        review_date = parts[1].strip()
+                else:
+                    reviewer = meta_text
+            
+            if review_date == "Unknown date":
+                date_elem = item.select_one(".review-date, .date, [class*='date']")
+                if date_elem:
+                    review_date = date_elem.get_text(" ", strip=True)
+            
+            reviews.append({
+                "rating": rating,
+                "text": review_text,
+                "reviewer": reviewer,
+                "date": review_date,
+                "scraped_at": datetime.now().isoformat()
+            })
+            
+        except Exception as e:
+            continue
+    
+    return reviews
+
 def debug_page_structure(driver, product_url):
     """Debug function to save page structure for analysis"""
     try:
@@ -283,9 +447,347 @@ def debug_page_structure(driver, product_url):
     except Exception as e:
         print(f"Debug error: {e}")
         
+def extract_products_from_listing(soup, category, limit, page=1, offset=0):
+    """Extract up to `limit` products from a parsed listing page, or None if it has no product containers"""
+    products = []
+    
+    # Try multiple selectors for product containers
+    layout = site_layout(SNAPDEAL_CANONICAL_URL, "listing")
+    container_selectors = [
+        ".product-tuple-listing",
+        ".col-xs-6",
+        "[data-snap-id]",
+        ".product-item"
+    ]
+    _, product_containers = selector_cache.first_match(
+        layout, "listing_container", container_selectors, soup.select
+    )
+
+    if not product_containers:
+        print(f"No products found on page {page} with standard selectors")
+        # Try alternative approach
+        product_containers = soup.find_all("div", class_=lambda x: x and "product" in x.lower())
+
+    if not product_containers:
+        return None
+
+    print(f"Found {len(product_containers)} product containers on page {page}")
+
+    for i, product in enumerate(product_containers):
+        if len(products) >= limit:
+            break
+
+        try:
+            # Extract title - try multiple selectors
+            title_selectors = [
+                ".product-title",
+                "[data-key='name']",
+                ".prodName",
+                ".product-item-name",
+                "p[title]",
+                ".dp-widget-link"
+            ]
+
+            def find_title(selector):
+                title_tag = product.select_one(selector)
+                if title_tag:
+                    return title_tag.get_text(strip=True) or title_tag.get("title", "").strip()
+                return None
+
+            _, title = selector_cache.first_match(layout, "listing_title", title_selectors, find_title)
+
+            if not title:
+                continue
+
+            # Extract link - try multiple selectors
+            link_selectors = [
+                "a.dp-widget-link",
+                "a[href*='/product/']",
+                ".product-item-name a",
+                ".prodName a",
+                "a"
+            ]
+
+            def find_link(selector):
+                link_tag = product.select_one(selector)
+                if link_tag and link_tag.get("href"):
+                    href = link_tag["href"]
+                    if href.startswith("/product/"):
+                        return SNAPDEAL_CANONICAL_URL + href
+                    elif "snapdeal.com" in href:
+                        return href
+                return None
+
+            _, link = selector_cache.first_match(layout, "listing_link", link_selectors, find_link)
+
+            if not link:
+                continue
+
+            # Extract price - try multiple selectors
+            price_selectors = [
+                ".product-price",
+                ".lfloat.product-price",
+                ".price",
+                "[data-key='price']",
+                ".product-tuple-price"
+            ]
+
+            def find_price(selector):
+                price_tag = product.select_one(selector)
+                if price_tag:
+                    price_text = price_tag.get_text(strip=True)
+                    # Extract numeric price
+                    price_match = re.search(r'[\d,]+', price_text.replace('₹', '').replace('Rs', '').replace(',', ''))
+                    if price_match:
+                        try:
+                            return int(price_match.group())
+                        except ValueError:
+                            pass
+                return None
+
+            _, price = selector_cache.first_match(layout, "listing_price", price_selectors, find_price)
+
+            # Extract image URL - try multiple selectors
+            img_selectors = [
+                "img",
+                ".product-image img",
+                ".picture-elem img"
+            ]
+
+            def find_image(selector):
+                img_tag = product.select_one(selector)
+                if img_tag:
+                    src = img_tag.get("src") or img_tag.get("data-src") or img_tag.get("data-lazy-src")
+                    if src:
+                        if src.startswith("//"):
+                            return "https:" + src
+                        elif src.startswith("http"):
+                            return src
+                return None
+
+            _, image_url = selector_cache.first_match(layout, "listing_image", img_selectors, find_image)
+
+            # Extract discount/offer info
+            discount_selectors = [
+                ".product-discount",
+                ".discount-percent",
+                ".offer-price"
+            ]
+
+            def find_discount(selector):
+                discount_tag = product.select_one(selector)
+                return discount_tag.get_text(strip=True) if discount_tag else None
+
+            _, discount = selector_cache.first_match(layout, "listing_discount", discount_selectors, find_discount)
+
+            product_data = {
+                "id": product_id_for(link),
+                "title": title,
+                "link": link,
+                "price": price,
+                "image_url": image_url,
+                "discount": discount,
+                "category": category,
+                "reviews": [],
+                "sentiment": None,
+                "scraped_at": datetime.now().isoformat()
+            }
+
+            products.append(product_data)
+            print(f"Scraped product {offset + len(products)}: {title[:50]}...")
+
+        except Exception as e:
+            print(f"Error parsing product {i}: {e}")
+            continue
+    
+    return products
+
+def scrape_snapdeal_products(category, max_products=20, on_page=None, should_stop=None):
+    """
+    Scrape products from Snapdeal for a given category
+    on_page(page, page_products) is called after each listing page; should_stop() before each fetch
+    """
+    base_url = f"{SNAPDEAL_BASE_URL}/products/{category}"
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    }
+    
+    products = []
+    page = 1
+    max_pages = 3  # Limit to first 3 pages to avoid being blocked
+    
+    print(f"Scraping category: {category}")
+    
+    while len(products) < max_products and page <= max_pages:
+        if should_stop and should_stop():
+            print(f"🛑 Stopping before page {page}: job cancelled")
+            return products
+        try:
+            page_url = f"{base_url}?page={page}" if page > 1 else base_url
+            print(f"Scraping page {page}: {page_url}")
+            
+            with stage_timer.stage("listing_fetch"):
+                response = requests.get(page_url, headers=headers, timeout=10)
+                response.raise_for_status()
+            
+            if page_archive:
+                page_archive.store(page_url, response.text, "listing", category=category, page=page)
+            
+            with stage_timer.stage("listing_parse"):
+                soup = BeautifulSoup(response.text, "html.parser")
+            
+            page_products = extract_products_from_listing(
+                soup, category, max_products - len(products), page=page, offset=len(products)
+            )
+            
+            if page_products is None:
+                print(f"No products found on page {page}, breaking")
+                break
+            
+            products.extend(page_products)
+            if on_page:
+                on_page(page, page_products)
+            
+            page += 1
+            
+            # Add delay to avoid being blocked
+            polite_sleep(random.uniform(2, 4))
+            
+        except Exception as e:
+            print(f"Error scraping page {page}: {e}")
+            
+            # Fallback to category-specific mock data if scraping fails
+            if len(products) == 0:
+                print(f"Scraping failed, generating category-specific mock data for: {category}")
+                return generate_category_mock_data(category, max_products)
+            break
+    
+    if len(products) == 0:
+        # Generate category-specific mock data as fallback
+        print(f"No products scraped, generating category-specific mock data for: {category}")
+        return generate_category_mock_data(category, max_products)
+    
+    print(f"Successfully scraped {len(products)} products for category: {category}")
+    return products
+
+def generate_category_mock_data(category, max_products=20):
+    """Generate category-specific mock data when scraping fails"""
+    
+    # Category-specific product data
+    category_products = {
+        "women-apparel-stiched-kurtis": [
+            {
+                "title": "Women's Cotton A-Line Kurti",
+                "price": 599,
+                "discount": "70% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Cotton+Kurti"
+            },
+            {
+                "title": "Anarkali Kurti with Palazzo Set",
+                "price": 899,
+                "discount": "60% off", 
+                "image_url": "https://via.placeholder.com/300x300?text=Anarkali+Set"
+            },
+            {
+                "title": "Rayon Printed Straight Kurti",
+                "price": 449,
+                "discount": "65% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Printed+Kurti"
+            },
+            {
+                "title": "Ethnic Embroidered Kurti",
+                "price": 1299,
+                "discount": "50% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Embroidered+Kurti"
+            },
+            {
+                "title": "Designer Party Wear Kurti",
+                "price": 1899,
+                "discount": "45% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Party+Kurti"
+            }
+        ],
+        "men-apparel-shirts": [
+            {
+                "title": "Men's Cotton Formal Shirt",
+                "price": 799,
+                "discount": "60% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Formal+Shirt"
+            },
+            {
+                "title": "Casual Slim Fit Shirt",
+                "price": 599,
+                "discount": "65% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Casual+Shirt"
+            },
+            {
+                "title": "Check Pattern Full Sleeve Shirt",
+                "price": 699,
+                "discount": "55% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Check+Shirt"
+            },
+            {
+                "title": "Cotton Blend Party Wear Shirt",
+                "price": 1199,
+                "discount": "50% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Party+Shirt"
+            },
+            {
+                "title": "Denim Casual Shirt for Men",
+                "price": 899,
+                "discount": "40% off",
+                "image_url": "https://via.placeholder.com/300x300?text=Denim+Shirt"
+            }
+        ]
+    }
+    
+    # Get products for the specific category or use a default set
+    category_key = category.lower()
+    base_products = category_products.get(category_key, category_products.get("women-apparel-stiched-kurtis", []))
+    
+    # If no specific category found, generate generic products based on category name
+    if category_key not in category_products:
+        base_products = [
+            {
+                "title": f"{category.replace('-', ' ').title()} Product {i+1}",
+                "price": random.randint(299, 2999),
+                "discount": f"{random.randint(30, 70)}% off",
+                "image_url": f"https://via.placeholder.com/300x300?text=Product+{i+1}"
+            }
+            for i in range(5)
+        ]
+    
+    # Generate products up to max_products
+    products = []
+    for i in range(min(max_products, len(base_products) * 4)):  # Multiply to get more variety
+        base_product = base_products[i % len(base_products)]
+        
+        # Add some variation to avoid exact duplicates
+        variation_suffix = f" - Style {(i // len(base_products)) + 1}" if i >= len(base_products) else ""
+        price_variation = random.randint(-200, 500)
+        
+        link = f"https://www.snapdeal.com/product/{category}/{random.randint(100000, 999999)}"
+        product = {
+            "id": product_id_for(link),
+            "title": base_product["title"] + variation_suffix,
+            "link": link,
+            "price": max(199, base_product["price"] + price_variation),
+            "image_url": base_product["image_url"],
+            "discount": base_product["discount"],
+            "category": category,
+            "reviews": [],
+            "sentiment": None,
+            "scraped_at": datetime.now().isoformat()
+        }
+        
+        products.append(product)
+    
+    print(f"Generated {len(products)} mock products for category: {category}")
+    return products
+
 def scrape_category_products(category, max_products=20):
     """Scrape products from a category and their reviews"""
-    base_url = f"https://www.snapdeal.com/products/{category}"
+    base_url = f"{SNAPDEAL_BASE_URL}/products/{category}"
     driver = setup_driver()
     products = []
     
@@ -300,7 +802,7 @@ def scrape_category_products(category, max_products=20):
             print(f"\nPage {page}: {page_url}")
             
             driver.get(page_url)
-            time.sleep(3)
+            polite_sleep(3)
             
             # Find product links
             product_links = driver.find_elements(By.CSS_SELECTOR, "a.dp-widget-link[href*='/product/']")
@@ -317,8 +819,8 @@ def scrape_category_products(category, max_products=20):
                 
                 try:
                     # Get product title
-                    driver.get(url)
-                    time.sleep(2)
+                    driver.get(rebase_url(url))
+                    polite_sleep(2)
                     
                     title = "Unknown Product"
                     try:
@@ -330,7 +832,7 @@ def scrape_category_products(category, max_products=20):
                     print(f"\n[{len(products)+1}/{max_products}] {title[:60]}...")
                     
                     # Scrape reviews for this product
-                    reviews = scrape_product_reviews_selenium(url, max_reviews=None, driver=driver)  
+                    reviews = scrape_product_reviews_selenium(url, max_reviews=None, driver=driver, title=title)
                     
                     # Extract other product info
                     price = None
@@ -349,7 +851,7 @@ def scrape_category_products(category, max_products=20):
                         pass
                     
                     product_data = {
-                        "id": f"{category}-{len(products)}-{int(time.time())}",
+                        "id": product_id_for(url),
                         "title": title,
                         "link": url,
                         "price": price,
@@ -367,7 +869,7 @@ def scrape_category_products(category, max_products=20):
                     print(f"✗ Error scraping product: {e}")
                     continue
                 
-                time.sleep(2)
+                polite_sleep(2)
             
             page += 1
         
@@ -0,0 +1,113 @@
+# backend/selector_cache.py
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+# A bare element selector ("p", "a") matches almost any page, so it is only a fallback
+GENERIC_SELECTOR = re.compile(r"^[a-z][a-z0-9]*$", re.IGNORECASE)
+
+
+def site_layout(url, page_kind):
+    """Build a layout key like 'snapdeal.com:reviews' from a page URL"""
+    host = urlparse(url).netloc.lower() if url else ""
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host or 'unknown'}:{page_kind}"
+
+
+class SelectorCache:
+    """Learns which CSS selector matches for each site layout and tries it first.
+
+    Every probe is recorded. A hit adds 1 to the selector's score and decays the
+    scores of its siblings, a miss decays the selector's own score, so when the
+    site layout changes the old winner loses its place after a few misses.
+    Generic fallbacks (bare element selectors) are never moved ahead of
+    specific selectors, however often they hit.
+    """
+
+    def __init__(self, decay=0.8, min_score=0.01):
+        self.decay = decay
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._scores = {}  # (layout, group) -> {selector: score}
+        self._stats = {}   # (layout, group, selector) -> counters
+
+    def ordered(self, layout, group, selectors):
+        """Return specific selectors with the learned winners first, then generic fallbacks,
+        keeping the original order for ties"""
+        with self._lock:
+            scores = dict(self._scores.get((layout, group), {}))
+        return sorted(selectors, key=lambda selector: (
+            bool(GENERIC_SELECTOR.match(selector)), -scores.get(selector, 0.0)
+        ))
+
+    def record(self, layout, group, selector, hit, elapsed):
+        """Record the outcome and duration (seconds) of a single selector probe"""
+        with self._lock:
+            scores = self._scores.setdefault((layout, group), {})
+            if hit:
+                for other in list(scores):
+                    if other != selector:
+                        scores[other] *= self.decay
+                        if scores[other] < self.min_score:
+                            del scores[other]
+                scores[selector] = scores.get(selector, 0.0) + 1.0
+            elif selector in scores:
+                scores[selector] *= self.decay
+                if scores[selector] < self.min_score:
+                    del scores[selector]
+
+            stats = self._stats.setdefault((layout, group, selector), {
+                "hits": 0,
+                "misses": 0,
+                "total_time": 0.0
+            })
+            stats["hits" if hit else "misses"] += 1
+            stats["total_time"] += elapsed
+
+    def first_match(self, layout, group, selectors, probe):
+        """Probe selectors in learned order and return (selector, result) for the first truthy result"""
+        for selector in self.ordered(layout, group, selectors):
+            start = time.perf_counter()
+            try:
+                result = probe(selector)
+            except Exception:
+                result = None
+            self.record(layout, group, selector, bool(result), time.perf_counter() - start)
+            if result:
+                return selector, result
+        return None, None
+
+    def stats(self):
+        """Per-selector hit counts and timings, slowest groups first"""
+        with self._lock:
+            items = [(key, dict(value)) for key, value in self._stats.items()]
+            scores = {key: dict(value) for key, value in self._scores.items()}
+
+        rows = []
+        for (layout, group, selector), counters in items:
+            probes = counters["hits"] + counters["misses"]
+            rows.append({
+                "layout": layout,
+                "group": group,
+                "selector": selector,
+                "hits": counters["hits"],
+                "misses": counters["misses"],
+                "hit_rate": round(counters["hits"] / probes * 100, 1) if probes else 0,
+                "total_ms": round(counters["total_time"] * 1000, 2),
+                "avg_ms": round(counters["total_time"] * 1000 / probes, 2) if probes else 0,
+                "score": round(scores.get((layout, group), {}).get(selector, 0.0), 3)
+            })
+        rows.sort(key=lambda row: (-row["total_ms"], row["layout"], row["group"]))
+        return rows
+
+    def reset(self):
+        """Forget learned orderings and statistics"""
+        with self._lock:
+            self._scores.clear()
+            self._stats.clear()
+
+
+# Shared by the listing and review scrapers
+selector_cache = SelectorCache()
@@ -25,7 +25,8 @@ def analyze_product():
         response = {
             "success": True,
             "analysis_data": {
-                "reviews": reviews,
+                # analysis_result already holds each review with its sentiment; don't echo the input too
+                "review_count": len(reviews),
                 "sentiment_analysis": analysis_result,
                 "product_info": product_info,
                 "analysis_timestamp": analysis_result.get("analysis_timestamp")
@@ -0,0 +1,98 @@
+# backend/sentiment_summary.py
+import re
+
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
+
+
+def parse_rating(value):
+    """Numeric star rating from values like 4, "4", "4.0 out of 5"; None if absent"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r'\d+(?:\.\d+)?', str(value or ""))
+    return float(match.group()) if match else None
+
+
+class SentimentSummary:
+    """Mergeable sentiment totals: per-label counts, polarity and rating sums.
+
+    Summaries of disjoint review sets merge exactly, so incremental updates and
+    rollups never need to re-read the reviews they were built from.
+    """
+
+    def __init__(self, counts=None, polarity_sum=0.0, rating_sum=0.0, rating_count=0):
+        self.counts = {label: 0 for label in SENTIMENT_LABELS}
+        self.counts.update(counts or {})
+        self.polarity_sum = polarity_sum
+        self.rating_sum = rating_sum
+        self.rating_count = rating_count
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def add(self, sentiment, polarity=0.0, rating=None):
+        self.counts[sentiment] = self.counts.get(sentiment, 0) + 1
+        self.polarity_sum += polarity or 0.0
+        rating = parse_rating(rating)
+        if rating is not None:
+            self.rating_sum += rating
+            self.rating_count += 1
+        return self
+
+    def add_review(self, analyzed_review):
+        """Add one analyzed review as produced by the pipelines ({"sentiment": {...}, "rating": ...})"""
+        sentiment = analyzed_review.get("sentiment", {})
+        if isinstance(sentiment, dict):
+            return self.add(sentiment.get("sentiment", "neutral"), sentiment.get("polarity", 0.0),
+                            analyzed_review.get("rating"))
+        return self.add(sentiment or "neutral", analyzed_review.get("polarity", 0.0), analyzed_review.get("rating"))
+
+    def merge(self, other):
+        for label, count in other.counts.items():
+            self.counts[label] = self.counts.get(label, 0) + count
+        self.polarity_sum += other.polarity_sum
+        self.rating_sum += other.rating_sum
+        self.rating_count += other.rating_count
+        return self
+
+    def subtract(self, other):
+        """Undo a merge of `other`, e.g. to replace a stale contribution with a fresh one"""
+        for label, count in other.counts.items():
+            self.counts[label] = self.counts.get(label, 0) - count
+        self.polarity_sum -= other.polarity_sum
+        self.rating_sum -= other.rating_sum
+        self.rating_count -= other.rating_count
+        return self
+
+    def percentages(self):
+        total = self.total
+        return {
+            label: round((count / total) * 100, 1) if total > 0 else 0
+            for label, count in self.counts.items()
+        }
+
+    def to_dict(self):
+        total = self.total
+        percentages = self.percentages()
+        overall = max(percentages.items(), key=lambda x: x[1])[0] if total else "neutral"
+        return {
+            "total_reviews": total,
+            "counts": dict(self.counts),
+            "sentiment_summary": percentages,
+            "overall_sentiment": overall,
+            "average_polarity": round(self.polarity_sum / total, 4) if total else 0.0,
+            "average_rating": round(self.rating_sum / self.rating_count, 2) if self.rating_count else None,
+            "polarity_sum": self.polarity_sum,
+            "rating_sum": self.rating_sum,
+            "rating_count": self.rating_count
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(
+            counts=data.get("counts"),
+            polarity_sum=data.get("polarity_sum", 0.0),
+            rating_sum=data.get("rating_sum", 0.0),
+            rating_count=data.get("rating_count", 0)
+        )
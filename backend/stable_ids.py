@@ -0,0 +1,64 @@
+# backend/stable_ids.py
+import hashlib
+import re
+from urllib.parse import urlparse
+
+SNAPDEAL_PRODUCT_PATH = re.compile(r'/product/[^/]+/(\d+)')
+
+
+def normalize_product_url(url):
+    """Canonical form of a product URL: host without www, no query, no /reviews suffix"""
+    parsed = urlparse((url or "").strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/")
+    if path.endswith("/reviews"):
+        path = path[:-len("/reviews")]
+    return f"{host}{path}"
+
+
+def product_id_for(url):
+    """Deterministic product ID from the Snapdeal product ID or the normalized URL"""
+    match = SNAPDEAL_PRODUCT_PATH.search(urlparse((url or "").strip()).path)
+    if match:
+        return f"sd-{match.group(1)}"
+    digest = hashlib.sha1(normalize_product_url(url).encode("utf-8")).hexdigest()
+    return f"p-{digest[:16]}"
+
+
+def store_product_id(product):
+    """ID a product dict is stored under: derived from its URL when it has one, else its own id"""
+    url = product.get("url") or product.get("link") or product.get("product_url")
+    return product_id_for(url) if url else product.get("id") or ""
+
+
+def _normalize_field(value):
+    return re.sub(r'\s+', ' ', str(value or "")).strip().lower()
+
+
+def review_id_for(review, product_id=""):
+    """Deterministic review ID from a hash of product, reviewer, date and text"""
+    if isinstance(review, dict):
+        parts = [review.get("reviewer"), review.get("date"), review.get("text") or review.get("review")]
+    else:
+        parts = [None, None, review]
+    key = "\x1f".join([product_id or ""] + [_normalize_field(part) for part in parts])
+    return f"rv-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+
+
+def assign_review_ids(reviews, product_id=""):
+    """Set an `id` on every review dict that lacks one and drop duplicates, keeping the first"""
+    seen = set()
+    unique = []
+    for review in reviews:
+        if not isinstance(review, dict):
+            unique.append(review)
+            continue
+        review_id = review.get("id") or review_id_for(review, product_id)
+        if review_id in seen:
+            continue
+        seen.add(review_id)
+        review["id"] = review_id
+        unique.append(review)
+    return unique
@@ -0,0 +1,340 @@
+# backend/synthetic_corpus.py
+"""Deterministic synthetic products and reviews for load and scale testing.
+
+Usage:
+  python synthetic_corpus.py [--products 1000] [--reviews-per-product 25] [--seed 42]
+                             [--mix positive=0.6,negative=0.25,neutral=0.15]
+                             [--format products|reviews] [--out corpus.jsonl.gz]
+  python synthetic_corpus.py --products 200 --post http://localhost:5000 [--endpoint analyze-sentiment]
+
+Records are streamed one per line, so millions of rows never sit in memory.
+The same seed always produces the same corpus; product N can be generated
+on its own, which keeps sharded or resumed runs identical.
+"""
+import argparse
+import gzip
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from stable_ids import product_id_for, review_id_for
+
+CATEGORIES = {
+    "men-apparel-shirts": ["Cotton Formal Shirt", "Slim Fit Casual Shirt", "Check Full Sleeve Shirt", "Linen Half Sleeve Shirt"],
+    "women-apparel-stiched-kurtis": ["Cotton A-Line Kurti", "Rayon Printed Kurti", "Anarkali Kurti Set", "Embroidered Straight Kurti"],
+    "womens-footwear-heeled-slipon-pump": ["Slip On Heels", "Block Heel Pumps", "Party Wear Sandals", "Casual Bellies"],
+    "mens-footwear-sports-shoes": ["Running Shoes", "Training Sneakers", "Walking Shoes", "Mesh Sports Shoes"],
+    "mobiles-mobile-phones": ["4G Smartphone", "5G Smartphone", "Feature Phone", "Dual SIM Phone"],
+    "home-kitchen-appliances": ["Mixer Grinder", "Electric Kettle", "Induction Cooktop", "Sandwich Maker"]
+}
+
+BRANDS = ["Inblu", "Seventeenstitch", "Pankti Fashion", "Highlander", "Campus", "Sparx", "Prestige", "Pigeon", "Redmi", "Samsung"]
+COLOURS = ["Red", "Blue", "Black", "White", "Green", "Cream", "Maroon", "Navy", "Pink", "Grey"]
+
+PHRASES = {
+    "positive": {
+        "english": [
+            "very good quality", "fabric is soft and comfortable", "perfect fit", "worth the money",
+            "excellent product", "colour is exactly as shown", "fast delivery", "highly recommend",
+            "looks beautiful", "stitching is neat", "happy with the purchase", "value for money",
+            "my wife loved it", "great design", "superb finish"
+        ],
+        "hinglish": [
+            "bahut accha product hai", "ekdum mast quality", "paisa vasool", "bohot badhiya fitting",
+            "acche se pack hoke aaya", "sahi hai bhai", "colour bilkul same hai", "full paisa vasool"
+        ],
+        "emoji": ["👍", "👌", "😊", "😀", "❤️", "🔥", "💯", "🥰"]
+    },
+    "negative": {
+        "english": [
+            "very poor quality", "colour faded after first wash", "size is too small", "waste of money",
+            "stitching came off", "not as shown in the picture", "cheap material", "worst product",
+            "received a damaged piece", "return process is horrible", "fake product", "totally disappointed",
+            "shrinks after wash", "too tight", "do not buy"
+        ],
+        "hinglish": [
+            "bilkul bekar hai", "quality kharab hai", "paise barbaad", "size chota hai yaar",
+            "ekdum ghatiya", "mat lena", "colour utar gaya", "bekar product bheja"
+        ],
+        "emoji": ["👎", "😞", "😠", "😡", "🤬", "💔"]
+    },
+    "neutral": {
+        "english": [
+            "it is okay", "average product", "delivered on time", "fits as expected", "nothing special",
+            "same as described", "decent for the price", "packaging was fine", "colour is slightly different",
+            "can be better"
+        ],
+        "hinglish": [
+            "theek thaak hai", "chalega", "ok ok hai", "thoda better ho sakta tha", "normal quality hai"
+        ],
+        "emoji": ["🙂", "😐", "🤔"]
+    }
+}
+
+REVIEWER_NAMES = ["Ravi", "Priya", "Amit", "Sneha", "Rahul", "Pooja", "Vikas", "Anjali", "Suresh", "Neha", "S", "K", "Anonymous"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+RATING_RANGES = {"positive": (4.0, 5.0), "negative": (1.0, 2.0), "neutral": (2.5, 3.5)}
+
+
+def parse_mix(text):
+    """Parse 'positive=0.6,negative=0.25,neutral=0.15' into normalized weights"""
+    mix = {"positive": 0.0, "negative": 0.0, "neutral": 0.0}
+    for part in text.split(","):
+        label, _, weight = part.partition("=")
+        label = label.strip().lower()
+        if label not in mix:
+            raise ValueError(f"Unknown sentiment in mix: {label}")
+        mix[label] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Sentiment mix must have a positive total")
+    return {label: weight / total for label, weight in mix.items()}
+
+
+class SyntheticCorpus:
+    """Seedable generator of realistic products and reviews"""
+
+    def __init__(self, seed=42, sentiment_mix=None, reviews_per_product=25, review_length=12,
+                 length_sigma=0.6, hinglish_rate=0.3, emoji_rate=0.35,
+                 categories=None, start_date="2025-01-01", days=365):
+        self.seed = seed
+        self.sentiment_mix = sentiment_mix or {"positive": 0.6, "negative": 0.25, "neutral": 0.15}
+        self.reviews_per_product = reviews_per_product
+        self.review_length = review_length
+        self.length_sigma = length_sigma
+        self.hinglish_rate = hinglish_rate
+        self.emoji_rate = emoji_rate
+        self.categories = categories or list(CATEGORIES)
+        self.start_date = datetime.strptime(start_date, "%Y-%m-%d")
+        self.days = days
+        self._labels = list(self.sentiment_mix)
+        self._weights = [self.sentiment_mix[label] for label in self._labels]
+
+    def _rng(self, *key):
+        return random.Random(f"{self.seed}:" + ":".join(str(part) for part in key))
+
+    def product(self, index):
+        """Generate product number `index` (same output for the same seed and index)"""
+        rng = self._rng("product", index)
+        category = self.categories[index % len(self.categories)]
+        kind = rng.choice(CATEGORIES.get(category, ["Product"]))
+        snapdeal_id = 600000000000 + index
+        slug = f"{rng.choice(BRANDS)}-{kind}".lower().replace(" ", "-")
+        link = f"https://www.snapdeal.com/product/{slug}/{snapdeal_id}"
+        scraped_at = self.start_date + timedelta(days=rng.randrange(self.days), seconds=rng.randrange(86400))
+        return {
+            "id": product_id_for(link),
+            "title": f"{rng.choice(BRANDS)} {rng.choice(COLOURS)} {kind}",
+            "link": link,
+            "price": rng.randrange(199, 2999),
+            "image_url": f"https://via.placeholder.com/300x300?text=Product+{index}",
+            "discount": f"{rng.randrange(10, 80)}% Off",
+            "category": category,
+            "reviews": [],
+            "sentiment": None,
+            "scraped_at": scraped_at.isoformat()
+        }
+
+    def review_count(self, index):
+        """Reviews for product `index`, drawn from a geometric-like distribution around the mean"""
+        rng = self._rng("count", index)
+        if self.reviews_per_product <= 0:
+            return 0
+        return max(1, int(rng.expovariate(1 / self.reviews_per_product)))
+
+    def review(self, product, index):
+        """Generate review number `index` for a product"""
+        rng = self._rng("review", product["id"], index)
+        label = rng.choices(self._labels, weights=self._weights)[0]
+        bank = PHRASES[label]
+
+        target_words = max(3, int(rng.lognormvariate(math.log(self.review_length), self.length_sigma)))
+        parts = []
+        words = 0
+        while words < target_words:
+            pool = bank["hinglish"] if rng.random() < self.hinglish_rate else bank["english"]
+            phrase = rng.choice(pool)
+            if rng.random() < self.emoji_rate:
+                phrase = f"{phrase} {rng.choice(bank['emoji'])}"
+            parts.append(phrase)
+            words += len(phrase.split())
+        text = ". ".join(parts)
+        text = text[0].upper() + text[1:]
+
+        low, high = RATING_RANGES[label]
+        day = self.start_date + timedelta(days=rng.randrange(self.days))
+        reviewer = rng.choice(REVIEWER_NAMES)
+        review = {
+            "rating": f"{rng.uniform(low, high):.1f}/5",
+            "text": text,
+            "reviewer": reviewer,
+            "date": f"on {day.day} {MONTHS[day.month - 1]}, {day.year}",
+            "scraped_at": product["scraped_at"],
+            "expected_sentiment": label
+        }
+        review["id"] = review_id_for(review, product["id"])
+        return review
+
+    def products_with_reviews(self, count, offset=0):
+        """Yield products with their reviews embedded, ready for /api/analyze-sentiment"""
+        for index in range(offset, offset + count):
+            product = self.product(index)
+            product["reviews"] = [self.review(product, i) for i in range(self.review_count(index))]
+            yield product
+
+    def review_rows(self, count, offset=0):
+        """Yield one flat review row at a time for bulk storage and analyzer tests"""
+        for index in range(offset, offset + count):
+            product = self.product(index)
+            for i in range(self.review_count(index)):
+                yield {
+                    "product_id": product["id"],
+                    "category": product["category"],
+                    **self.review(product, i)
+                }
+
+
+def open_output(path):
+    if not path or path == "-":
+        return sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def write_jsonl(records, out):
+    """Stream records as compact JSON lines and return how many were written"""
+    written = 0
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        out.write("\n")
+        written += 1
+    return written
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def post_to_api(products, base_url, endpoint="analyze-sentiment", batch_size=10, concurrency=4, timeout=300):
+    """Feed generated products to an API endpoint and report throughput and latency"""
+    import requests
+
+    url = f"{base_url.rstrip('/')}/api/{endpoint}"
+    latencies = []
+    counters = {"requests": 0, "errors": 0, "products": 0, "reviews": 0}
+    lock = threading.Lock()
+
+    def send(batch):
+        if endpoint == "save-products":
+            payload = {"products": batch, "category": batch[0]["category"]}
+        else:
+            payload = {"products": batch}
+        start = time.perf_counter()
+        try:
+            response = requests.post(url, json=payload, timeout=timeout)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            counters["requests"] += 1
+            counters["products"] += len(batch)
+            counters["reviews"] += sum(len(product["reviews"]) for product in batch)
+            if not ok:
+                counters["errors"] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Bound the number of in-flight batches so the corpus keeps streaming
+        pending = []
+        for batch in batched(products, batch_size):
+            pending.append(pool.submit(send, batch))
+            if len(pending) >= concurrency * 2:
+                pending.pop(0).result()
+        for future in pending:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1) if latencies else 0
+
+    return {
+        **counters,
+        "seconds": round(elapsed, 2),
+        "reviews_per_sec": round(counters["reviews"] / elapsed, 1) if elapsed else 0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic review corpus")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--offset", type=int, default=0, help="Index of the first product (for sharded runs)")
+    parser.add_argument("--reviews-per-product", type=float, default=25)
+    parser.add_argument("--review-length", type=int, default=12, help="Median review length in words")
+    parser.add_argument("--length-sigma", type=float, default=0.6)
+    parser.add_argument("--mix", default="positive=0.6,negative=0.25,neutral=0.15")
+    parser.add_argument("--hinglish-rate", type=float, default=0.3)
+    parser.add_argument("--emoji-rate", type=float, default=0.35)
+    parser.add_argument("--categories", help="Comma-separated category slugs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["products", "reviews"], default="products")
+    parser.add_argument("--out", default="-", help="Output path (.gz to compress), '-' for stdout")
+    parser.add_argument("--post", metavar="BASE_URL", help="Send products to a running API instead of writing JSONL")
+    parser.add_argument("--endpoint", choices=["analyze-sentiment", "save-products"], default="analyze-sentiment")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(
+        seed=args.seed,
+        sentiment_mix=parse_mix(args.mix),
+        reviews_per_product=args.reviews_per_product,
+        review_length=args.review_length,
+        length_sigma=args.length_sigma,
+        hinglish_rate=args.hinglish_rate,
+        emoji_rate=args.emoji_rate,
+        categories=args.categories.split(",") if args.categories else None
+    )
+
+    if args.post:
+        stats = post_to_api(
+            corpus.products_with_reviews(args.products, args.offset),
+            args.post, args.endpoint, args.batch_size, args.concurrency
+        )
+        print(json.dumps(stats, indent=2), file=sys.stderr)
+        return
+
+    records = (corpus.review_rows(args.products, args.offset) if args.format == "reviews"
+               else corpus.products_with_reviews(args.products, args.offset))
+    start = time.perf_counter()
+    out = open_output(args.out)
+    try:
+        written = write_jsonl(records, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"✓ Wrote {written} {args.format} records in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# backend/tests/conftest.py
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# Backend modules import each other by bare name, as when run from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Module-level stores must never touch the real data/ directory
+_scratch = tempfile.mkdtemp(prefix="backend-tests-")
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+os.environ.setdefault("STORE_DB_PATH", os.path.join(_scratch, "store.db"))
+os.environ.setdefault("PERSIST_DATA_DIR", os.path.join(_scratch, "data"))
+
+
+def analyzed_review(text, sentiment, polarity, rating=None, date="Oct 02, 2025"):
+    """A review as the analysis pipelines store it"""
+    return {"text": text, "rating": rating, "date": date, "reviewer": "Asha",
+            "sentiment": {"sentiment": sentiment, "score": 80, "confidence": 80, "polarity": polarity}}
+
+
+@pytest.fixture
+def make_review():
+    return analyzed_review
+
+
+@pytest.fixture
+def seeded_store(tmp_path):
+    """ReviewStore with a shirt (sd-1001) and jeans (sd-1002) in "men" and a kurti (sd-1003) in "women".
+    Only the men's products have reviews"""
+    from review_store import ReviewStore
+
+    store = ReviewStore(str(tmp_path / "store.db"))
+    store.upsert_products([
+        {"title": "Cotton Shirt", "link": "https://www.snapdeal.com/product/mens-shirt/1001"},
+        {"title": "Denim Jeans", "link": "https://www.snapdeal.com/product/mens-jeans/1002"},
+    ], category="men")
+    store.upsert_products([{"title": "Kurti", "link": "https://www.snapdeal.com/product/kurti/1003"}],
+                          category="women")
+    store.upsert_reviews({"id": "sd-1001"}, [
+        analyzed_review("Soft cotton fabric, perfect fit", "positive", 0.8, 5, "Oct 02, 2025"),
+        analyzed_review("Colour faded after the first wash", "negative", -0.6, 2, "Oct 09, 2025"),
+        analyzed_review("Okay shirt for the price", "neutral", 0.0, 3, "Nov 01, 2025"),
+    ])
+    store.upsert_reviews({"id": "sd-1002"}, [
+        analyzed_review("Great denim, great fit", "positive", 0.9, 5),
+        analyzed_review("Cotton blend feels cheap", "negative", -0.4, 2),
+    ])
+    return store
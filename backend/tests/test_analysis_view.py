@@ -0,0 +1,65 @@
+# backend/tests/test_analysis_view.py
+"""Trimmed analysis views: field projection, dropping and paging analyzed reviews"""
+from analysis_view import parse_fields, project, shape_analysis
+
+ANALYSIS = {
+    "success": True,
+    "summary": {"total_reviews": 3, "sentiment_distribution": {"positive": 2, "negative": 1}},
+    "insights": ["Customers like the fit"],
+    "analyzed_reviews": [
+        {"text": f"Review {n}", "sentiment_analysis": {"sentiment": "positive", "polarity": 0.5}}
+        for n in range(3)
+    ],
+}
+
+
+def test_parse_fields():
+    assert parse_fields("summary, analyzed_reviews.sentiment_analysis.sentiment") == {
+        "summary": {}, "analyzed_reviews": {"sentiment_analysis": {"sentiment": {}}}
+    }
+    assert parse_fields(["a.b", "a.c"]) == {"a": {"b": {}, "c": {}}}
+    assert parse_fields(" , .") == {} and parse_fields(None) == {}
+
+
+def test_a_whole_field_wins_over_its_subfields():
+    assert parse_fields("summary.total_reviews,summary") == {"summary": {}}
+    assert parse_fields("summary,summary.total_reviews") == {"summary": {}}
+
+
+def test_project_through_lists():
+    projected = project(ANALYSIS, parse_fields("analyzed_reviews.sentiment_analysis.sentiment,nope"))
+
+    assert projected == {"analyzed_reviews": [{"sentiment_analysis": {"sentiment": "positive"}}] * 3}
+    assert project(ANALYSIS, {}) is ANALYSIS
+
+
+def test_include_reviews_off():
+    shaped = shape_analysis(ANALYSIS, include_reviews=False)
+
+    assert "analyzed_reviews" not in shaped and shaped["summary"] == ANALYSIS["summary"]
+    assert len(ANALYSIS["analyzed_reviews"]) == 3  # the cached result is not modified
+
+
+def test_reviews_paging():
+    first = shape_analysis(ANALYSIS, reviews_limit=2)
+    last = shape_analysis(ANALYSIS, reviews_offset=2, reviews_limit=2)
+
+    assert [review["text"] for review in first["analyzed_reviews"]] == ["Review 0", "Review 1"]
+    assert first["reviews_page"] == {"offset": 0, "limit": 2, "total": 3, "next_offset": 2}
+    assert [review["text"] for review in last["analyzed_reviews"]] == ["Review 2"]
+    assert last["reviews_page"]["next_offset"] is None
+    assert "reviews_page" not in shape_analysis(ANALYSIS)
+
+
+def test_fields_with_paging_keep_the_page_info():
+    shaped = shape_analysis(ANALYSIS, fields="analyzed_reviews.text", reviews_offset=1, reviews_limit=1)
+
+    assert shaped == {
+        "analyzed_reviews": [{"text": "Review 1"}],
+        "reviews_page": {"offset": 1, "limit": 1, "total": 3, "next_offset": 2},
+    }
+
+
+def test_non_dict_results_pass_through():
+    assert shape_analysis(None, fields="summary") is None
+    assert shape_analysis({"error": "boom"}, include_reviews=False) == {"error": "boom"}
@@ -0,0 +1,140 @@
+# backend/tests/test_compaction.py
+"""Compaction: streaming bulk files, deduplicated merges into the store and retention policies"""
+import gzip
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from compaction import compact, compaction_sources, iter_bulk_results
+from review_store import ReviewStore
+
+NOW = datetime(2026, 10, 19, 12, 0)
+SHIRT = "https://www.snapdeal.com/product/mens-shirt/1001"
+JEANS = "https://www.snapdeal.com/product/mens-jeans/1002"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReviewStore(str(tmp_path / "reviews.db"))
+
+
+@pytest.fixture
+def data_dir(tmp_path, make_review):
+    """Two old bulk files repeating the same shirt review, and an old and today's record log"""
+    directory = tmp_path / "data"
+    directory.mkdir()
+    soft = make_review("Soft cotton fabric, perfect fit", "positive", 0.8, 5)
+    faded = make_review("Colour faded after the first wash", "negative", -0.6, 2)
+    denim = make_review("Great denim, great fit", "positive", 0.9, 5)
+    (directory / "reviews_bulk_20261001_090000.json").write_text(json.dumps(
+        {"success": True, "results": [{"url": SHIRT, "reviews": [soft]}, {"url": JEANS, "reviews": []}]}
+    ))
+    (directory / "reviews_bulk_20261002_090000.json").write_text(json.dumps(
+        {"success": True, "results": [{"url": SHIRT, "reviews": [soft, faded]}]}
+    ))
+    (directory / "reviews_20261015.jsonl").write_text(
+        json.dumps({"type": "product_reviews", "url": JEANS, "reviews": [denim]}) + "\n"
+        + json.dumps({"type": "summary", "products": 1}) + "\n"
+    )
+    (directory / "reviews_20261019.jsonl").write_text(
+        json.dumps({"type": "product_reviews", "url": JEANS, "reviews": [faded]}) + "\n"
+    )
+    return directory
+
+
+def test_iter_bulk_results_across_chunk_boundaries(tmp_path):
+    results = [{"url": f"{SHIRT}?n={n}", "reviews": [{"text": "x" * n}]} for n in range(50)]
+    path = tmp_path / "reviews_bulk_20261001_090000.json"
+    path.write_text(json.dumps({"summary": {"results": 50}, "results": results}, indent=1))
+
+    assert list(iter_bulk_results(str(path), chunk_size=16)) == results
+
+
+def test_iter_bulk_results_rejects_a_truncated_file(tmp_path):
+    path = tmp_path / "reviews_bulk_20261001_090000.json"
+    path.write_text('{"results": [{"url": "a"}, {"url": "b"')
+
+    with pytest.raises(ValueError):
+        list(iter_bulk_results(str(path), chunk_size=8))
+
+
+def test_sources_skip_todays_log(data_dir):
+    names = [os.path.basename(path) for path, _ in compaction_sources(str(data_dir), NOW)]
+
+    assert names == ["reviews_20261015.jsonl", "reviews_bulk_20261001_090000.json",
+                     "reviews_bulk_20261002_090000.json"]
+
+
+def test_repeated_reviews_are_merged_once(store, data_dir):
+    totals = compact(store, str(data_dir), retention="keep", now=NOW)
+
+    assert totals["merged"] == 3 and totals["reviews_read"] == 4
+    assert totals["new_reviews"] == 3
+    assert store.stats()["reviews"] == 3
+    assert sorted(review["text"] for review in store.reviews("sd-1001")) == [
+        "Colour faded after the first wash", "Soft cotton fabric, perfect fit"
+    ]
+    # Today's log is left for a later run
+    assert "Colour faded after the first wash" not in [review["text"] for review in store.reviews("sd-1002")]
+
+
+def test_unchanged_files_are_not_merged_again(store, data_dir):
+    compact(store, str(data_dir), retention="keep", now=NOW)
+
+    again = compact(store, str(data_dir), retention="keep", now=NOW)
+
+    assert again["files"] == 3 and again["merged"] == 0 and again["new_reviews"] == 0
+
+
+def test_archive_retention_respects_min_age(store, data_dir):
+    totals = compact(store, str(data_dir), retention="archive", min_age_days=7, now=NOW)
+
+    assert totals["archived"] == 2
+    archive = data_dir / "archive" / "reviews"
+    assert sorted(os.listdir(archive)) == ["reviews_bulk_20261001_090000.json.gz",
+                                           "reviews_bulk_20261002_090000.json.gz"]
+    with gzip.open(archive / "reviews_bulk_20261002_090000.json.gz", "rt") as f:
+        assert len(json.load(f)["results"][0]["reviews"]) == 2
+    # Younger than min_age_days: merged but kept
+    assert (data_dir / "reviews_20261015.jsonl").exists()
+    assert (data_dir / "reviews_20261019.jsonl").exists()
+
+
+def test_delete_retention(store, data_dir):
+    totals = compact(store, str(data_dir), retention="delete", min_age_days=0, now=NOW)
+
+    assert totals["deleted"] == 3 and totals["bytes_freed"] > 0
+    assert sorted(os.listdir(data_dir)) == ["reviews_20261019.jsonl"]
+    assert store.stats()["reviews"] == 3
+
+
+def test_dry_run_changes_nothing(store, data_dir):
+    before = sorted(os.listdir(data_dir))
+
+    totals = compact(store, str(data_dir), retention="delete", min_age_days=0, dry_run=True, now=NOW)
+
+    assert totals["files"] == 3 and totals["merged"] == 0
+    assert sorted(os.listdir(data_dir)) == before
+    assert store.stats()["reviews"] == 0
+
+
+def test_unmergeable_file_is_left_in_place(store, data_dir):
+    broken = data_dir / "reviews_bulk_20261003_090000.json"
+    broken.write_text('{"results": [{"url": "a"')
+
+    totals = compact(store, str(data_dir), retention="delete", min_age_days=0, now=NOW)
+
+    assert totals["failed"] == 1 and broken.exists()
+
+
+def test_concurrent_run_is_skipped(store, data_dir):
+    (data_dir / ".compaction.lock").touch()
+
+    assert compact(store, str(data_dir), now=NOW)["skipped"] == "locked"
+
+
+def test_unknown_retention_is_rejected(store, data_dir):
+    with pytest.raises(ValueError):
+        compact(store, str(data_dir), retention="shred", now=NOW)
@@ -0,0 +1,82 @@
+# backend/tests/test_http_cache.py
+"""Prepared JSON bodies: ETags, 304s and compression"""
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+import http_cache
+from http_cache import prepared_json, conditional_response, compress_response
+
+PAYLOAD = {"products": [{"id": i, "title": f"Product {i}"} for i in range(100)]}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    body, etag = prepared_json(PAYLOAD)
+
+    @app.route("/products")
+    def products():
+        return conditional_response(body, etag, "no-cache")
+
+    @app.route("/analysis")
+    def analysis():
+        return conditional_response(body, etag, "private, max-age=60", stable=False)
+
+    app.after_request(lambda response: compress_response(response, 1024))
+    http_cache._compressed.clear()
+    return app.test_client()
+
+
+def test_prepared_json_is_compact_and_hashed():
+    body, etag = prepared_json({"a": [1, 2]})
+    assert body == b'{"a":[1,2]}'
+    assert etag == prepared_json({"a": [1, 2]})[1] != prepared_json({"a": [1]})[1]
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_304_carries_the_same_etag_as_the_200(client, encoding):
+    first = client.get("/products", headers={"Accept-Encoding": encoding})
+    assert first.status_code == 200 and first.headers["ETag"].startswith('W/"')
+
+    again = client.get("/products", headers={"Accept-Encoding": encoding, "If-None-Match": first.headers["ETag"]})
+
+    assert again.status_code == 304 and again.data == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert "Accept-Encoding" in again.headers["Vary"]
+
+
+def test_strong_form_of_the_etag_also_matches(client):
+    etag = client.get("/products").headers["ETag"]
+    assert client.get("/products", headers={"If-None-Match": etag[2:]}).status_code == 304
+    assert client.get("/products", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_gzip_body_round_trips_and_is_cached(client):
+    response = client.get("/products", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.data)) == PAYLOAD
+    assert len(http_cache._compressed) == 1
+
+
+def test_unstable_bodies_are_compressed_but_not_cached(client):
+    response = client.get("/analysis", headers={"Accept-Encoding": "gzip"})
+
+    assert json.loads(gzip.decompress(response.data)) == PAYLOAD
+    assert not http_cache._compressed
+
+
+def test_small_bodies_are_not_compressed():
+    app = Flask(__name__)
+
+    @app.route("/small")
+    def small():
+        return conditional_response(*prepared_json({"ok": True}), "no-cache")
+
+    app.after_request(lambda response: compress_response(response, 1024))
+    client = app.test_client()
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
@@ -0,0 +1,184 @@
+# backend/tests/test_jobs.py
+"""JobManager: submit, fair claiming, cancellation, coalescing, lease reclaim and worker resilience"""
+import time
+
+import pytest
+
+from jobs import JobManager, JobCancelled, PRIORITY_LOW
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(str(tmp_path / "jobs.db"), max_workers=0, max_running_per_user=1)
+    manager.register("echo", lambda params, job: {"success": True, "params": params})
+    return manager
+
+
+def run_next(manager, owner=None):
+    """Claim and run one job in this thread, like a worker would"""
+    row = manager.claim(owner or manager.owner, ["echo"])
+    if row is not None:
+        manager._run(row)
+    return row
+
+
+def test_submit_and_run(manager):
+    job = manager.submit("echo", {"n": 1}, user_key="u1")
+    assert job["status"] == "queued" and not job["coalesced"]
+
+    run_next(manager)
+
+    finished = manager.get(job["id"])
+    assert finished["status"] == "succeeded"
+    assert finished["status_code"] == 200
+    assert finished["result"] == {"success": True, "params": {"n": 1}}
+    assert manager.events(job["id"])[-1]["event"] == "done"
+
+
+def test_unknown_kind_is_rejected(manager):
+    with pytest.raises(ValueError):
+        manager.submit("nope", {})
+
+
+def test_claim_prefers_priority_then_fairness(manager):
+    low = manager.submit("echo", {}, user_key="u1", priority=PRIORITY_LOW)
+    first = manager.submit("echo", {}, user_key="u1")
+    second = manager.submit("echo", {}, user_key="u1")
+    other = manager.submit("echo", {}, user_key="u2")
+
+    assert manager.claim("w", ["echo"])["id"] == first["id"]
+    # u1 is at its running cap, so u2 goes next even though u1 queued earlier
+    assert manager.claim("w", ["echo"])["id"] == other["id"]
+    assert manager.claim("w", ["echo"]) is None
+    assert manager.get(second["id"])["status"] == "queued"
+    assert manager.get(low["id"])["status"] == "queued"
+
+
+def test_claim_only_runnable_kinds(manager):
+    manager.submit("echo", {})
+    assert manager.claim("w", []) is None
+    assert manager.claim("w", ["other"]) is None
+    assert manager.claim("w", ["echo"]) is not None
+
+
+def test_cancel_queued_job(manager):
+    job = manager.submit("echo", {}, user_key="u1")
+
+    cancelled = manager.cancel(job["id"], "changed my mind")
+
+    assert cancelled["status"] == "cancelled"
+    assert manager.get(job["id"])["status_code"] == 499
+    assert manager.claim("w", ["echo"]) is None
+
+
+def test_cancel_running_job_stops_at_next_check(manager):
+    def slow(params, job):
+        manager.cancel(job.id, "stop")
+        job.check_cancelled()
+        return {"success": True}
+
+    manager.register("slow", slow)
+    job = manager.submit("slow", {}, user_key="u1")
+    manager._run(manager.claim(manager.owner, ["slow"]))
+
+    finished = manager.get(job["id"])
+    assert finished["status"] == "cancelled"
+    assert finished["result"] == JobCancelled("stop").body
+
+
+def test_cancel_requires_a_subscriber(manager):
+    job = manager.submit("echo", {}, user_key="u1")
+
+    assert manager.cancel(job["id"], user_key="u2") is None
+    assert manager.get(job["id"])["status"] == "queued"
+    assert manager.cancel(job["id"], user_key="u1")["status"] == "cancelled"
+
+
+def test_coalesced_job_is_cancelled_by_its_last_subscriber(manager):
+    job = manager.submit("echo", {}, user_key="u1", coalesce_key="same")
+    attached = manager.submit("echo", {}, user_key="u2", coalesce_key="same")
+    assert attached["id"] == job["id"] and attached["coalesced"]
+
+    left = manager.cancel(job["id"], user_key="u1")
+    assert left["status"] == "queued" and left["subscribers"] == 1
+    # u1 already left; it can't cancel the job for u2
+    assert manager.cancel(job["id"], user_key="u1") is None
+
+    assert manager.cancel(job["id"], user_key="u2")["status"] == "cancelled"
+
+
+def test_expired_lease_is_requeued(manager):
+    job = manager.submit("echo", {})
+    manager.claim("otherhost:1", ["echo"])
+    manager._execute("UPDATE jobs SET lease_expires_at = ? WHERE id = ?", (time.time() - 1, job["id"]))
+
+    manager.reclaim_expired()
+
+    assert manager.get(job["id"])["status"] == "queued"
+    run_next(manager)
+    finished = manager.get(job["id"])
+    assert finished["status"] == "succeeded" and finished["attempts"] == 2
+
+
+def test_expired_lease_fails_after_max_attempts(manager):
+    manager.max_attempts = 1
+    job = manager.submit("echo", {})
+    manager.claim("otherhost:1", ["echo"])
+    manager._execute("UPDATE jobs SET lease_expires_at = ? WHERE id = ?", (time.time() - 1, job["id"]))
+
+    manager.reclaim_expired()
+
+    assert manager.get(job["id"])["status"] == "failed"
+
+
+def test_finish_after_lost_lease_is_discarded(manager):
+    job = manager.submit("echo", {})
+    manager.claim("w1", ["echo"])
+    manager._execute("UPDATE jobs SET status = 'queued', owner = NULL WHERE id = ?", (job["id"],))
+
+    assert not manager.finish(job["id"], "succeeded", {}, 200, owner="w1")
+
+
+def test_bad_job_row_fails_without_killing_the_worker(tmp_path):
+    manager = JobManager(str(tmp_path / "jobs.db"), max_workers=1, poll_interval=0.05)
+    manager.register("echo", lambda params, job: {"success": True, "params": params})
+    bad = manager.submit("echo", {}, timeout=5)
+    manager._execute("UPDATE jobs SET timeout = 'abc' WHERE id = ?", (bad["id"],))
+    good = manager.submit("echo", {"n": 2})
+
+    manager.start()
+
+    assert manager.wait(bad["id"], timeout=10)["status"] == "failed"
+    finished = manager.wait(good["id"], timeout=10)
+    assert finished["status"] == "succeeded"
+    assert finished["result"]["params"] == {"n": 2}
+
+
+def test_jobs_are_only_visible_to_subscribers(manager):
+    mine = manager.submit("echo", {"secret": 1}, user_key="u1", coalesce_key="same")
+    manager.submit("echo", {}, user_key="u2", coalesce_key="same")
+    other = manager.submit("echo", {}, user_key="u3")
+
+    assert manager.get(mine["id"], user_key="u2")["id"] == mine["id"]
+    assert manager.get(mine["id"], user_key="u3") is None
+    assert [job["id"] for job in manager.list(user_key="u1")] == [mine["id"]]
+    assert [job["id"] for job in manager.list(user_key="u3")] == [other["id"]]
+    assert len(manager.list()) == 2
+
+
+def test_legacy_jobs_are_visible_to_their_submitter(manager):
+    job = manager.submit("echo", {}, user_key="u1")
+    manager._execute("DELETE FROM job_subscribers WHERE job_id = ?", (job["id"],))
+
+    assert manager.get(job["id"], user_key="u1") is not None
+    assert manager.get(job["id"], user_key="u2") is None
+
+
+def test_heartbeats_fit_several_times_in_a_lease(tmp_path):
+    short = JobManager(str(tmp_path / "short.db"), max_workers=0, lease_seconds=6)
+    default = JobManager(str(tmp_path / "default.db"), max_workers=0)
+
+    assert short.heartbeat_interval == 2
+    assert default.heartbeat_interval == 15
+    with pytest.raises(ValueError):
+        JobManager(str(tmp_path / "tiny.db"), max_workers=0, lease_seconds=1)
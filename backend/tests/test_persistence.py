@@ -0,0 +1,52 @@
+# backend/tests/test_persistence.py
+"""RecordLog: batched appends, daily log files and reads that survive a torn final batch"""
+import os
+
+import pytest
+
+from persistence import RecordLog, iter_stream, log_files, read_records
+
+
+@pytest.fixture(params=["none", "gzip"])
+def log(request, tmp_path):
+    return RecordLog(data_dir=str(tmp_path), compression=request.param, fsync_interval=0.05, batch_size=3)
+
+
+def test_records_round_trip_in_order(log):
+    path = log.append_many("reviews", [{"n": n, "text": "ünïcode"} for n in range(10)])
+
+    assert log.flush(timeout=5)
+    assert [record["n"] for record in read_records(path)] == list(range(10))
+    stats = log.stats()
+    assert stats["records"] == 10 and stats["pending"] == 0 and stats["batches"] >= 4
+
+
+def test_torn_final_batch_is_skipped(log, capsys):
+    path = log.append_many("reviews", [{"n": 1}, {"n": 2}])
+    assert log.flush(timeout=5)
+    log.append("reviews", {"n": 3, "padding": "x" * 200})
+    assert log.flush(timeout=5)
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 20)
+
+    assert [record["n"] for record in read_records(path)] == [1, 2]
+    assert str(path) in capsys.readouterr().out
+
+
+def test_log_files_and_iter_stream(tmp_path):
+    for name in ("scrape_20261001.jsonl", "scrape_20261002.jsonl", "scrape_notes.jsonl", "other_20261001.jsonl"):
+        (tmp_path / name).write_text("")
+    (tmp_path / "scrape_20261001.jsonl").write_text('{"type":"product","n":1}\n{"type":"summary"}\n')
+    (tmp_path / "scrape_20261002.jsonl").write_text('{"type":"product","n":2}\n')
+
+    assert [os.path.basename(path) for path in log_files("scrape", str(tmp_path))] == [
+        "scrape_20261001.jsonl", "scrape_20261002.jsonl"
+    ]
+    assert [record["n"] for record in iter_stream("scrape", str(tmp_path), record_type="product")] == [1, 2]
+    assert log_files("scrape", str(tmp_path / "missing")) == []
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        RecordLog(data_dir=str(tmp_path), compression="bz2")
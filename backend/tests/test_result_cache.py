@@ -0,0 +1,80 @@
+# backend/tests/test_result_cache.py
+"""AnalysisCache: freshness TTL, stale-while-revalidate window and LRU bound"""
+import pytest
+
+import result_cache
+from result_cache import AnalysisCache
+from http_cache import prepared_json
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_fresh_then_stale_then_expired(clock):
+    cache = AnalysisCache(ttl=10, stale_ttl=20)
+    cache.put("k", {"n": 1})
+
+    assert cache.get("k") == ({"n": 1}, "fresh", 0)
+    clock[0] += 10
+    assert cache.get("k")[1] == "fresh"
+    clock[0] += 5
+    assert cache.get("k") == ({"n": 1}, "stale", 15)
+    clock[0] += 16
+    assert cache.get("k") == (None, "miss", None)
+    # An expired entry is dropped, not just skipped
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.stale_hits, cache.misses) == (2, 1, 1)
+
+
+def test_put_refreshes_a_stale_entry(clock):
+    cache = AnalysisCache(ttl=10, stale_ttl=20)
+    cache.put("k", {"n": 1})
+    clock[0] += 15
+    cache.put("k", {"n": 2})
+
+    assert cache.get("k") == ({"n": 2}, "fresh", 0)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = AnalysisCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b")[1] == "miss"
+    assert cache.get("a")[0] == 1 and cache.get("c")[0] == 3
+
+
+def test_zero_entries_disables_the_cache():
+    cache = AnalysisCache(max_entries=0)
+    cache.put("k", 1)
+    assert cache.get("k")[1] == "miss"
+
+
+def test_prepared_body_is_built_once_per_entry(clock, monkeypatch):
+    cache = AnalysisCache()
+    cache.put("k", {"n": 1})
+    calls = []
+    monkeypatch.setattr(result_cache, "prepared_json", lambda payload: calls.append(payload) or prepared_json(payload))
+
+    first = cache.get_prepared("k")
+    second = cache.get_prepared("k")
+
+    assert first[0] == second[0] == prepared_json({"n": 1})
+    assert len(calls) == 1
+    assert cache.get_prepared("missing") == (None, "miss", None)
+
+
+def test_invalidate():
+    cache = AnalysisCache()
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a")[1] == "miss" and cache.get("b")[1] == "fresh"
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,33 @@
+# backend/tests/test_review_analysis.py
+"""Sentiment analysis: the batched entry point shared by complete and bulk analysis"""
+import pipelines
+import review_analysis
+from review_analysis import analyze_sentiment, analyze_sentiments, analyze_review_batches
+
+REVIEWS = [
+    {"id": "a", "text": "Great product, love it", "rating": 5},
+    {"id": "b", "text": "Terrible quality, broke in a day", "rating": 1},
+    {"id": "c", "text": "Great product, love it", "rating": 4},
+]
+
+
+def test_identical_texts_are_analyzed_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(review_analysis, "analyze_sentiment", lambda text: calls.append(text) or {"text": text})
+
+    assert analyze_sentiments(["x", "y", "x"]) == [{"text": "x"}, {"text": "y"}, {"text": "x"}]
+    assert calls == ["x", "y"]
+
+
+def test_complete_and_bulk_analysis_agree():
+    complete = pipelines.analyze_reviews(REVIEWS)
+    bulk = analyze_review_batches([REVIEWS[:1], REVIEWS[1:]], scorer=analyze_sentiments)
+
+    bulk_reviews = [review for analysis in bulk for review in analysis["analyzed_reviews"]]
+    assert [review["sentiment"] for review in complete] == [review["sentiment_analysis"] for review in bulk_reviews]
+    assert [review["id"] for review in bulk_reviews] == ["a", "b", "c"]
+    assert complete[0]["sentiment"] == analyze_sentiment(REVIEWS[0]["text"])
+
+
+def test_reviews_without_text_are_skipped():
+    assert [review["id"] for review in pipelines.analyze_reviews([{"id": "x", "text": ""}] + REVIEWS)] == ["a", "b", "c"]
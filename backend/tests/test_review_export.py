@@ -0,0 +1,29 @@
+# backend/tests/test_review_export.py
+"""Parquet export: partition naming and retention of old exports"""
+import os
+
+from review_export import _partition_dir, remove_old_exports
+
+
+def test_safe_categories_keep_their_name():
+    assert _partition_dir("men-apparel-shirts", "2025-10-01") == ("category=men-apparel-shirts", "date=2025-10-01")
+    assert _partition_dir("x", None)[1] == "date=unknown"
+
+
+def test_slugged_categories_do_not_collide():
+    spaced = _partition_dir("a b", "d")[0]
+    slashed = _partition_dir("a/b", "d")[0]
+
+    assert spaced.startswith("category=a_b-") and slashed.startswith("category=a_b-")
+    assert len({spaced, slashed, _partition_dir("a_b", "d")[0]}) == 3
+
+
+def test_remove_old_exports(tmp_path):
+    for name in ("old", "current", "recent"):
+        (tmp_path / name).mkdir()
+    os.utime(tmp_path / "old", (0, 0))
+    os.utime(tmp_path / "current", (0, 0))
+
+    assert remove_old_exports(str(tmp_path), 7, keep="current") == ["old"]
+    assert sorted(os.listdir(tmp_path)) == ["current", "recent"]
+    assert remove_old_exports(str(tmp_path / "missing"), 7) == []
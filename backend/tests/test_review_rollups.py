@@ -0,0 +1,67 @@
+# backend/tests/test_review_rollups.py
+"""Sentiment rollups per product and category, and the leaderboard built on them"""
+import pytest
+
+
+def without_times(value):
+    if isinstance(value, list):
+        return [without_times(item) for item in value]
+    return {key: item for key, item in value.items() if key != "updated_at"}
+
+
+def test_category_summary(seeded_store):
+    summary = seeded_store.category_summary("men")
+
+    assert summary["total_reviews"] == 5 and summary["products"] == 2
+    assert summary["counts"] == {"positive": 2, "negative": 2, "neutral": 1}
+    assert summary["average_rating"] == 3.4
+    assert seeded_store.category_summary("women") is None
+
+
+def test_leaderboard_metrics(seeded_store):
+    top = seeded_store.leaderboard("men", metric="score")
+    assert [entry["product"]["id"] for entry in top] == ["sd-1002", "sd-1001"]
+    assert top[0]["score"] == pytest.approx(0.25) and top[0]["reviews"] == 2
+
+    worst = seeded_store.leaderboard("men", metric="negative_share", k=1)
+    assert [(entry["product"]["id"], entry["negative_share"]) for entry in worst] == [("sd-1002", 0.5)]
+    assert [e["product"]["id"] for e in seeded_store.leaderboard("men", metric="volume")] == ["sd-1001", "sd-1002"]
+    assert [e["product"]["id"] for e in seeded_store.leaderboard("men", order="bottom", k=1)] == ["sd-1001"]
+    assert [e["product"]["id"] for e in seeded_store.leaderboard("men", min_reviews=3)] == ["sd-1001"]
+
+
+def test_rollups_follow_new_reviews(seeded_store, make_review):
+    seeded_store.upsert_reviews({"id": "sd-1002"}, [make_review("Zip broke", "negative", -0.9, 1)])
+
+    assert seeded_store.category_summary("men")["counts"]["negative"] == 3
+    assert seeded_store.leaderboard("men", metric="volume")[0]["reviews"] == 3
+
+
+def test_reanalysis_replaces_a_reviews_contribution(seeded_store, make_review):
+    seeded_store.upsert_reviews({"id": "sd-1001"}, [
+        make_review("Okay shirt for the price", "positive", 0.4, 3, "Nov 01, 2025")
+    ])
+
+    assert seeded_store.category_summary("men")["counts"] == {"positive": 3, "negative": 2, "neutral": 0}
+
+
+def test_recategorized_products_move_between_rollups(seeded_store):
+    jeans = seeded_store.product("sd-1002")
+    seeded_store.upsert_products([dict(jeans, category="women")])
+
+    assert seeded_store.category_summary("men")["total_reviews"] == 3
+    assert seeded_store.category_summary("women")["total_reviews"] == 2
+    assert [e["product"]["id"] for e in seeded_store.leaderboard("women")] == ["sd-1002"]
+
+
+def test_incremental_rollups_match_a_rebuild(seeded_store, make_review):
+    seeded_store.upsert_reviews({"id": "sd-1003"}, [make_review("Lovely kurti", "positive", 0.7, 5)])
+
+    def views():
+        return [without_times(seeded_store.category_summary(category)) for category in ("men", "women")] + [
+            without_times(seeded_store.leaderboard(category)) for category in ("men", "women")
+        ]
+
+    incremental = views()
+    seeded_store.rebuild_rollups()
+    assert views() == incremental
@@ -0,0 +1,45 @@
+# backend/tests/test_review_search.py
+"""Full-text review search: query building and the FTS5 index"""
+import pytest
+
+from review_store import fts_query
+
+
+@pytest.fixture
+def store(seeded_store):
+    seeded_store._connection()
+    if not seeded_store.fts_available:
+        pytest.skip("SQLite without FTS5")
+    return seeded_store
+
+
+def test_fts_query_quotes_user_input():
+    assert fts_query("cotton fit") == '"cotton" "fit"'
+    assert fts_query('"perfect fit" col*') == '"perfect fit" "col"*'
+    # FTS5 operators and punctuation are plain words
+    assert fts_query("cotton OR -fit; DROP") == '"cotton" "OR" "fit" "DROP"'
+    assert fts_query("!!!") == ""
+
+
+def test_search_matches_words_phrases_and_prefixes(store):
+    assert {r["product_id"] for r in store.search_reviews(fts_query("cotton"))} == {"sd-1001", "sd-1002"}
+    assert [r["product_id"] for r in store.search_reviews(fts_query('"perfect fit"'))] == ["sd-1001"]
+    assert len(store.search_reviews(fts_query("fad*"))) == 1
+
+
+def test_search_filters_and_snippets(store):
+    negative = store.search_reviews(fts_query("cotton"), sentiment="negative")
+    assert [r["product_id"] for r in negative] == ["sd-1002"]
+    assert "**Cotton**" in negative[0]["snippet"]
+    assert store.search_reviews(fts_query("cotton"), category="women") == []
+    assert len(store.search_reviews(fts_query("cotton"), product_id="sd-1001")) == 1
+    assert len(store.search_reviews(fts_query("cotton"), limit=1, offset=1)) == 1
+
+
+def test_index_follows_text_updates_and_deletes(store):
+    store._execute("UPDATE reviews SET text = 'Stitching came loose' WHERE text LIKE 'Okay shirt%'")
+    assert store.search_reviews(fts_query("okay")) == []
+    assert len(store.search_reviews(fts_query("stitching"))) == 1
+
+    store._execute("DELETE FROM reviews WHERE product_id = 'sd-1002'")
+    assert [r["product_id"] for r in store.search_reviews(fts_query("cotton"))] == ["sd-1001"]
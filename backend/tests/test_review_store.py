@@ -0,0 +1,35 @@
+# backend/tests/test_review_store.py
+"""ReviewStore: products and reviews upserted under stable ids"""
+
+
+def test_products_by_category(seeded_store):
+    assert {product["id"] for product in seeded_store.products("men")} == {"sd-1001", "sd-1002"}
+    assert [row["category"] for row in seeded_store.categories()] == ["men", "women"]
+    assert seeded_store.product("sd-1003")["title"] == "Kurti"
+
+
+def test_reupserting_reviews_does_not_duplicate(seeded_store, make_review):
+    before = seeded_store.stats()
+    seeded_store.upsert_reviews({"id": "sd-1001"}, [make_review("Soft cotton fabric, perfect fit", "positive", 0.8, 5)])
+
+    assert seeded_store.stats() == before
+    assert before["reviews"] == 5 and before["analyzed_reviews"] == 5
+
+
+def test_raw_rescrape_keeps_existing_sentiment(seeded_store):
+    seeded_store.upsert_reviews({"id": "sd-1001"}, [
+        {"text": "Okay shirt for the price", "reviewer": "Asha", "date": "Nov 01, 2025"}
+    ])
+
+    reviews = {review["text"]: review for review in seeded_store.reviews("sd-1001")}
+    assert len(reviews) == 3
+    assert reviews["Okay shirt for the price"]["sentiment"]["sentiment"] == "neutral"
+    assert seeded_store.sentiment_counts("sd-1001") == {"positive": 1, "negative": 1, "neutral": 1}
+
+
+def test_record_analysis_keeps_the_run(seeded_store, make_review):
+    seeded_store.record_analysis("run-1", {"id": "sd-1003"}, [make_review("Lovely kurti", "positive", 0.7, 5)],
+                                 {"total_reviews": 1, "overall_sentiment": "positive"})
+
+    assert seeded_store.latest_analysis("sd-1003")["overall_sentiment"] == "positive"
+    assert seeded_store.stats()["analyses"] == 1
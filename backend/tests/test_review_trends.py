@@ -0,0 +1,67 @@
+# backend/tests/test_review_trends.py
+"""Review date parsing and the day/week/month sentiment series kept beside the rollups"""
+from review_dates import bucket_keys, parse_review_date, review_day
+
+
+def test_parse_review_date_formats():
+    assert parse_review_date("Sep 25, 2024") == "2024-09-25"
+    assert parse_review_date("on 12th Oct, 2025") == "2025-10-12"
+    assert parse_review_date("2025-01-31") == "2025-01-31"
+    assert parse_review_date("Unknown date") is None
+    assert parse_review_date(None) is None
+
+
+def test_review_day_falls_back_to_the_byline():
+    review = {"date": "Unknown date", "text": "Bought on Jan 01, 2025 for a trip. by Asha on Feb 03, 2025"}
+    assert review_day(review) == "2025-02-03"
+    assert review_day({"date": "Unknown date", "text": "No date here"}) is None
+
+
+def test_bucket_keys():
+    assert bucket_keys("2025-10-09") == {"day": "2025-10-09", "week": "2025-W41", "month": "2025-10"}
+    # ISO weeks belong to the year of their Thursday
+    assert bucket_keys("2024-12-30")["week"] == "2025-W01"
+
+
+def test_product_daily_trend(seeded_store):
+    series = seeded_store.trend("product", "sd-1001")
+
+    assert series["buckets"] == ["2025-10-02", "2025-10-09", "2025-11-01"]
+    assert series["negative"] == [0, 1, 0]
+    assert series["average_rating"] == [5.0, 2.0, 3.0]
+    assert series["average_polarity"] == [0.8, -0.6, 0.0]
+
+
+def test_category_monthly_trend(seeded_store):
+    series = seeded_store.trend("category", "men", granularity="month")
+
+    assert series["buckets"] == ["2025-10", "2025-11"]
+    assert series["positive"] == [2, 0]
+    assert series["negative"] == [2, 0]
+    assert series["neutral"] == [0, 1]
+
+
+def test_trend_window_is_half_open(seeded_store):
+    series = seeded_store.trend("category", "men", granularity="week", since="2025-10-06", until="2025-11-01")
+
+    assert series["buckets"] == ["2025-W41"]
+    assert seeded_store.trend("product", "sd-1001", since="2025-10-09", until="2025-11-01")["buckets"] == [
+        "2025-10-09"
+    ]
+
+
+def test_undated_reviews_count_in_summaries_but_not_trends(seeded_store, make_review):
+    seeded_store.upsert_reviews({"id": "sd-1003"}, [make_review("Lovely kurti", "positive", 0.7, 5, "Unknown date")])
+
+    assert seeded_store.category_summary("women")["total_reviews"] == 1
+    assert seeded_store.trend("category", "women")["buckets"] == []
+
+
+def test_reanalysis_moves_a_review_between_buckets(seeded_store, make_review):
+    seeded_store.upsert_reviews({"id": "sd-1001"}, [
+        make_review("Colour faded after the first wash", "neutral", 0.0, 2, "Oct 09, 2025")
+    ])
+
+    series = seeded_store.trend("product", "sd-1001")
+    assert series["negative"] == [0, 0, 0]
+    assert series["neutral"] == [0, 1, 1]
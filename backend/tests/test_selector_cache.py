@@ -0,0 +1,60 @@
+# backend/tests/test_selector_cache.py
+"""SelectorCache: learned selector order per site layout"""
+from selector_cache import SelectorCache, site_layout
+
+SELECTORS = [".user-review-text", ".reviewText", "p", ".review-description", "a"]
+
+
+def hit(cache, selector, times=1):
+    for _ in range(times):
+        cache.record("site:reviews", "text", selector, True, 0.001)
+
+
+def test_site_layout():
+    assert site_layout("https://www.snapdeal.com/product/x/1", "reviews") == "snapdeal.com:reviews"
+    assert site_layout(None, "listing") == "unknown:listing"
+
+
+def test_declared_order_without_history_with_generic_fallbacks_last():
+    assert SelectorCache().ordered("site:reviews", "text", SELECTORS) == [
+        ".user-review-text", ".reviewText", ".review-description", "p", "a"
+    ]
+
+
+def test_winner_moves_first_and_ties_keep_declared_order():
+    cache = SelectorCache()
+    hit(cache, ".review-description")
+
+    assert cache.ordered("site:reviews", "text", SELECTORS) == [
+        ".review-description", ".user-review-text", ".reviewText", "p", "a"
+    ]
+
+
+def test_generic_fallbacks_never_jump_ahead_of_specific_selectors():
+    cache = SelectorCache()
+    hit(cache, "a", times=5)
+    hit(cache, "p", times=5)
+
+    assert cache.ordered("site:reviews", "text", SELECTORS) == [
+        ".user-review-text", ".reviewText", ".review-description", "p", "a"
+    ]
+
+
+def test_misses_demote_an_old_winner():
+    cache = SelectorCache(decay=0.5)
+    hit(cache, ".reviewText")
+    for _ in range(3):
+        cache.record("site:reviews", "text", ".reviewText", False, 0.001)
+    hit(cache, ".review-description")
+
+    assert cache.ordered("site:reviews", "text", SELECTORS)[0] == ".review-description"
+
+
+def test_first_match_records_probes():
+    cache = SelectorCache()
+    found = {".reviewText": "great"}
+
+    assert cache.first_match("site:reviews", "text", SELECTORS, found.get) == (".reviewText", "great")
+    assert cache.first_match("site:reviews", "text", SELECTORS, lambda selector: None) == (None, None)
+    rows = {row["selector"]: row for row in cache.stats()}
+    assert rows[".user-review-text"]["misses"] == 2 and rows[".reviewText"]["hits"] == 1
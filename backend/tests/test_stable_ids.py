@@ -0,0 +1,53 @@
+# backend/tests/test_stable_ids.py
+"""Stable product and review ids, and that analysis and the review store agree on them"""
+import pipelines
+from review_analysis import analyze_reviews_comprehensive
+from review_store import ReviewStore
+from stable_ids import product_id_for, review_id_for, assign_review_ids, store_product_id
+
+URL = "https://www.snapdeal.com/product/mens-shirt/638123456789"
+
+
+def test_product_id_ignores_url_noise():
+    assert product_id_for(URL) == "sd-638123456789"
+    assert product_id_for(URL + "/reviews?page=2") == "sd-638123456789"
+    assert product_id_for("https://example.com/item/") == product_id_for("http://www.example.com/item")
+    assert product_id_for("https://example.com/item").startswith("p-")
+
+
+def test_review_id_is_normalized_and_salted_with_the_product():
+    review = {"reviewer": "Asha", "date": "Sep 25, 2024", "text": "Good  fit"}
+    same = {"reviewer": " asha ", "date": "sep 25, 2024", "text": "good fit"}
+
+    assert review_id_for(review, "sd-1") == review_id_for(same, "sd-1")
+    assert review_id_for(review, "sd-1") != review_id_for(review, "sd-2")
+    assert review_id_for("Good fit", "sd-1") == review_id_for({"text": "Good fit"}, "sd-1")
+
+
+def test_assign_review_ids_drops_duplicates_and_keeps_existing_ids():
+    reviews = [{"text": "Nice"}, {"text": "nice "}, {"id": "kept", "text": "Other"}, "plain"]
+
+    unique = assign_review_ids(reviews, "sd-1")
+
+    assert [review if isinstance(review, str) else review["id"] for review in unique] == [
+        review_id_for({"text": "Nice"}, "sd-1"), "kept", "plain"
+    ]
+
+
+def test_store_product_id_prefers_the_url():
+    assert store_product_id({"id": "1", "link": URL}) == "sd-638123456789"
+    assert store_product_id({"id": "1"}) == "1"
+
+
+def test_analysis_and_store_assign_the_same_ids(tmp_path):
+    store = ReviewStore(str(tmp_path / "store.db"))
+    product = {"id": "1", "title": "Shirt", "url": URL}
+    reviews = [{"reviewer": "Asha", "date": "Sep 25, 2024", "text": "Good fit"}, "Too tight"]
+    store_id = store_product_id(product)
+
+    store.upsert_reviews(product, reviews)
+    stored = {review["id"] for review in store.reviews(store_id)}
+
+    assert {review["id"] for review in pipelines.analyze_reviews(reviews, store_id)} == stored
+    comprehensive = analyze_reviews_comprehensive(reviews, store_id)
+    assert {review["id"] for review in comprehensive["analyzed_reviews"]} == stored
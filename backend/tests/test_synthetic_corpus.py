@@ -0,0 +1,56 @@
+# backend/tests/test_synthetic_corpus.py
+"""SyntheticCorpus: the same seed gives the same corpus, and any slice can be generated alone"""
+import io
+import json
+
+import pytest
+
+from stable_ids import review_id_for
+from synthetic_corpus import SyntheticCorpus, parse_mix, write_jsonl, batched
+
+
+def test_same_seed_same_corpus():
+    first = list(SyntheticCorpus(seed=7).products_with_reviews(5))
+    second = list(SyntheticCorpus(seed=7).products_with_reviews(5))
+
+    assert first == second
+    assert first != list(SyntheticCorpus(seed=8).products_with_reviews(5))
+
+
+def test_slices_match_the_full_run():
+    corpus = SyntheticCorpus(seed=3)
+    full = list(corpus.products_with_reviews(6))
+
+    assert list(corpus.products_with_reviews(3, offset=3)) == full[3:]
+    assert corpus.product(4) == dict(full[4], reviews=[])
+
+
+def test_review_rows_flatten_products_with_salted_ids():
+    corpus = SyntheticCorpus(seed=1, reviews_per_product=4)
+    products = list(corpus.products_with_reviews(3))
+    rows = list(corpus.review_rows(3))
+
+    assert len(rows) == sum(len(product["reviews"]) for product in products)
+    for row in rows:
+        review = {key: value for key, value in row.items() if key not in ("product_id", "category", "id")}
+        assert row["id"] == review_id_for(review, row["product_id"])
+
+
+def test_sentiment_mix_is_respected():
+    corpus = SyntheticCorpus(seed=5, sentiment_mix=parse_mix("positive=1,negative=0,neutral=0"))
+    assert {row["expected_sentiment"] for row in corpus.review_rows(10)} == {"positive"}
+
+
+def test_parse_mix_normalizes_and_rejects_unknown_labels():
+    assert parse_mix("positive=3,negative=1") == {"positive": 0.75, "negative": 0.25, "neutral": 0.0}
+    with pytest.raises(ValueError):
+        parse_mix("happy=1")
+    with pytest.raises(ValueError):
+        parse_mix("positive=0")
+
+
+def test_write_jsonl_and_batched():
+    out = io.StringIO()
+    assert write_jsonl(({"n": i} for i in range(3)), out) == 3
+    assert [json.loads(line)["n"] for line in out.getvalue().splitlines()] == [0, 1, 2]
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,134 @@
+# backend/tests/test_tracking.py
+"""Tracked items: incremental re-crawl merges, ownership and scheduling"""
+from datetime import datetime, timedelta
+
+import pytest
+
+import tracking
+from review_store import ReviewStore
+from tracking import TrackingStore, RecrawlScheduler, recrawl, normalize_target
+
+URL = "https://www.snapdeal.com/product/mens-shirt/638123456789"
+PRODUCT_ID = "sd-638123456789"
+
+
+def analyzed(review_id, sentiment, polarity=0.5, rating=4):
+    return {"id": review_id, "rating": rating, "sentiment": {"sentiment": sentiment, "polarity": polarity}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TrackingStore(str(tmp_path / "tracking.db"), jitter=0)
+
+
+def test_record_merges_only_new_reviews(store):
+    item = store.add("product", URL, "u1", 3600)
+
+    summary, added = store.record(item["id"], PRODUCT_ID, "Shirt", URL,
+                                  [analyzed("r1", "positive"), analyzed("r2", "negative", -0.5, 1)])
+    assert added.total == 2 and summary.counts["positive"] == 1
+
+    # r2 was analyzed in the first run; only r3 counts
+    summary, added = store.record(item["id"], PRODUCT_ID, "Shirt", URL,
+                                  [analyzed("r2", "negative", -0.5, 1), analyzed("r3", "positive")])
+    assert added.total == 1
+    assert summary.counts == {"positive": 2, "negative": 1, "neutral": 0}
+    assert store.known_review_ids(item["id"], PRODUCT_ID) == {"r1", "r2", "r3"}
+
+    tracked = store.get(item["id"], with_products=True)
+    assert tracked["summary"]["total_reviews"] == 3
+    assert tracked["summary"]["average_rating"] == 3.0
+    assert tracked["products"][0]["product_id"] == PRODUCT_ID
+
+
+def test_items_are_private_to_their_user(store):
+    item = store.add("product", URL, "u1", 3600)
+
+    assert store.get(item["id"], user_key="u2") is None
+    assert not store.remove(item["id"], user_key="u2")
+    assert [tracked["id"] for tracked in store.list(user_key="u1")] == [item["id"]]
+    assert store.list(user_key="u2") == []
+
+
+def test_remove_drops_reviews_and_summaries(store):
+    item = store.add("product", URL, "u1", 3600)
+    store.record(item["id"], PRODUCT_ID, "Shirt", URL, [analyzed("r1", "positive")])
+
+    assert store.remove(item["id"], user_key="u1")
+    assert store.get(item["id"]) is None
+    assert store.known_review_ids(item["id"], PRODUCT_ID) == set()
+
+
+def test_tracking_the_same_target_again_updates_it(store):
+    first = store.add("product", URL, "u1", 3600)
+    second = store.add("product", URL, "u1", 7200, max_products=5)
+
+    assert second["id"] == first["id"]
+    assert second["interval_hours"] == 2 and second["max_products"] == 5
+
+
+def test_off_peak_runs_land_in_the_window(tmp_path):
+    store = TrackingStore(str(tmp_path / "tracking.db"), jitter=0, off_peak="01:00-05:00")
+    now = datetime(2025, 10, 1, 12, 0)
+
+    run = store.next_run_time("item", 3600, now)
+
+    assert run.date() == now.date() + timedelta(days=1)
+    assert 1 <= run.hour < 5
+
+
+def test_scheduler_submits_due_items_once(store, tmp_path):
+    submitted = []
+
+    class Jobs:
+        def submit(self, kind, params, **kwargs):
+            submitted.append((kind, params, kwargs["coalesce_key"]))
+            return {"id": f"job-{len(submitted)}"}
+
+    item = store.add("product", URL, "u1", 3600)
+    scheduler = RecrawlScheduler(store, Jobs())
+    now = datetime.now() + timedelta(seconds=1)
+
+    assert scheduler.run_due(now) == ["job-1"]
+    assert scheduler.run_due(now) == []
+    assert submitted == [("recrawl", {"item_id": item["id"]}, f"recrawl:{item['id']}")]
+    assert store.get(item["id"])["last_job_id"] == "job-1"
+
+
+def test_recrawl_analyzes_only_unseen_reviews(store, tmp_path, monkeypatch):
+    pages = [
+        [{"id": "r3", "text": "Superb quality, love it"}],
+        [{"id": "r1", "text": "Good fit"}, {"id": "r2", "text": "Awful stitching"}],
+        [{"id": "r0", "text": "Never reached"}],
+    ]
+
+    def scrape(url, driver=None, on_page=None, should_stop=None, title=None):
+        reviews = []
+        for page, page_reviews in enumerate(pages, 1):
+            if should_stop():
+                break
+            reviews.extend(page_reviews)
+            on_page(page, page_reviews)
+        return reviews
+
+    class Driver:
+        def quit(self):
+            pass
+
+    monkeypatch.setattr(tracking, "scrape_product_reviews_selenium", scrape)
+    monkeypatch.setattr(tracking, "setup_driver", Driver)
+    monkeypatch.setattr(tracking, "review_store", ReviewStore(str(tmp_path / "store.db")))
+    item = store.add("product", URL, "u1", 3600, title="Shirt")
+    store.record(item["id"], PRODUCT_ID, "Shirt", URL,
+                 [analyzed("r1", "positive"), analyzed("r2", "negative", -0.5)])
+
+    result = recrawl(store, {"item_id": item["id"]})
+
+    assert result["new_reviews"] == 1
+    assert result["summary"]["total_reviews"] == 3
+    assert store.known_review_ids(item["id"], PRODUCT_ID) == {"r1", "r2", "r3"}
+
+
+def test_normalize_target():
+    assert normalize_target("category", " Men-Apparel-Shirts ") == "men-apparel-shirts"
+    assert normalize_target("product", URL + "/?utm=x#reviews") == URL
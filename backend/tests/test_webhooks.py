@@ -0,0 +1,93 @@
+# backend/tests/test_webhooks.py
+"""Webhooks: signatures, callback URL validation and the public-address check on delivery"""
+import http.server
+import socket
+import threading
+
+import pytest
+
+import webhooks
+from webhooks import WebhookSender, Delivery, sign_payload, verify_signature, validate_callback_url
+
+
+@pytest.fixture
+def local_server():
+    received = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(self.rfile.read(int(self.headers["Content-Length"])))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/hook", received
+    server.shutdown()
+
+
+def test_signature_round_trip():
+    signature = sign_payload("secret", "1700000000", b"{}")
+    assert verify_signature("secret", "1700000000", b"{}", signature, tolerance=10 ** 10)
+    assert not verify_signature("other", "1700000000", b"{}", signature, tolerance=10 ** 10)
+    assert not verify_signature("secret", "1700000000", b"{}", signature)  # too old
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://example.com/hook",
+    "http:///nohost",
+    "http://localhost/hook",
+    "http://127.0.0.1:8080/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://10.0.0.5/hook",
+    "http://[::1]/hook",
+    "http://0.0.0.0/hook",
+])
+def test_internal_callback_urls_are_rejected(url):
+    with pytest.raises(ValueError):
+        validate_callback_url(url)
+
+
+def test_allow_list_admits_only_listed_hosts():
+    validate_callback_url("http://hooks.internal/x", {"hooks.internal"})
+    with pytest.raises(ValueError):
+        validate_callback_url("http://93.184.216.34/x", {"hooks.internal"})
+
+
+def test_https_resolves_port_443(monkeypatch):
+    ports = []
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        ports.append(port)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("93.184.216.34", port))]
+
+    monkeypatch.setattr(webhooks.socket, "getaddrinfo", getaddrinfo)
+    validate_callback_url("https://example.com/hook")
+    validate_callback_url("http://example.com/hook")
+    validate_callback_url("https://example.com:8443/hook")
+    assert ports == [443, 80, 8443]
+
+
+def test_delivery_refuses_a_name_that_rebinds_to_an_internal_address(monkeypatch, local_server):
+    url, received = local_server
+    # The name passed validation, then resolved to loopback at connect time
+    monkeypatch.setattr(webhooks, "validate_callback_url", lambda url, allowed_hosts=None: None)
+    sender = WebhookSender("secret", max_attempts=3)
+
+    sender._deliver(Delivery(url, "job.finished", b"{}"))
+
+    assert received == []
+    assert sender.failed == 1 and not sender._pending
+
+
+def test_allow_listed_internal_host_is_delivered(local_server):
+    url, received = local_server
+    sender = WebhookSender("secret", allowed_hosts={"127.0.0.1"})
+
+    sender._deliver(Delivery(url, "job.finished", b'{"ok": true}'))
+
+    assert received == [b'{"ok": true}']
+    assert sender.delivered == 1
@@ -0,0 +1,422 @@
+# backend/tracking.py
+"""Scheduled re-crawl of tracked products and categories.
+
+Users register a product URL or a category with a refresh interval. A
+scheduler thread submits due items as low-priority "recrawl" jobs, a few per
+tick, with jitter and (optionally) shifted into an off-peak window so
+refreshes do not arrive in bursts. A re-crawl analyzes only reviews it has
+not seen before and merges them into the stored per-product SentimentSummary.
+"""
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from jobs import QueueFull, PRIORITY_LOW
+from pipelines import DetachedJob, PipelineError, analyze_reviews
+from review_store import review_store
+from scrape_products import setup_driver, scrape_product_reviews_selenium, scrape_snapdeal_products, polite_sleep
+from sentiment_summary import SentimentSummary
+from stable_ids import product_id_for
+
+QUEUE_FULL_RETRY = timedelta(minutes=5)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked_items (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL,
+    title TEXT,
+    user_key TEXT,
+    interval_seconds REAL NOT NULL,
+    max_products INTEGER NOT NULL DEFAULT 10,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    next_run_at TEXT NOT NULL,
+    last_run_at TEXT,
+    last_job_id TEXT,
+    last_result TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tracked_due ON tracked_items (enabled, next_run_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tracked_user_target ON tracked_items (user_key, kind, target);
+CREATE TABLE IF NOT EXISTS tracked_reviews (
+    item_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    PRIMARY KEY (item_id, product_id, review_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tracked_summaries (
+    item_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    title TEXT,
+    url TEXT,
+    summary TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (item_id, product_id)
+);
+"""
+
+
+def parse_window(spec):
+    """"01:00-06:00" -> (start_minute, length_minutes); None if empty"""
+    if not spec:
+        return None
+    start, end = spec.split("-")
+    to_minutes = lambda hhmm: int(hhmm.split(":")[0]) * 60 + int(hhmm.split(":")[1])
+    start_minute, end_minute = to_minutes(start.strip()), to_minutes(end.strip())
+    length = (end_minute - start_minute) % (24 * 60) or 24 * 60
+    return start_minute, length
+
+
+def _stable_fraction(value):
+    return int(hashlib.sha1(value.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+
+class TrackingStore:
+    """Tracked items, the review IDs already analyzed for them and their merged summaries"""
+
+    def __init__(self, db_path, jitter=0.1, off_peak=None):
+        self.db_path = db_path
+        self.jitter = jitter
+        self.off_peak = parse_window(off_peak)
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, sql, args=()):
+        return self._connection().execute(sql, args)
+
+    def next_run_time(self, item_id, interval_seconds, now=None):
+        """now + interval ± jitter, moved into the off-peak window at a per-item offset"""
+        now = now or datetime.now()
+        jitter = interval_seconds * self.jitter * random.uniform(-1, 1)
+        target = now + timedelta(seconds=interval_seconds + jitter)
+        if not self.off_peak:
+            return target
+
+        start_minute, length = self.off_peak
+        # Each item gets a fixed slot inside the window so refreshes spread out evenly
+        offset = timedelta(minutes=length * _stable_fraction(item_id))
+        for days in range(-1, 3):
+            day = (target + timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+            window_start = day + timedelta(minutes=start_minute)
+            window_end = window_start + timedelta(minutes=length)
+            if window_start <= target < window_end:
+                return target
+            if window_start > target:
+                return window_start + offset
+        return target
+
+    def add(self, kind, target, user_key, interval_seconds, title=None, max_products=10):
+        item_id = uuid.uuid4().hex
+        now = datetime.now()
+        # The first crawl runs at the next scheduler tick, or in the off-peak window
+        first_run = self.next_run_time(item_id, 0, now) if self.off_peak else now
+        self._execute(
+            "INSERT INTO tracked_items (id, kind, target, title, user_key, interval_seconds, max_products, "
+            "next_run_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (user_key, kind, target) DO UPDATE SET interval_seconds = excluded.interval_seconds, "
+            "title = COALESCE(excluded.title, title), max_products = excluded.max_products, enabled = 1",
+            (item_id, kind, target, title, user_key, interval_seconds, max_products,
+             first_run.isoformat(), now.isoformat())
+        )
+        row = self._execute(
+            "SELECT * FROM tracked_items WHERE user_key IS ? AND kind = ? AND target = ?", (user_key, kind, target)
+        ).fetchone()
+        return self._to_dict(row)
+
+    def get(self, item_id, with_products=False, user_key=None):
+        """A tracked item with its summary; with user_key set, only if that user tracks it"""
+        if user_key is None:
+            row = self._execute("SELECT * FROM tracked_items WHERE id = ?", (item_id,)).fetchone()
+        else:
+            row = self._execute(
+                "SELECT * FROM tracked_items WHERE id = ? AND user_key IS ?", (item_id, user_key)
+            ).fetchone()
+        if row is None:
+            return None
+        item = self._to_dict(row)
+        products = self.product_summaries(item_id)
+        overall = SentimentSummary()
+        for product in products:
+            overall.merge(SentimentSummary.from_dict(product["summary"]))
+        item["summary"] = overall.to_dict()
+        if with_products:
+            item["products"] = products
+        return item
+
+    def list(self, user_key=None):
+        if user_key is None:
+            rows = self._execute("SELECT id FROM tracked_items ORDER BY created_at").fetchall()
+        else:
+            rows = self._execute(
+                "SELECT id FROM tracked_items WHERE user_key IS ? ORDER BY created_at", (user_key,)
+            ).fetchall()
+        return [self.get(row["id"]) for row in rows]
+
+    def remove(self, item_id, user_key=None):
+        """Stop tracking an item; with user_key set, only if that user tracks it"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if user_key is None:
+                deleted = conn.execute("DELETE FROM tracked_items WHERE id = ?", (item_id,)).rowcount
+            else:
+                deleted = conn.execute(
+                    "DELETE FROM tracked_items WHERE id = ? AND user_key IS ?", (item_id, user_key)
+                ).rowcount
+            if not deleted:
+                conn.execute("COMMIT")
+                return False
+            conn.execute("DELETE FROM tracked_reviews WHERE item_id = ?", (item_id,))
+            conn.execute("DELETE FROM tracked_summaries WHERE item_id = ?", (item_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted > 0
+
+    def due(self, now=None, limit=5):
+        now = now or datetime.now()
+        return self._execute(
+            "SELECT * FROM tracked_items WHERE enabled = 1 AND next_run_at <= ? ORDER BY next_run_at LIMIT ?",
+            (now.isoformat(), limit)
+        ).fetchall()
+
+    def claim(self, row, next_run_at):
+        """Advance a due item's schedule; False if another process already took it"""
+        return self._execute(
+            "UPDATE tracked_items SET next_run_at = ? WHERE id = ? AND next_run_at = ?",
+            (next_run_at.isoformat(), row["id"], row["next_run_at"])
+        ).rowcount == 1
+
+    def reschedule(self, item_id, next_run_at):
+        self._execute(
+            "UPDATE tracked_items SET next_run_at = ? WHERE id = ?", (next_run_at.isoformat(), item_id)
+        )
+
+    def set_last_job(self, item_id, job_id):
+        self._execute("UPDATE tracked_items SET last_job_id = ? WHERE id = ?", (job_id, item_id))
+
+    def finish_run(self, item_id, result):
+        self._execute(
+            "UPDATE tracked_items SET last_run_at = ?, last_result = ? WHERE id = ?",
+            (datetime.now().isoformat(), json.dumps(result), item_id)
+        )
+
+    def known_review_ids(self, item_id, product_id):
+        rows = self._execute(
+            "SELECT review_id FROM tracked_reviews WHERE item_id = ? AND product_id = ?", (item_id, product_id)
+        ).fetchall()
+        return {row["review_id"] for row in rows}
+
+    def record(self, item_id, product_id, title, url, analyzed_reviews):
+        """Merge newly analyzed reviews into the product's summary and remember their IDs"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT summary FROM tracked_summaries WHERE item_id = ? AND product_id = ?", (item_id, product_id)
+            ).fetchone()
+            summary = SentimentSummary.from_dict(json.loads(row["summary"]) if row else None)
+            added = SentimentSummary()
+            for review in analyzed_reviews:
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO tracked_reviews (item_id, product_id, review_id) VALUES (?, ?, ?)",
+                    (item_id, product_id, review["id"])
+                ).rowcount
+                if inserted:
+                    added.add_review(review)
+            summary.merge(added)
+            conn.execute(
+                "INSERT INTO tracked_summaries (item_id, product_id, title, url, summary, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (item_id, product_id) DO UPDATE SET "
+                "title = excluded.title, url = excluded.url, summary = excluded.summary, "
+                "updated_at = excluded.updated_at",
+                (item_id, product_id, title, url, json.dumps(summary.to_dict()), datetime.now().isoformat())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return summary, added
+
+    def product_summaries(self, item_id):
+        rows = self._execute(
+            "SELECT * FROM tracked_summaries WHERE item_id = ? ORDER BY product_id", (item_id,)
+        ).fetchall()
+        return [
+            {
+                "product_id": row["product_id"],
+                "title": row["title"],
+                "url": row["url"],
+                "summary": json.loads(row["summary"]),
+                "updated_at": row["updated_at"]
+            }
+            for row in rows
+        ]
+
+    def _to_dict(self, row):
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "target": row["target"],
+            "title": row["title"],
+            "interval_hours": round(row["interval_seconds"] / 3600, 2),
+            "max_products": row["max_products"],
+            "enabled": bool(row["enabled"]),
+            "next_run_at": row["next_run_at"],
+            "last_run_at": row["last_run_at"],
+            "last_job_id": row["last_job_id"],
+            "last_result": json.loads(row["last_result"]) if row["last_result"] else None,
+            "created_at": row["created_at"]
+        }
+
+
+class RecrawlScheduler:
+    """Submits due tracked items as low-priority recrawl jobs, a small batch per tick"""
+
+    def __init__(self, store, job_manager, tick_seconds=60, batch_size=5):
+        self.store = store
+        self.job_manager = job_manager
+        self.tick_seconds = tick_seconds
+        self.batch_size = batch_size
+        self._start_lock = threading.Lock()
+        self._started_pid = None
+
+    def start(self):
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self.store._local = threading.local()
+            threading.Thread(target=self._loop, name="recrawl-scheduler", daemon=True).start()
+            self._started_pid = os.getpid()
+            print(f"⏰ Re-crawl scheduler running every {self.tick_seconds}s")
+
+    def _loop(self):
+        stop = threading.Event()
+        while not stop.wait(self.tick_seconds):
+            try:
+                self.run_due()
+            except Exception as e:
+                print(f"⚠️  Re-crawl scheduler tick failed: {e}")
+
+    def run_due(self, now=None):
+        """Submit up to batch_size due items; returns the submitted job ids"""
+        now = now or datetime.now()
+        submitted = []
+        for row in self.store.due(now, self.batch_size):
+            next_run = self.store.next_run_time(row["id"], row["interval_seconds"], now)
+            if not self.store.claim(row, next_run):
+                continue
+            try:
+                job = self.submit(row["id"], priority=PRIORITY_LOW, user_key="scheduler")
+            except QueueFull:
+                # Leave it for a later tick rather than skipping a whole interval
+                self.store.reschedule(row["id"], now + QUEUE_FULL_RETRY)
+                print(f"⚠️  Queue full, re-crawl of {row['target']} retried later")
+                break
+            submitted.append(job["id"])
+        if submitted:
+            print(f"⏰ Submitted {len(submitted)} scheduled re-crawl(s)")
+        return submitted
+
+    def submit(self, item_id, priority=PRIORITY_LOW, user_key="scheduler"):
+        job = self.job_manager.submit(
+            "recrawl", {"item_id": item_id}, user_key=user_key,
+            coalesce_key=f"recrawl:{item_id}", priority=priority
+        )
+        self.store.set_last_job(item_id, job["id"])
+        return job
+
+
+def recrawl(store, data, job=DetachedJob()):
+    """Re-scrape a tracked item and analyze only reviews not seen in earlier runs"""
+    item = store.get(data.get("item_id"))
+    if not item or not item["enabled"]:
+        raise PipelineError("Tracked item not found", status=404)
+
+    if item["kind"] == "category":
+        job.progress(stage="listing", category=item["target"])
+        products = scrape_snapdeal_products(item["target"], item["max_products"], should_stop=job.should_stop)
+        review_store.upsert_products(products, category=item["target"])
+        targets = [
+            (product.get("id") or product_id_for(product["link"]), product.get("title"), product["link"])
+            for product in products if product.get("link")
+        ]
+    else:
+        targets = [(product_id_for(item["target"]), item["title"], item["target"])]
+
+    job.check_cancelled()
+    print(f"🔁 Re-crawling {item['kind']} {item['target']}: {len(targets)} product(s)")
+    job.progress(stage="reviews", products_total=len(targets), products_done=0, new_reviews=0)
+
+    driver = setup_driver()
+    new_reviews = 0
+    try:
+        for idx, (product_id, title, url) in enumerate(targets, 1):
+            job.check_cancelled()
+            known = store.known_review_ids(item["id"], product_id)
+            reached_known = {"page": None}
+
+            def on_page(page, page_reviews):
+                # Reviews are listed newest first, so a page of known reviews means we are caught up
+                if known and all(review["id"] in known for review in page_reviews):
+                    reached_known["page"] = page
+
+            reviews = scrape_product_reviews_selenium(
+                url, driver=driver, on_page=on_page,
+                should_stop=lambda: reached_known["page"] is not None or job.should_stop(), title=title
+            )
+            fresh = [review for review in reviews if review.get("id") not in known]
+            analyzed = analyze_reviews(fresh, product_id)
+            review_store.upsert_reviews({"id": product_id, "title": title, "url": url}, reviews + analyzed)
+            summary, added = store.record(item["id"], product_id, title, url, analyzed)
+            new_reviews += added.total
+
+            print(f"  [{idx}/{len(targets)}] {(title or url)[:50]}: {added.total} new of {len(reviews)} scraped")
+            job.emit("product", index=idx, total=len(targets), product_id=product_id,
+                     new_reviews=added.total, summary=summary.to_dict())
+            job.progress(products_done=idx, new_reviews=new_reviews)
+
+            if idx < len(targets):
+                polite_sleep(2)
+    finally:
+        driver.quit()
+
+    tracked = store.get(item["id"])
+    result = {
+        "success": True,
+        "item_id": item["id"],
+        "products": len(targets),
+        "new_reviews": new_reviews,
+        "summary": tracked["summary"],
+        "message": f"Re-crawled {len(targets)} products, {new_reviews} new reviews analyzed"
+    }
+    store.finish_run(item["id"], {key: result[key] for key in ("products", "new_reviews")})
+    return result
+
+
+def normalize_target(kind, target):
+    """Canonical target so the same product or category is tracked once per user"""
+    if kind == "category":
+        return target.strip().lower()
+    return target.strip().split("#")[0].split("?")[0].rstrip("/")
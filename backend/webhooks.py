@@ -0,0 +1,261 @@
+# backend/webhooks.py
+"""Signed webhook deliveries for finished jobs.
+
+Deliveries go through a bounded in-memory queue drained by a few sender
+threads, so a slow or dead endpoint never blocks a job worker. Failed
+deliveries are retried with exponential backoff and jitter. A 429/503
+Retry-After is honoured. Other 4xx answers are not retried.
+
+Each request carries:
+    X-SentimentPulse-Event       job.finished
+    X-SentimentPulse-Delivery    unique delivery id (same across retries)
+    X-SentimentPulse-Timestamp   unix seconds when the attempt was signed
+    X-SentimentPulse-Signature   sha256=HMAC_SHA256(SECRET_KEY, "<timestamp>." + body)
+
+Callback hosts that resolve to loopback, link-local, private or otherwise
+non-public addresses are refused unless they are allow-listed. They are
+checked again before every attempt, and the address each connection actually
+reaches is checked too, so a name that re-resolves to an internal address
+between the check and the request (DNS rebinding) is still refused. Redirects
+are not followed, and proxy settings from the environment are ignored.
+"""
+import hashlib
+import heapq
+import hmac
+import ipaddress
+import itertools
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+SIGNATURE_HEADER = "X-SentimentPulse-Signature"
+TIMESTAMP_HEADER = "X-SentimentPulse-Timestamp"
+
+
+def sign_payload(secret, timestamp, body):
+    """Signature header value for a raw request body"""
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret, timestamp, body, signature, tolerance=300):
+    """Check a received webhook: valid signature and a timestamp within `tolerance` seconds"""
+    try:
+        if abs(time.time() - int(timestamp)) > tolerance:
+            return False
+    except (TypeError, ValueError):
+        return False
+    return hmac.compare_digest(sign_payload(secret, timestamp, body), signature or "")
+
+
+def is_public_address(address):
+    # Drop an IPv6 zone ("fe80::1%eth0") before parsing
+    return ipaddress.ip_address(address.split("%", 1)[0]).is_global
+
+
+class BlockedAddress(ValueError):
+    """A callback connection reached a non-public address"""
+
+
+class _PublicPeerConnection:
+    """Refuses a connection whose peer is not a public address, after DNS resolution and connect"""
+
+    def _new_conn(self):
+        sock = super()._new_conn()
+        address = sock.getpeername()[0]
+        if not is_public_address(address):
+            sock.close()
+            raise BlockedAddress(f"callback_url host {self.host} connected to non-public address {address}")
+        return sock
+
+
+class _PublicHTTPConnection(_PublicPeerConnection, HTTPConnection):
+    pass
+
+
+class _PublicHTTPSConnection(_PublicPeerConnection, HTTPSConnection):
+    pass
+
+
+class _PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PublicHTTPConnection
+
+
+class _PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PublicHTTPSConnection
+
+
+class PublicOnlyAdapter(HTTPAdapter):
+    """Transport adapter that only talks to public addresses"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _PublicHTTPConnectionPool,
+            "https": _PublicHTTPSConnectionPool
+        }
+
+
+def validate_callback_url(url, allowed_hosts=None):
+    """Raise ValueError unless url is an http(s) URL on an allowed host. Without an allow-list
+    any host is accepted whose addresses are all public; an allow-listed host may be internal"""
+    parsed = urlparse(url or "")
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    host = parsed.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise ValueError(f"callback_url host {parsed.hostname} is not allowed")
+        return
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ValueError(f"callback_url host {parsed.hostname} does not resolve")
+    for address in addresses:
+        if not is_public_address(address):
+            raise ValueError(f"callback_url host {parsed.hostname} is not a public address")
+
+
+class Delivery:
+    def __init__(self, url, event, body):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.event = event
+        self.body = body
+        self.attempts = 0
+
+
+class WebhookSender:
+    """Bounded, retrying, non-blocking webhook delivery"""
+
+    def __init__(self, secret, max_pending=1000, threads=2, max_attempts=6, backoff=2.0, max_backoff=300,
+                 timeout=10, allowed_hosts=None):
+        self.secret = secret
+        self.allowed_hosts = allowed_hosts
+        self.max_pending = max_pending
+        self.threads = threads
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._pending = []  # heap of (due, seq, delivery)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._started_pid = None
+        self._local = threading.local()
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def send(self, url, payload, event="job.finished"):
+        """Queue a delivery without blocking; False if the queue is full and it was dropped"""
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                print(f"⚠️  Webhook queue full, dropped {event} for {url}")
+                return False
+            heapq.heappush(self._pending, (time.monotonic(), next(self._seq), Delivery(url, event, body)))
+            self._cond.notify()
+        self._start()
+        return True
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "delivered": self.delivered,
+                "failed": self.failed,
+                "dropped": self.dropped
+            }
+
+    def _start(self):
+        if self._started_pid == os.getpid():
+            return
+        with self._cond:
+            if self._started_pid == os.getpid():
+                return
+            for i in range(self.threads):
+                threading.Thread(target=self._loop, name=f"webhook-sender-{i}", daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending or self._pending[0][0] > time.monotonic():
+                    self._cond.wait(self._pending[0][0] - time.monotonic() if self._pending else None)
+                _, _, delivery = heapq.heappop(self._pending)
+            self._deliver(delivery)
+
+    def _session(self):
+        """This sender thread's HTTP session; without an allow-list it only connects to public addresses"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.trust_env = False
+            if not self.allowed_hosts:
+                session.mount("http://", PublicOnlyAdapter())
+                session.mount("https://", PublicOnlyAdapter())
+        return session
+
+    def _deliver(self, delivery):
+        delivery.attempts += 1
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "SentimentPulse-Webhooks/1.0",
+            "X-SentimentPulse-Event": delivery.event,
+            "X-SentimentPulse-Delivery": delivery.id,
+            TIMESTAMP_HEADER: timestamp,
+            SIGNATURE_HEADER: sign_payload(self.secret, timestamp, delivery.body)
+        }
+        retry_after = None
+        try:
+            # The host may resolve differently than when the callback was accepted
+            validate_callback_url(delivery.url, self.allowed_hosts)
+        except ValueError as e:
+            return self._give_up(delivery, str(e))
+        try:
+            response = self._session().post(delivery.url, data=delivery.body, headers=headers,
+                                            timeout=self.timeout, allow_redirects=False)
+            if 200 <= response.status_code < 300:
+                with self._cond:
+                    self.delivered += 1
+                print(f"📬 Webhook {delivery.event} delivered to {delivery.url}")
+                return
+            problem = f"HTTP {response.status_code}"
+            if response.status_code in (429, 503):
+                retry_after = response.headers.get("Retry-After")
+            elif 400 <= response.status_code < 500 and response.status_code != 408:
+                return self._give_up(delivery, problem)
+        except BlockedAddress as e:
+            return self._give_up(delivery, str(e))
+        except requests.RequestException as e:
+            problem = str(e)
+
+        if delivery.attempts >= self.max_attempts:
+            return self._give_up(delivery, problem)
+        delay = min(self.max_backoff, self.backoff * 2 ** (delivery.attempts - 1)) * random.uniform(0.5, 1.0)
+        if retry_after and retry_after.isdigit():
+            delay = min(self.max_backoff, max(delay, int(retry_after)))
+        print(f"🔁 Webhook to {delivery.url} failed ({problem}), retry {delivery.attempts} in {delay:.0f}s")
+        with self._cond:
+            heapq.heappush(self._pending, (time.monotonic() + delay, next(self._seq), delivery))
+            self._cond.notify()
+
+    def _give_up(self, delivery, problem):
+        with self._cond:
+            self.failed += 1
+        print(f"❌ Webhook to {delivery.url} failed after {delivery.attempts} attempt(s): {problem}")
@@ -0,0 +1,286 @@
+# backend/worker.py
+"""Standalone job worker for scrape and analysis jobs.
+
+Runs queued jobs outside the Flask process so browser and model capacity can
+be added per machine:
+
+    python worker.py --capabilities browser --slots 2
+    python worker.py --server http://api-host:5000 --token $WORKER_TOKEN --capabilities browser,model
+
+Without --server the worker claims straight from the SQLite job store
+(JOBS_DB_PATH), which suits extra processes on the API host. With --server it
+claims over the API's /api/workers endpoints, so it can run on any host that
+reaches the API. Progress, events and results go back with its heartbeats. A
+worker that stops heartbeating loses its lease, and the job is retried
+elsewhere. Re-crawls update the tracking store, so they only run on local
+workers.
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+
+import requests
+
+from jobs import (
+    JobManager, JobCancelled, execute_job, ALL_CAPABILITIES, HEARTBEAT_INTERVAL,
+    PROGRESS_FLUSH_INTERVAL, heartbeat_interval
+)
+from job_queue import make_queue
+from pipelines import PIPELINES, JOB_REQUIREMENTS
+from webhooks import WebhookSender
+
+# Seconds a remote claim waits on the server for a job before asking again
+CLAIM_WAIT = 20
+RETRY_DELAY = 5
+FINISH_ATTEMPTS = 5
+
+
+class WorkerClient:
+    """HTTP calls a remote worker makes to the API's /api/workers endpoints"""
+
+    def __init__(self, server, token, worker_id, capabilities, kinds, slots):
+        self.server = server.rstrip("/")
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.worker_id = worker_id
+        self.capabilities = capabilities
+        self.kinds = kinds
+        self.slots = slots
+
+    def _post(self, path, body, timeout=30):
+        return requests.post(f"{self.server}/api/workers{path}", json=body, headers=self.headers, timeout=timeout)
+
+    def claim(self, wait=CLAIM_WAIT):
+        """Lease the next runnable job, or None if none turned up within `wait` seconds"""
+        response = self._post("/claim", {
+            "worker_id": self.worker_id,
+            "capabilities": list(self.capabilities),
+            "kinds": self.kinds,
+            "slots": self.slots,
+            "wait": wait
+        }, timeout=wait + 30)
+        response.raise_for_status()
+        return response.json().get("job")
+
+    def heartbeat(self, job_id, progress=None, events=None):
+        """Renew the lease and deliver buffered progress and events.
+        Returns the pending cancellation reason ("" if none), or None if the lease was lost"""
+        response = self._post(f"/jobs/{job_id}/heartbeat", {
+            "worker_id": self.worker_id, "progress": progress, "events": events or []
+        })
+        if response.status_code == 409:
+            return None
+        response.raise_for_status()
+        return response.json().get("cancel_requested") or ""
+
+    def finish(self, job_id, status, result, status_code, error=None):
+        """Report the outcome; False if the job was re-queued or cancelled meanwhile"""
+        response = self._post(f"/jobs/{job_id}/finish", {
+            "worker_id": self.worker_id, "status": status, "result": result,
+            "status_code": status_code, "error": error
+        })
+        if response.status_code == 409:
+            return False
+        response.raise_for_status()
+        return True
+
+
+class RemoteJob:
+    """Job handle for a job claimed over HTTP. Progress and events are buffered and sent
+    in batches with heartbeats, which also renew the lease and bring back cancellation"""
+
+    def __init__(self, client, job):
+        self.id = job["id"]
+        self.kind = job["kind"]
+        self.params = job["params"]
+        self.lost = False
+        self._client = client
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events = []
+        self._progress = {}
+        self._dirty = False
+        self._cancel_reason = job.get("cancel_requested") or None
+        self._deadline = time.monotonic() + job["timeout"] if job.get("timeout") else None
+        # Servers that don't report their lease get the default interval
+        self._interval = heartbeat_interval(job["lease_seconds"]) if job.get("lease_seconds") else HEARTBEAT_INTERVAL
+        self._wake = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat_loop, name=f"heartbeat-{self.id}", daemon=True)
+        self._thread.start()
+
+    def cancel(self, reason):
+        self._cancel_reason = self._cancel_reason or reason
+
+    def should_stop(self):
+        if self._cancel_reason:
+            return True
+        if self._deadline and time.monotonic() > self._deadline:
+            self._cancel_reason = "deadline exceeded"
+            return True
+        return False
+
+    def check_cancelled(self):
+        if self.should_stop():
+            status = 504 if self._cancel_reason == "deadline exceeded" else 499
+            raise JobCancelled(self._cancel_reason, status)
+
+    def progress(self, **fields):
+        with self._lock:
+            self._progress.update(fields)
+            self._dirty = True
+        self._wake.set()
+
+    def emit(self, event, **data):
+        with self._lock:
+            self._events.append({"event": event, "data": data})
+        self._wake.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                progress = dict(self._progress) if self._dirty else None
+                if self._dirty:
+                    events.append({"event": "progress", "data": progress})
+                    self._dirty = False
+            cancel_reason = self._client.heartbeat(self.id, progress, events)
+        if cancel_reason is None:
+            self.lost = True
+            self.cancel("lease lost")
+        elif cancel_reason:
+            self.cancel(cancel_reason)
+
+    def close(self):
+        self._done.set()
+        self._wake.set()
+        self._thread.join()
+
+    def _heartbeat_loop(self):
+        while not self._done.is_set():
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            if self._done.is_set():
+                return
+            # Let a burst of events collect into one request
+            time.sleep(PROGRESS_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except requests.RequestException as e:
+                print(f"⚠️  Heartbeat for job {self.id} failed: {e}")
+
+
+class RemoteWorker:
+    """Runs `slots` jobs at a time, claimed from a remote API"""
+
+    def __init__(self, client, handlers):
+        self.client = client
+        self.handlers = handlers
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self._slot, name=f"remote-worker-{i}", daemon=True)
+            for i in range(self.client.slots)
+        ]
+        for thread in threads:
+            thread.start()
+        print(f"🧵 Remote worker {self.client.worker_id} serving {self.client.server} "
+              f"({', '.join(self.client.kinds)}) with {len(threads)} slots")
+        for thread in threads:
+            thread.join()
+
+    def _slot(self):
+        while True:
+            try:
+                job = self.client.claim()
+            except requests.RequestException as e:
+                print(f"⚠️  Claim failed: {e}")
+                time.sleep(RETRY_DELAY)
+                continue
+            if job:
+                self._run(job)
+
+    def _run(self, job):
+        handle = RemoteJob(self.client, job)
+        print(f"▶️  Job {handle.id} ({handle.kind}) started")
+        try:
+            status, body, status_code, error = execute_job(self.handlers.get(handle.kind), handle)
+        finally:
+            handle.close()
+        for attempt in range(FINISH_ATTEMPTS):
+            try:
+                if not self.client.finish(handle.id, status, body, status_code, error):
+                    print(f"⚠️  Job {handle.id} ({handle.kind}) lost its lease; {status} result discarded")
+                return
+            except requests.RequestException as e:
+                print(f"⚠️  Reporting job {handle.id} failed (attempt {attempt + 1}): {e}")
+                time.sleep(RETRY_DELAY)
+        print(f"❌ Gave up reporting job {handle.id}; it will be retried once its lease runs out")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run SentimentPulse scrape/analysis jobs")
+    parser.add_argument("--capabilities", default=os.environ.get("WORKER_CAPABILITIES") or ",".join(ALL_CAPABILITIES),
+                        help="comma-separated capabilities this worker offers: browser, model")
+    parser.add_argument("--slots", type=int, default=int(os.environ.get("WORKER_SLOTS") or 1),
+                        help="jobs run at the same time")
+    parser.add_argument("--server", default=os.environ.get("WORKER_SERVER"),
+                        help="API base URL; claim jobs over HTTP instead of from the local job store")
+    parser.add_argument("--token", default=os.environ.get("WORKER_TOKEN"), help="WORKER_TOKEN of the API")
+    parser.add_argument("--db", default=os.environ.get("JOBS_DB_PATH") or "data/jobs.db",
+                        help="job store for local workers")
+    args = parser.parse_args()
+
+    capabilities = [c.strip() for c in args.capabilities.split(",") if c.strip()]
+    handlers = {kind: pipeline for kind, (_, pipeline, _) in PIPELINES.items()}
+
+    if args.server:
+        if not args.token:
+            parser.error("--token (or WORKER_TOKEN) is required with --server")
+        kinds = sorted(kind for kind in handlers if set(JOB_REQUIREMENTS[kind]) <= set(capabilities))
+        if not kinds:
+            parser.error(f"No job kinds can run with capabilities: {', '.join(capabilities) or 'none'}")
+        client = WorkerClient(
+            args.server, args.token, f"{socket.gethostname()}:{os.getpid()}", capabilities, kinds, args.slots
+        )
+        RemoteWorker(client, handlers).run()
+        return
+
+    from tracking import TrackingStore, recrawl
+
+    manager = JobManager(
+        args.db, args.slots,
+        default_timeout=float(os.environ.get("JOBS_DEFAULT_TIMEOUT") or 1800),
+        max_running=int(os.environ.get("JOBS_MAX_RUNNING") or 0),
+        max_running_per_user=int(os.environ.get("JOBS_MAX_RUNNING_PER_USER") or 1),
+        capabilities=capabilities,
+        queue=make_queue(os.environ.get("JOBS_QUEUE_URL")),
+        lease_seconds=float(os.environ.get("JOBS_LEASE_SECONDS") or 60),
+        max_attempts=int(os.environ.get("JOBS_MAX_ATTEMPTS") or 3),
+        webhooks=WebhookSender(
+            os.environ.get("SECRET_KEY") or "dev-secret-key",
+            max_pending=int(os.environ.get("WEBHOOK_MAX_PENDING") or 1000),
+            max_attempts=int(os.environ.get("WEBHOOK_MAX_ATTEMPTS") or 6),
+            timeout=float(os.environ.get("WEBHOOK_TIMEOUT") or 10),
+            allowed_hosts={h.strip().lower() for h in (os.environ.get("WEBHOOK_ALLOWED_HOSTS") or "").split(",")
+                           if h.strip()}
+        )
+    )
+    for kind, pipeline in handlers.items():
+        manager.register(kind, pipeline, requires=JOB_REQUIREMENTS[kind])
+    tracking_store = TrackingStore(os.environ.get("TRACKING_DB_PATH") or "data/tracking.db")
+    manager.register("recrawl", lambda params, job: recrawl(tracking_store, params, job),
+                     requires=JOB_REQUIREMENTS["recrawl"])
+    if not manager.runnable_kinds(capabilities):
+        parser.error(f"No job kinds can run with capabilities: {', '.join(capabilities) or 'none'}")
+    manager.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("👋 Worker stopped; its running jobs are re-queued once their leases expire")
+
+
+if __name__ == "__main__":
+    main()
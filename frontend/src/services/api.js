@@ -2,6 +2,7 @@
 import authService from './authService';
 
 const API_BASE_URL = 'http://localhost:5000/api';
+const FINAL_JOB_STATUSES = ['succeeded', 'failed', 'cancelled'];
 
 class ApiService {
   // Get auth headers from authService
@@ -62,6 +63,85 @@ class ApiService {
     }
   }
 
+  // Start a long-running backend job and follow it until it finishes.
+  // Endpoints answer 202 + job_id; the finished job carries the usual response body.
+  // onEvent receives live events (page, product, summary, progress) as they arrive.
+  static async runJob(endpoint, body, { onEvent, pollInterval = 1500 } = {}) {
+    const queued = await this.request(endpoint, {
+      method: 'POST',
+      body: JSON.stringify(body)
+    });
+
+    // Server ran it inline (e.g. ?wait=1)
+    if (!queued.job_id) {
+      return queued;
+    }
+
+    let done = null;
+    try {
+      done = await this.streamJobEvents(queued.job_id, onEvent);
+    } catch (error) {
+      console.warn(`Event stream for job ${queued.job_id} failed, polling instead:`, error);
+    }
+
+    while (!done) {
+      await new Promise(resolve => setTimeout(resolve, pollInterval));
+      const { job } = await this.request(`/jobs/${queued.job_id}`, { method: 'GET' });
+
+      if (onEvent) {
+        onEvent({ event: 'progress', data: job.progress || {} });
+      }
+      if (FINAL_JOB_STATUSES.includes(job.status)) {
+        done = { status: job.status, error: job.error, result: job.result };
+      }
+    }
+
+    // Cancelled covers DELETE /jobs/<id>, the job's deadline and a dropped stream that cancelled it
+    if (done.status === 'failed' || done.status === 'cancelled') {
+      throw new Error(done.result?.error || done.error || `Job ${done.status}`);
+    }
+    return done.result;
+  }
+
+  // Read a job's NDJSON event stream; resolves with the final "done" event data.
+  // Closing the tab drops the stream, which cancels the job if nobody else is waiting on it.
+  static async streamJobEvents(jobId, onEvent) {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/events?format=ndjson&cancel_on_disconnect=1`, {
+      headers: this.getAuthHeaders()
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) {
+        return null;
+      }
+      buffer += decoder.decode(value, { stream: true });
+
+      let newline;
+      while ((newline = buffer.indexOf('\n')) >= 0) {
+        const line = buffer.slice(0, newline).trim();
+        buffer = buffer.slice(newline + 1);
+        if (!line) continue;
+
+        const event = JSON.parse(line);
+        if (event.event === 'done') {
+          reader.cancel();
+          return event.data;
+        }
+        if (onEvent && event.event !== 'heartbeat') {
+          onEvent(event);
+        }
+      }
+    }
+  }
+
   // Scrape products - REQUIRES AUTH
   static async scrapeProducts(category, maxProducts = 20) {
     try {
@@ -70,12 +150,9 @@ class ApiService {
       
       console.log(`Scraping products for category: ${category}`);
       
-      const response = await this.request('/scrape-products', {
-        method: 'POST',
-        body: JSON.stringify({
-          category: category,
-          max_products: maxProducts
-        })
+      const response = await this.runJob('/scrape-products', {
+        category: category,
+        max_products: maxProducts
       });
 
       return {
@@ -99,7 +176,7 @@ class ApiService {
   }
 
   // Scrape reviews - REQUIRES AUTH - FIXED BULK VERSION
-  static async scrapeReviews(productIds, products = []) {
+  static async scrapeReviews(productIds, products = [], { onEvent } = {}) {
     try {
       // Check authentication before making request
       this.ensureAuthenticated();
@@ -134,10 +211,7 @@ class ApiService {
 
       console.log('📨 Sending bulk scrape request...');
       
-      const response = await this.request('/scrape-reviews', {
-        method: 'POST',
-        body: JSON.stringify(requestData)
-      });
+      const response = await this.runJob('/scrape-reviews', requestData, { onEvent });
 
       console.log('✅ Scrape response received:', {
         success: response.success,
@@ -245,7 +319,7 @@ class ApiService {
   }
 
   // Complete analysis workflow (scrape + analyze) - FIXED VERSION
-  static async completeAnalysis(product) {
+  static async completeAnalysis(product, { onEvent } = {}) {
     try {
       this.ensureAuthenticated();
       
@@ -255,15 +329,12 @@ class ApiService {
         throw new Error('Product link is required for analysis');
       }
 
-      const response = await this.request('/complete-analysis', {
-        method: 'POST',
-        body: JSON.stringify({
-          product_id: product.id,
-          product_title: product.title,
-          product_url: product.link,
-          max_reviews: 50
-        })
-      });
+      const response = await this.runJob('/complete-analysis', {
+        product_id: product.id,
+        product_title: product.title,
+        product_url: product.link,
+        max_reviews: 50
+      }, { onEvent });
 
       console.log('✅ Complete analysis response:', {
         success: response.success,
@@ -299,6 +370,44 @@ class ApiService {
     }
   }
 
+  // Bulk analysis: one job scrapes all products with shared browsers and analyzes them together
+  static async bulkAnalysis(products, { maxReviews = 50, drivers = 2, onEvent } = {}) {
+    try {
+      this.ensureAuthenticated();
+
+      console.log(`🔄 Starting bulk analysis for ${products.length} products`);
+
+      const response = await this.runJob('/bulk-analysis', {
+        products: products.map(product => ({
+          id: product.id,
+          title: product.title,
+          link: product.link
+        })),
+        max_reviews: maxReviews,
+        drivers: drivers
+      }, { onEvent });
+
+      if (!response.success) {
+        throw new Error(response.error || 'Bulk analysis failed');
+      }
+
+      return response;
+    } catch (error) {
+      console.error('❌ Bulk analysis failed:', error);
+
+      if (error.message === 'AUTHENTICATION_REQUIRED') {
+        window.location.href = '/user-authentication';
+      }
+
+      return {
+        success: false,
+        results: [],
+        combined_summary: null,
+        error: error.message
+      };
+    }
+  }
+
   // Load saved products - Made OPTIONAL auth for initial page load
   static async loadSavedProducts(category = null) {
     try {
@@ -359,10 +468,30 @@ class ApiService {
     }
   }
 
+  // Cancel a running or queued job
+  static async cancelJob(jobId) {
+    try {
+      const response = await this.request(`/jobs/${jobId}`, {
+        method: 'DELETE'
+      });
+
+      return {
+        success: true,
+        job: response.job
+      };
+    } catch (error) {
+      console.error('Failed to cancel job:', error);
+      return {
+        success: false,
+        error: error.message
+      };
+    }
+  }
+
   // Get processing status - PUBLIC (no auth required)
   static async getProcessingStatus(jobId) {
     try {
-      const response = await this.request(`/status/${jobId}`, {
+      const response = await this.request(`/jobs/${jobId}`, {
         method: 'GET'
       });
 
@@ -425,12 +554,9 @@ class ApiService {
     try {
       console.log('🧪 Testing scraping for product:', product);
       
-      const response = await this.request('/scrape-reviews', {
-        method: 'POST',
-        body: JSON.stringify({
-          product_ids: [product.id],
-          products: [product]
-        })
+      const response = await this.runJob('/scrape-reviews', {
+        product_ids: [product.id],
+        products: [product]
       });
 
       console.log('🧪 Test scraping result:', response);
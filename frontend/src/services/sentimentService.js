@@ -5,7 +5,7 @@ class SentimentService {
   /**
    * Complete workflow: scrape reviews and analyze sentiment
    */
-  async completeAnalysis(product, maxReviews = 50) {
+  async completeAnalysis(product, maxReviews = 50, onEvent) {
     try {
       console.log('🔄 Starting complete analysis for:', product.title);
       
@@ -14,7 +14,8 @@ class SentimentService {
         product.id,
         product.title,
         product.link,
-        maxReviews
+        maxReviews,
+        onEvent
       );
 
       if (!scrapeResult.success) {
@@ -121,9 +122,9 @@ async analyzeProductSentiment(productId, productTitle, productUrl, reviews) {
 }
 
   /**
-   * Scrape reviews for a product
+   * Scrape reviews for a product; onEvent receives live page/product events
    */
-  async scrapeReviews(productId, productTitle, productUrl, maxReviews = 50) {
+  async scrapeReviews(productId, productTitle, productUrl, maxReviews = 50, onEvent) {
     try {
       console.log('📥 Scraping reviews for:', productTitle);
       
@@ -133,7 +134,8 @@ async analyzeProductSentiment(productId, productTitle, productUrl, reviews) {
           id: productId,
           title: productTitle,
           link: productUrl
-        }]
+        }],
+        { onEvent }
       );
 
       if (response.success) {
@@ -392,23 +394,28 @@ async analyzeProductSentiment(productId, productTitle, productUrl, reviews) {
 
   /**
    * Process multiple products in batch
+   * onEvent(product, event) receives live job events for each product
    */
-  async processMultipleProducts(products, action = 'analyze') {
+  async processMultipleProducts(products, action = 'analyze', onEvent) {
     try {
+      if (action === 'analyze') {
+        return await this._analyzeProductsInBulk(products, onEvent);
+      }
+
       const results = [];
       
       for (const product of products) {
         let result;
+        const forward = onEvent ? (event) => onEvent(product, event) : undefined;
         
         if (action === 'scrape') {
           result = await this.scrapeReviews(
             product.id,
             product.title,
             product.link,
-            50
+            50,
+            forward
           );
-        } else if (action === 'analyze') {
-          result = await this.completeAnalysis(product, 50);
         }
         
         results.push({
@@ -434,6 +441,64 @@ async analyzeProductSentiment(productId, productTitle, productUrl, reviews) {
       };
     }
   }
+
+  /**
+   * Analyze all products in one bulk job instead of one request per product
+   */
+  async _analyzeProductsInBulk(products, onEvent) {
+    const byId = new Map(products.map(product => [String(product.id), product]));
+    const forward = onEvent ? (event) => {
+      const productId = event.data?.product_id ?? event.data?.result?.product_id;
+      onEvent(productId !== undefined ? byId.get(String(productId)) || null : null, event);
+    } : undefined;
+
+    const response = await ApiService.bulkAnalysis(products, { maxReviews: 50, onEvent: forward });
+    if (!response.success) {
+      return {
+        success: false,
+        results: [],
+        error: response.error
+      };
+    }
+
+    const results = response.results.map(result => {
+      const product = byId.get(String(result.product_id)) || {
+        id: result.product_id,
+        title: result.product_title,
+        link: result.product_url
+      };
+      const analysis = result.sentiment_analysis;
+      const data = result.success ? {
+        success: true,
+        product: {
+          ...product,
+          reviews: analysis.analyzed_reviews,
+          sentiment_analysis: analysis,
+          analysis_timestamp: result.analyzed_at
+        },
+        stats: this._extractStatsFromAnalysis(analysis),
+        message: 'Complete analysis finished successfully'
+      } : {
+        success: false,
+        error: result.error
+      };
+
+      return {
+        productId: product.id,
+        productTitle: product.title,
+        success: result.success,
+        data: data,
+        error: result.error
+      };
+    });
+
+    return {
+      success: true,
+      results: results,
+      combinedSummary: response.combined_summary,
+      message: response.message || `Processed ${products.length} products`
+    };
+  }
 }
 
 export default new SentimentService();
\ No newline at end of file